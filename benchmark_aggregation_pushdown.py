@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+서버 측 집계(GROUP BY time / aggregateWindow) vs 원시 데이터 조회 후 클라이언트 집계 비교
+같은 구간 / 간격의 mean / min / max를 두 방식으로 구하여 전송 바이트, 종단 시간, 결과 일치를
+비교합니다. --host를 지정하지 않으면 샘플 데이터를 1초 주기로 늘린 합성 데이터를 로컬
+InfluxDB 대체 서버(local_influxdb)로 제공합니다.
+
+사용 예:
+    python benchmark_aggregation_pushdown.py --hours 6 --resolution 60
+    python benchmark_aggregation_pushdown.py --host 10.238.24.150 --hours 24 --resolution 600
+"""
+
+import argparse
+import logging
+import time
+
+import numpy as np
+import pandas as pd
+
+from local_influxdb import (
+    TIME_COL,
+    LocalInfluxDBServer,
+    load_frame,
+    synthetic_history,
+)
+from test_influxdb_realtime import REALTIME_COLUMNS, SRS1InfluxDBClient
+
+
+def timed(fn, repeats: int):
+    """fn을 repeats번 실행하여 (마지막 결과, 중앙값 ms)를 반환합니다."""
+    latencies, result = [], None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return result, float(np.median(latencies))
+
+
+def response_bytes(client: SRS1InfluxDBClient, query: str) -> int:
+    """InfluxQL 응답 본문 크기 (bytes)"""
+    response = client.client.request(
+        "query", params={"q": query, "db": client.database}
+    )
+    return len(response.content)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", type=str, default=None, help="실제 InfluxDB 주소")
+    parser.add_argument("--port", type=int, default=8086)
+    parser.add_argument("--data_path", type=str, default="Data/test_sample.csv")
+    parser.add_argument("--hours", type=float, default=6.0)
+    parser.add_argument("--end_time", type=str, default=None, help="조회 끝 시각 (UTC)")
+    parser.add_argument("--resolution", type=int, default=60, help="집계 간격 (초)")
+    parser.add_argument("--aggregates", nargs="+", default=["mean", "min", "max"])
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    # 조회 / 서버 로그가 측정 결과에 섞이지 않도록 경고 이상만 출력
+    logging.getLogger().setLevel(logging.WARNING)
+    server = None
+    if args.host:
+        client = SRS1InfluxDBClient(host=args.host, port=args.port, verbose=False)
+        end_time = pd.Timestamp(args.end_time or pd.Timestamp.now())
+    else:
+        history = synthetic_history(load_frame(args.data_path), args.hours)
+        server = LocalInfluxDBServer(history).start()
+        client = SRS1InfluxDBClient(host=server.host, port=server.port, verbose=False)
+        end_time = pd.Timestamp(args.end_time or history[TIME_COL].max())
+
+    columns = [c for c in REALTIME_COLUMNS if c != TIME_COL]
+    range_seconds = int(args.hours * 3600)
+    resolution = f"{args.resolution}s"
+
+    def raw_then_aggregate():
+        raw = client.read_data(columns, end_time, range_seconds)
+        raw = raw.set_index(TIME_COL).sort_index()
+        aggregated = raw.resample(resolution).agg(args.aggregates)
+        aggregated.columns = [f"{col}_{agg}" for col, agg in aggregated.columns]
+        return aggregated.dropna(how="all")
+
+    def pushdown():
+        aggregated = client.read_aggregated(
+            columns, end_time, range_seconds, args.resolution, args.aggregates
+        )
+        return aggregated.set_index(TIME_COL).sort_index()
+
+    print(
+        f"🚀 집계 푸시다운 벤치마크: {args.hours:g}시간, {args.resolution}초 간격, "
+        f"{args.aggregates} ({'실제 InfluxDB' if args.host else '로컬 InfluxDB'})"
+    )
+    print("=" * 60)
+    try:
+        raw_bytes = response_bytes(
+            client, client._make_read_query(columns, end_time, range_seconds)
+        )
+        agg_bytes = response_bytes(
+            client,
+            client._make_aggregate_query(
+                columns, end_time, range_seconds, args.resolution, args.aggregates
+            ),
+        )
+        client_side, raw_ms = timed(raw_then_aggregate, args.repeats)
+        server_side, agg_ms = timed(pushdown, args.repeats)
+    finally:
+        client.client.close()
+        if server is not None:
+            server.stop()
+
+    print(f"   원시 조회 + 클라이언트 집계: {raw_bytes / 1e6:8.2f}MB, {raw_ms:8.0f}ms")
+    print(f"   서버 측 집계 (GROUP BY time): {agg_bytes / 1e6:8.2f}MB, {agg_ms:8.0f}ms")
+    print(
+        f"\n⚡ 전송량 {raw_bytes / max(agg_bytes, 1):.0f}배 감소, "
+        f"종단 시간 {raw_ms / max(agg_ms, 1e-9):.1f}배 단축"
+    )
+
+    server_side.index = pd.DatetimeIndex(server_side.index).tz_localize(None)
+    client_side.index = pd.DatetimeIndex(client_side.index).tz_localize(None)
+    common = server_side.columns.intersection(client_side.columns)
+    diff = (server_side[common] - client_side[common].reindex(server_side.index)).abs()
+    print(
+        f"🔍 구간 {len(server_side)}개 / 컬럼 {len(common)}개 비교: "
+        f"최대 차이 {np.nanmax(diff.to_numpy()):.2e}"
+    )
+
+
+if __name__ == "__main__":
+    main()
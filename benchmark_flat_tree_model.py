@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+평탄화 트리 평가기 vs LGBMRegressor.predict 지연시간 벤치마크
+배치 크기 1 ~ 10,000에 대해 p50/p99 지연시간을 비교합니다.
+"""
+
+import argparse
+import pickle
+import time
+
+import numpy as np
+import pandas as pd
+
+from flat_tree_model import FlatTreeModel
+
+BATCH_SIZES = [1, 10, 100, 1000, 10000]
+
+
+def measure_latency(predict_fn, X: np.ndarray, repeats: int) -> np.ndarray:
+    """predict_fn(X)의 호출별 지연시간(ms)을 측정합니다."""
+    predict_fn(X)  # 워밍업
+    latencies = np.empty(repeats)
+    for i in range(repeats):
+        start = time.perf_counter()
+        predict_fn(X)
+        latencies[i] = (time.perf_counter() - start) * 1000
+    return latencies
+
+
+def make_batch(base: np.ndarray, batch_size: int) -> np.ndarray:
+    """test_sample 행을 반복하여 원하는 크기의 배치를 만듭니다."""
+    reps = int(np.ceil(batch_size / len(base)))
+    return np.ascontiguousarray(np.tile(base, (reps, 1))[:batch_size])
+
+
+def run_benchmark(model_path: str, data_path: str, repeats: int) -> pd.DataFrame:
+    with open(model_path, "rb") as f:
+        model = pickle.load(f)
+    flat_model = FlatTreeModel.from_model(model)
+
+    data = pd.read_csv(data_path)
+    X_df = data[flat_model.feature_names]
+    base = X_df.to_numpy(dtype=np.float64)
+
+    # 예측 일치 검증
+    expected = model.predict(base)
+    actual = flat_model.predict(base)
+    print(f"🔍 비트 단위 일치 여부: {np.array_equal(expected, actual)} ({len(base)}행)")
+
+    rows = []
+    for batch_size in BATCH_SIZES:
+        X = make_batch(base, batch_size)
+        n_repeats = max(5, repeats // max(1, batch_size // 100))
+        for name, fn in [
+            ("lgbm_predict", model.predict),
+            ("flat_predict", flat_model.predict),
+        ]:
+            latencies = measure_latency(fn, X, n_repeats)
+            rows.append(
+                {
+                    "batch_size": batch_size,
+                    "method": name,
+                    "p50_ms": np.percentile(latencies, 50),
+                    "p99_ms": np.percentile(latencies, 99),
+                    "rows_per_sec": batch_size / (np.median(latencies) / 1000),
+                }
+            )
+            print(
+                f"   batch={batch_size:>6} {name:<13} "
+                f"p50={rows[-1]['p50_ms']:.3f}ms p99={rows[-1]['p99_ms']:.3f}ms"
+            )
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model_path", type=str, default="Model/lgbm_model.pkl")
+    parser.add_argument("--data_path", type=str, default="Data/test_sample.csv")
+    parser.add_argument("--repeats", type=int, default=200)
+    args = parser.parse_args()
+
+    print("🚀 평탄화 트리 평가기 벤치마크 시작")
+    print("=" * 60)
+    result = run_benchmark(args.model_path, args.data_path, args.repeats)
+    print("\n📊 결과 요약:")
+    print(result.round(3).to_string(index=False))
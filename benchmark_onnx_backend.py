@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+모델 백엔드별 로드 시간 / 메모리 / 단건 지연시간 벤치마크
+피클(LGBMRegressor), 네이티브 LightGBM(Booster 텍스트 모델), 평탄화 모델, ONNX Runtime을
+각각 새 인터프리터에서 로드하여 import 포함 로드 시간과 RSS 증가량을 공정하게 비교합니다.
+
+사용 예:
+    python benchmark_onnx_backend.py --repeats 1000
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKENDS = ["pickle", "native", "flat", "onnx"]
+
+
+def read_rss_mb() -> float:
+    """/proc/self/status의 현재 RSS(MB)"""
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def load_backend(backend: str, model_path: str):
+    """백엔드별로 모델을 로드하고 단건 예측 함수를 반환합니다."""
+    if backend == "pickle":
+        import pickle
+
+        with open(model_path, "rb") as f:
+            model = pickle.load(f)
+        return lambda X: model.predict(X, num_threads=1)
+    if backend == "native":
+        import lightgbm as lgb
+
+        booster = lgb.Booster(model_file=model_path)
+        return lambda X: booster.predict(X, num_threads=1)
+    if backend == "flat":
+        from flat_tree_model import FlatTreeModel
+
+        return FlatTreeModel.load(model_path).predict
+    if backend == "onnx":
+        from onnx_model import OnnxNOxModel
+
+        return OnnxNOxModel.load(model_path).predict
+    raise ValueError(f"지원하지 않는 백엔드: {backend}")
+
+
+def run_child(backend: str, model_path: str, rows_path: str, repeats: int) -> dict:
+    """자식 프로세스: 로드 시간 / RSS 증가량 / 단건 지연시간을 측정합니다."""
+    rss_before = read_rss_mb()
+    start = time.perf_counter()
+    predict_fn = load_backend(backend, model_path)
+    load_ms = (time.perf_counter() - start) * 1000
+    rss_after_load = read_rss_mb()
+
+    import numpy as np
+
+    rows = np.load(rows_path)
+    predict_fn(rows[:1])  # 워밍업
+    latencies = np.empty(repeats)
+    for i in range(repeats):
+        row = rows[i % len(rows) : i % len(rows) + 1]
+        start = time.perf_counter()
+        predict_fn(row)
+        latencies[i] = (time.perf_counter() - start) * 1000
+
+    return {
+        "backend": backend,
+        "load_ms": load_ms,
+        "load_rss_mb": rss_after_load - rss_before,
+        "total_rss_mb": read_rss_mb(),
+        "row_p50_ms": float(np.percentile(latencies, 50)),
+        "row_p99_ms": float(np.percentile(latencies, 99)),
+        "predictions": predict_fn(rows).tolist(),
+    }
+
+
+def prepare_artifacts(model_path: str, data_path: str, workdir: str) -> dict:
+    """백엔드별 모델 파일과 입력 행(.npy)을 준비합니다."""
+    import pickle
+
+    import numpy as np
+    import pandas as pd
+
+    from flat_tree_model import FlatTreeModel
+    from onnx_model import convert_to_onnx
+
+    with open(model_path, "rb") as f:
+        model = pickle.load(f)
+    booster = model.booster_
+
+    paths = {
+        "pickle": model_path,
+        "native": os.path.join(workdir, "lgbm_model.txt"),
+        "flat": os.path.join(workdir, "lgbm_model_flat.npz"),
+        "onnx": os.path.join(workdir, "lgbm_model.onnx"),
+        "rows": os.path.join(workdir, "rows.npy"),
+    }
+    booster.save_model(paths["native"])
+    FlatTreeModel.from_model(model).save(paths["flat"])
+    with open(paths["onnx"], "wb") as f:
+        f.write(convert_to_onnx(model).SerializeToString())
+
+    rows = pd.read_csv(data_path)[booster.feature_name()].to_numpy(np.float64)
+    np.save(paths["rows"], rows)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model_path", type=str, default="Model/lgbm_model.pkl")
+    parser.add_argument("--data_path", type=str, default="Data/test_sample.csv")
+    parser.add_argument("--repeats", type=int, default=1000)
+    parser.add_argument("--backends", type=str, nargs="*", default=BACKENDS)
+    parser.add_argument("--child", type=str, default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--child_model", type=str, default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--child_rows", type=str, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        result = run_child(args.child, args.child_model, args.child_rows, args.repeats)
+        print(json.dumps(result))
+        return
+
+    print("🚀 모델 백엔드 벤치마크 시작")
+    print("=" * 60)
+    with tempfile.TemporaryDirectory() as workdir:
+        paths = prepare_artifacts(
+            os.path.abspath(args.model_path), args.data_path, workdir
+        )
+        results = []
+        for backend in args.backends:
+            proc = subprocess.run(
+                [
+                    sys.executable,
+                    os.path.abspath(__file__),
+                    "--child",
+                    backend,
+                    "--child_model",
+                    paths[backend],
+                    "--child_rows",
+                    paths["rows"],
+                    "--repeats",
+                    str(args.repeats),
+                ],
+                cwd=REPO_DIR,
+                capture_output=True,
+                text=True,
+            )
+            if proc.returncode != 0:
+                print(f"❌ {backend} 측정 실패: {proc.stderr[-500:]}")
+                continue
+            results.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+    import numpy as np
+
+    reference = next((r for r in results if r["backend"] == "pickle"), None)
+    print("\n📊 결과 요약 (새 프로세스 기준, import 포함):")
+    print(
+        f"{'backend':<8} {'load_ms':>9} {'load_MB':>8} {'RSS_MB':>8} "
+        f"{'p50_ms':>8} {'p99_ms':>8} {'max_diff':>10}"
+    )
+    for r in results:
+        max_diff = float("nan")
+        if reference is not None:
+            max_diff = float(
+                np.max(np.abs(np.array(r["predictions"]) - reference["predictions"]))
+            )
+        print(
+            f"{r['backend']:<8} {r['load_ms']:>9.1f} {r['load_rss_mb']:>8.1f} "
+            f"{r['total_rss_mb']:>8.1f} {r['row_p50_ms']:>8.3f} "
+            f"{r['row_p99_ms']:>8.3f} {max_diff:>10.2e}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+실시간 특성 조회 지연시간 벤치마크: 측정값별 쿼리 반복 vs 단일 pivot 쿼리
+두 방식을 번갈아 실행하여 서버 부하 변화의 영향을 줄이고, 조회 값이 같은지도 확인합니다.
+--url을 지정하지 않으면 샘플 데이터를 로컬 InfluxDB 대체 서버(local_influxdb)로 제공합니다.
+
+조회 실패는 기본값(0.0)으로 채우지 않고 실패 횟수로 따로 집계하며, 값 비교는 두 방식이 모두
+성공한 회차만 대상으로 합니다.
+
+사용 예:
+    python benchmark_realtime_query.py --repeats 30 --latency_ms 5
+    python benchmark_realtime_query.py --url http://10.238.27.132:8086 --token <TOKEN>
+"""
+
+import argparse
+import logging
+import time
+
+import numpy as np
+
+import realtime_nox_prediction as rt
+
+
+def summarize(name: str, latencies, round_trips: int, failures: int) -> None:
+    if not latencies:
+        print(
+            f"   {name:<16} 왕복={round_trips:>2}회 성공한 조회 없음 (실패 {failures}회)"
+        )
+        return
+    latencies = np.asarray(latencies)
+    print(
+        f"   {name:<16} 왕복={round_trips:>2}회 "
+        f"p50={np.percentile(latencies, 50):8.1f}ms "
+        f"p99={np.percentile(latencies, 99):8.1f}ms "
+        f"평균={latencies.mean():8.1f}ms 실패={failures}회"
+    )
+
+
+def timed_query(fn, *args, **kwargs):
+    """(결과, 지연시간 ms)를 반환합니다. 조회가 실패하면 결과는 None"""
+    start = time.perf_counter()
+    try:
+        result = fn(*args, raise_on_error=True, **kwargs)
+    except Exception:
+        result = None
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", type=str, default=None, help="실제 InfluxDB 주소")
+    parser.add_argument("--token", type=str, default=rt.INFLUXDB_TOKEN)
+    parser.add_argument("--org", type=str, default=rt.INFLUXDB_ORG)
+    parser.add_argument("--data_path", type=str, default="Data/test_sample.csv")
+    parser.add_argument(
+        "--latency_ms", type=float, default=0.0, help="로컬 서버의 응답 지연"
+    )
+    parser.add_argument("--time_range", type=str, default="-5m")
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    # 반복 조회 로그가 지연시간 측정에 섞이지 않도록 함
+    # (조회 실패는 raise_on_error로 받아 따로 집계하므로 실패 로그도 생략)
+    logging.getLogger().setLevel(logging.CRITICAL)
+
+    from influxdb_client import InfluxDBClient
+
+    server = None
+    url = args.url
+    if url is None:
+        from local_influxdb import LocalInfluxDBServer
+
+        server = LocalInfluxDBServer.from_file(
+            args.data_path, latency_ms=args.latency_ms
+        ).start()
+        url = server.url
+    client = InfluxDBClient(url=url, token=args.token, org=args.org)
+    query_api = client.query_api()
+
+    print("🚀 실시간 특성 조회 벤치마크")
+    print(f"   대상: {url}{' (로컬 대체 서버)' if server else ''}")
+    print("=" * 60)
+    per_measurement, single = [], []
+    old_failures = new_failures = 0
+    compared = mismatches = 0
+    try:
+        for _ in range(args.repeats):
+            old, elapsed = timed_query(
+                rt.get_realtime_features_per_measurement, client, args.time_range
+            )
+            if old is None:
+                old_failures += 1
+            else:
+                per_measurement.append(elapsed)
+
+            new, elapsed = timed_query(
+                rt.get_realtime_features, client, args.time_range, query_api
+            )
+            if new is None:
+                new_failures += 1
+            else:
+                single.append(elapsed)
+
+            if old is not None and new is not None:
+                compared += 1
+                mismatches += int(old != new)
+    finally:
+        client.close()
+        if server is not None:
+            server.stop()
+
+    summarize(
+        "측정값별 쿼리", per_measurement, len(rt.REQUIRED_MEASUREMENTS), old_failures
+    )
+    summarize("단일 pivot 쿼리", single, 1, new_failures)
+    if per_measurement and single:
+        speedup = np.median(per_measurement) / np.median(single)
+        print(f"\n⚡ p50 기준 {speedup:.1f}배 단축")
+    if compared:
+        print(
+            f"🔍 조회 값 불일치: {mismatches}/{compared}회 "
+            "(조회 사이 새 데이터 유입 시 발생 가능)"
+        )
+    else:
+        print("❌ 두 방식이 모두 성공한 회차가 없어 값을 비교하지 못했습니다.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""
+학습용 SRS1 원시 데이터 대량 내보내기 (시간 구간 분할 + 병렬 조회 + 파티션 parquet)
+수개월 구간을 한 번의 client.query로 조회하면 서버 타임아웃과 거대한 응답(메모리)이
+문제가 됩니다. BulkExporter는
+
+1. 전체 구간을 epoch 기준 slice_seconds 격자로 나누고
+2. 최대 max_workers개의 연결(스레드별 클라이언트)로 구간들을 동시에 조회하고
+   (columnar_ingest의 CSV 컬럼 단위 수집)
+3. 실패한 구간은 지수 백오프로 재시도하며
+4. 구간마다 바로 output_dir/date=YYYY-MM-DD/part-<시작>-<끝>.parquet로 기록합니다.
+
+완료한 구간은 output_dir/_manifest.jsonl에 한 줄씩 남기므로, 중단 후 같은 명령으로 다시
+실행하면 남은 구간만 내보냅니다. 시작 시각은 격자 경계로 내림하므로 --start가 달라도 구간
+키가 같고, --end가 달라 마지막 구간이 겹치면 load_export가 시각 중복을 제거합니다.
+메모리에는 실행 중인 구간(최대 max_workers개)만 올라가며, Ctrl-C / 예외 시 대기 중인 구간은
+취소합니다.
+
+사용 예:
+    python bulk_export.py --host 10.238.24.150 --start 2025-04-01 --end 2025-07-01 \\
+        --output_dir Data/export_srs1 --workers 4 --slice_hours 6
+    python bulk_export.py --hours 48    # 로컬 InfluxDB(합성 데이터, 장애 주입)로 확인
+
+    data = load_export("Data/export_srs1")
+"""
+
+import json
+import logging
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+TIME_COL = "_time_gateway"
+MANIFEST_NAME = "_manifest.jsonl"
+
+
+def _to_naive_utc(value) -> pd.Timestamp:
+    value = pd.Timestamp(value)
+    if value.tzinfo is not None:
+        value = value.tz_convert("UTC").tz_localize(None)
+    return value.floor("s")
+
+
+def time_slices(
+    start, end, slice_seconds: float
+) -> List[Tuple[pd.Timestamp, pd.Timestamp]]:
+    """(start, end] 구간을 epoch 기준 slice_seconds 격자 경계로 나눕니다.
+
+    start는 격자 경계로 내림하므로 시작 시각이 달라도 같은 구간(키)이 만들어집니다.
+    slice_seconds가 하루(86400초)의 약수이면 구간이 날짜 경계를 넘지 않습니다.
+
+    Returns
+    -------
+    List[Tuple[pd.Timestamp, pd.Timestamp]]
+        (구간 시작 초과, 구간 끝 이하) 목록 (naive UTC)
+    """
+    start, end = _to_naive_utc(start), _to_naive_utc(end)
+    step = pd.Timedelta(seconds=slice_seconds)
+    epoch = pd.Timestamp(0)
+    start = epoch + math.floor((start - epoch) / step) * step
+    boundaries = [start] + list(
+        pd.date_range(start + step, end, freq=step, inclusive="left")
+    )
+    boundaries.append(end)
+    return [(lo, hi) for lo, hi in zip(boundaries[:-1], boundaries[1:]) if hi > lo]
+
+
+class BulkExporter:
+    """시간 구간별 병렬 조회 결과를 파티션 parquet 데이터셋으로 내보냅니다.
+
+    Parameters
+    ----------
+    output_dir : str
+        parquet 데이터셋 디렉토리 (date=YYYY-MM-DD 파티션 + _manifest.jsonl)
+    columns : List[str], optional
+        조회할 원시 컬럼 (기본값: test_influxdb_realtime.REALTIME_COLUMNS)
+    slice_seconds : float
+        구간 길이 (하루의 약수 권장)
+    max_workers : int
+        동시 조회 수 (= 스레드별 클라이언트 연결 수 상한)
+    max_retries : int
+        구간당 재시도 횟수 (retry_backoff * 2**시도 초 대기)
+    client_kwargs : dict, optional
+        SRS1InfluxDBClient 생성 인자 (host, port, username, password, database)
+    """
+
+    def __init__(
+        self,
+        output_dir: str,
+        columns: Optional[List[str]] = None,
+        slice_seconds: float = 6 * 3600,
+        max_workers: int = 4,
+        max_retries: int = 3,
+        retry_backoff: float = 1.0,
+        table_name: str = "SRS1",
+        client_kwargs: Optional[Dict[str, Any]] = None,
+    ):
+        if columns is None:
+            from test_influxdb_realtime import REALTIME_COLUMNS
+
+            columns = REALTIME_COLUMNS
+        self.output_dir = output_dir
+        self.columns = [c for c in columns if c != TIME_COL]
+        self.slice_seconds = slice_seconds
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.table_name = table_name
+        self.client_kwargs = dict(client_kwargs or {})
+        self.manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+        self._local = threading.local()
+        self._clients = []
+        self._lock = threading.Lock()
+        # 중단(Ctrl-C / 예외) 시 실행 중인 구간의 재시도 대기를 끝냄
+        self._stop = threading.Event()
+        self.stats = {"retries": 0, "failures": 0}
+
+    def _client(self):
+        """스레드별 조회 클라이언트 (연결 수가 max_workers를 넘지 않음)"""
+        client = getattr(self._local, "client", None)
+        if client is None:
+            from test_influxdb_realtime import SRS1InfluxDBClient
+
+            # 한 번만 읽는 대량 구간이 조회 캐시(SRS1_CACHE_DIR)를 밀어내지 않도록 캐시 사용 안 함
+            kwargs = {"cache": False, **self.client_kwargs}
+            client = SRS1InfluxDBClient(**kwargs, verbose=False)
+            self._local.client = client
+            with self._lock:
+                self._clients.append(client)
+        return client
+
+    @staticmethod
+    def _key(lo: pd.Timestamp, hi: pd.Timestamp) -> str:
+        return f"{lo.value}-{hi.value}"
+
+    def completed(self) -> Dict[str, dict]:
+        """매니페스트에 기록된 완료 구간 (파일이 사라진 구간은 제외)"""
+        done = {}
+        if not os.path.exists(self.manifest_path):
+            return done
+        with open(self.manifest_path) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # 기록 도중 중단되어 잘린 마지막 줄
+                    continue
+                path = entry.get("path")
+                if path and not os.path.exists(os.path.join(self.output_dir, path)):
+                    continue
+                done[entry["key"]] = entry
+        return done
+
+    def _fetch(self, lo: pd.Timestamp, hi: pd.Timestamp) -> pd.DataFrame:
+        from columnar_ingest import read_influxql_columnar
+
+        client = self._client()
+        query = client._make_read_query(
+            self.columns, hi, int((hi - lo).total_seconds()), self.table_name
+        )
+        return read_influxql_columnar(client.client, query, client.database)
+
+    def _write(self, lo: pd.Timestamp, hi: pd.Timestamp, data: pd.DataFrame) -> dict:
+        """구간 결과를 parquet로 기록합니다. (숨김 임시 파일에 쓴 뒤 교체)
+
+        InfluxQL은 구간에 값이 없는 필드를 응답에서 빼므로, 모든 파일이 같은 스키마를 갖도록
+        요청 컬럼 전체를 float64(없으면 NaN)로 맞춰 기록합니다. (데이터셋 리더는 첫 파일의
+        스키마를 사용하므로 빠진 컬럼이 데이터셋 전체에서 사라짐)
+        """
+        entry = {
+            "key": self._key(lo, hi),
+            "start": lo.isoformat(),
+            "end": hi.isoformat(),
+            "rows": len(data),
+            "path": None,
+            "bytes": 0,
+        }
+        if len(data):
+            data = self._conform(data)
+            partition = f"date={lo.strftime('%Y-%m-%d')}"
+            name = f"part-{lo.strftime('%Y%m%dT%H%M%S')}-{hi.strftime('%Y%m%dT%H%M%S')}"
+            directory = os.path.join(self.output_dir, partition)
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, f"{name}.parquet")
+            # 데이터셋 리더는 "."로 시작하는 파일을 무시하므로 쓰는 중인 파일이 읽히지 않음
+            tmp_path = os.path.join(directory, f".{name}.parquet.tmp")
+            data.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, path)
+            entry["path"] = os.path.join(partition, f"{name}.parquet")
+            entry["bytes"] = os.path.getsize(path)
+
+        with self._lock:
+            with open(self.manifest_path, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+        return entry
+
+    def _conform(self, data: pd.DataFrame) -> pd.DataFrame:
+        """요청 컬럼(소문자) + _time_gateway 순서와 float64 타입으로 맞춥니다."""
+        columns = [c.lower() for c in self.columns]
+        conformed = data.reindex(columns=columns + [TIME_COL])
+        conformed[columns] = conformed[columns].astype("float64")
+        return conformed
+
+    def _export_slice(self, lo: pd.Timestamp, hi: pd.Timestamp) -> dict:
+        for attempt in range(self.max_retries + 1):
+            try:
+                return self._write(lo, hi, self._fetch(lo, hi))
+            except Exception as e:
+                if attempt >= self.max_retries or self._stop.is_set():
+                    raise
+                with self._lock:
+                    self.stats["retries"] += 1
+                logger.warning(f"구간 {lo} ~ {hi} 조회 실패, 재시도 {attempt + 1}: {e}")
+                if self._stop.wait(self.retry_backoff * 2**attempt):
+                    raise
+
+    def export(self, start, end) -> Dict[str, Any]:
+        """(start, end] 구간을 내보냅니다. (매니페스트의 완료 구간은 건너뜀)
+
+        Returns
+        -------
+        Dict[str, Any]
+            구간 수(전체 / 이어받음 / 내보냄 / 실패), 행 수, 파일 크기, 소요 시간, rows/s
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        slices = time_slices(start, end, self.slice_seconds)
+        done = self.completed()
+        pending = [(lo, hi) for lo, hi in slices if self._key(lo, hi) not in done]
+        report = {
+            "slices": len(slices),
+            "resumed": len(slices) - len(pending),
+            "exported": 0,
+            "failed": [],
+            "rows": 0,
+            "bytes": 0,
+        }
+        if done and pending:
+            logger.info(
+                f"완료 구간 {report['resumed']}개 이어받음, 남은 구간 {len(pending)}개"
+            )
+
+        started = time.perf_counter()
+        self._stop.clear()
+        executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="bulk-export"
+        )
+        try:
+            futures = {
+                executor.submit(self._export_slice, lo, hi): (lo, hi)
+                for lo, hi in pending
+            }
+            for future in as_completed(futures):
+                lo, hi = futures[future]
+                try:
+                    entry = future.result()
+                except Exception as e:
+                    # 실패한 구간은 매니페스트에 남지 않으므로 다음 실행에서 다시 시도
+                    self.stats["failures"] += 1
+                    report["failed"].append(f"{lo} ~ {hi}")
+                    logger.error(f"구간 {lo} ~ {hi} 내보내기 실패: {e}")
+                    continue
+                report["exported"] += 1
+                report["rows"] += entry["rows"]
+                report["bytes"] += entry["bytes"]
+                logger.info(
+                    f"[{report['exported']}/{len(pending)}] {lo} ~ {hi}: "
+                    f"{entry['rows']}행"
+                )
+        except BaseException:
+            # 대기 중인 구간은 취소하고 실행 중인 구간만 마무리 (기록은 원자적이므로 다음 실행에서
+            # 이어받음)
+            self._stop.set()
+            logger.warning("내보내기 중단: 대기 중인 구간을 취소합니다.")
+            raise
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+            for client in self._clients:
+                client.client.close()
+            self._clients.clear()
+            self._local = threading.local()
+
+        elapsed = time.perf_counter() - started
+        report["elapsed_s"] = elapsed
+        report["rows_per_s"] = report["rows"] / elapsed if elapsed > 0 else 0.0
+        report["retries"] = self.stats["retries"]
+        return report
+
+
+def load_export(output_dir: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """내보낸 parquet 데이터셋을 시각 순 DataFrame으로 읽습니다. (파티션 컬럼 제외)
+
+    --end가 다른 실행의 마지막 구간처럼 겹치는 파일이 있으면 같은 시각의 행은 하나만 남깁니다.
+    """
+    if columns is not None:
+        columns = [c.lower() for c in columns if c != TIME_COL] + [TIME_COL]
+    data = pd.read_parquet(output_dir, columns=columns)
+    data = data.drop(columns=["date"], errors="ignore")
+    data = data.sort_values(TIME_COL, kind="stable")
+    data = data.drop_duplicates(subset=TIME_COL, keep="last")
+    return data.reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    import argparse
+    import shutil
+    import tempfile
+
+    logging.basicConfig(level=logging.WARNING)
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", type=str, default=None, help="실제 InfluxDB 주소")
+    parser.add_argument("--port", type=int, default=8086)
+    parser.add_argument("--start", type=str, default=None, help="시작 시각 (UTC)")
+    parser.add_argument("--end", type=str, default=None, help="끝 시각 (UTC)")
+    parser.add_argument("--output_dir", type=str, default=None)
+    parser.add_argument("--slice_hours", type=float, default=6.0)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--max_retries", type=int, default=3)
+    parser.add_argument("--data_path", type=str, default="Data/test_sample.csv")
+    parser.add_argument(
+        "--hours", type=float, default=48.0, help="로컬 모의 데이터 길이"
+    )
+    parser.add_argument(
+        "--failure_rate", type=float, default=0.1, help="로컬 장애 비율"
+    )
+    args = parser.parse_args()
+
+    server = None
+    if args.host:
+        if not (args.start and args.end and args.output_dir):
+            parser.error("--host 사용 시 --start, --end, --output_dir가 필요합니다.")
+        client_kwargs = {"host": args.host, "port": args.port}
+        start, end, output_dir = args.start, args.end, args.output_dir
+    else:
+        from local_influxdb import LocalInfluxDBServer, load_frame, synthetic_history
+
+        history = synthetic_history(load_frame(args.data_path), args.hours)
+        server = LocalInfluxDBServer(
+            history, failure_rate=args.failure_rate, seed=0
+        ).start()
+        client_kwargs = {"host": server.host, "port": server.port}
+        start = pd.Timestamp(history[TIME_COL].min()) - pd.Timedelta(seconds=1)
+        end = pd.Timestamp(history[TIME_COL].max())
+        output_dir = args.output_dir or tempfile.mkdtemp(prefix="srs1_export_")
+
+    exporter = BulkExporter(
+        output_dir,
+        slice_seconds=args.slice_hours * 3600,
+        max_workers=args.workers,
+        max_retries=args.max_retries,
+        retry_backoff=0.1 if server else 1.0,
+        client_kwargs=client_kwargs,
+    )
+    print(f"🚀 대량 내보내기: {start} ~ {end} → {output_dir}")
+    print(f"   구간 {args.slice_hours:g}시간, 동시 조회 {args.workers}개")
+    try:
+        report = exporter.export(start, end)
+        print(
+            f"✅ 구간 {report['exported']}/{report['slices']}개 내보냄 "
+            f"(이어받음 {report['resumed']}, 실패 {len(report['failed'])}, "
+            f"재시도 {report['retries']})"
+        )
+        print(
+            f"   {report['rows']}행, {report['bytes'] / 1e6:.2f}MB, "
+            f"{report['elapsed_s']:.1f}초 ({report['rows_per_s']:,.0f} rows/s)"
+        )
+
+        if server is not None:
+            # 같은 명령을 다시 실행하면 완료 구간을 모두 건너뜀
+            again = exporter.export(start, end)
+            print(f"🔄 재실행: 이어받음 {again['resumed']}/{again['slices']}개")
+
+            exported = load_export(output_dir)
+            print(
+                f"🔍 데이터셋 {len(exported)}행 / 원본 {len(history)}행, "
+                f"시각 중복 {exported[TIME_COL].duplicated().sum()}개"
+            )
+    finally:
+        if server is not None:
+            server.stop()
+            if args.output_dir is None:
+                shutil.rmtree(output_dir, ignore_errors=True)
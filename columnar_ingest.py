@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+InfluxDB 조회 결과의 컬럼 단위(columnar) 수집
+read_data는 JSON 응답을 ResultSet.get_points()로 행마다 dict로 만든 뒤 DataFrame을 구성하고,
+RFC3339 문자열 시각을 다시 파싱합니다. 하루치 1초 데이터(86,400행 x 16컬럼)에서는 이
+행 단위 변환이 조회 시간의 대부분을 차지합니다. 이 모듈은 응답을 바로 타입이 정해진
+NumPy 컬럼으로 읽습니다.
+
+- InfluxQL CSV (Accept: application/csv, epoch=ns): pyarrow.csv(설치된 경우) 또는 pandas C
+  파서로 time은 int64, 필드는 float64 컬럼으로 한 번에 파싱
+- InfluxQL chunked JSON (chunked=true, chunk_size): 조각마다 values를 float64 2차원 배열로
+  변환 (epoch=u: 현재 시각의 µs 값은 2**53 미만이라 float64로 정확히 표현됨)
+- Flux annotated CSV (query_raw): #datatype 주석으로 컬럼 타입을 정해 FluxRecord 반복 없이
+  DataFrame으로 파싱
+
+결과 DataFrame은 read_data와 같은 형태(소문자 컬럼 + UTC _time_gateway)입니다.
+
+사용 예:
+    data = client.read_data_columnar(columns, end_time, 86400)          # CSV
+    data = client.read_data_columnar(columns, end_time, 86400, fmt="json")
+    python columnar_ingest.py --hours 24    # dict 경로와 rows/s 비교
+"""
+
+import io
+import json
+import logging
+import re
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+TIME_COL = "_time_gateway"
+_EPOCH_NS = {"ns": 1, "u": 1000, "ms": 10**6, "s": 10**9}
+_FLUX_DTYPES = {
+    "double": "float64",
+    "string": "object",
+    "boolean": "object",
+}
+
+
+def parse_influxql_csv(body: bytes) -> Dict[str, np.ndarray]:
+    """InfluxQL CSV 응답(name,tags,time,필드...)을 컬럼 배열 딕셔너리로 파싱합니다.
+
+    Returns
+    -------
+    Dict[str, np.ndarray]
+        "time"(int64 epoch)과 필드별 float64 배열 (빈 값은 NaN)
+    """
+    if not body.strip():
+        return {}
+    header = body[: body.index(b"\n")].decode().strip().split(",")
+    fields = [name for name in header if name not in ("name", "tags")]
+
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pa_csv
+    except ImportError:
+        pa_csv = None
+
+    if pa_csv is not None:
+        table = pa_csv.read_csv(
+            io.BytesIO(body),
+            convert_options=pa_csv.ConvertOptions(
+                include_columns=fields,
+                column_types={
+                    name: pa.int64() if name == "time" else pa.float64()
+                    for name in fields
+                },
+            ),
+        )
+        return {
+            name: table.column(name).to_numpy(zero_copy_only=False) for name in fields
+        }
+
+    frame = pd.read_csv(
+        io.BytesIO(body),
+        usecols=fields,
+        dtype={name: np.int64 if name == "time" else np.float64 for name in fields},
+        engine="c",
+        float_precision="round_trip",
+    )
+    return {name: frame[name].to_numpy() for name in fields}
+
+
+def parse_influxql_chunks(lines: Iterable[bytes]) -> Dict[str, np.ndarray]:
+    """chunked=true 응답(조각마다 JSON 한 줄)을 컬럼 배열 딕셔너리로 파싱합니다.
+
+    epoch=u 이하의 정밀도로 조회해야 time이 float64로 정확히 표현됩니다.
+    """
+    names, blocks = None, []
+    for line in lines:
+        if not line or not line.strip():
+            continue
+        payload = json.loads(line)
+        if "error" in payload:
+            raise RuntimeError(payload["error"])
+        for statement in payload.get("results", []):
+            if "error" in statement:
+                raise RuntimeError(statement["error"])
+            for series in statement.get("series", []):
+                names = names or series["columns"]
+                if series["values"]:
+                    # None(빈 필드)은 float64 변환 시 NaN
+                    blocks.append(np.array(series["values"], dtype=np.float64))
+    if names is None:
+        return {}
+    values = np.concatenate(blocks) if blocks else np.empty((0, len(names)))
+    columns = {name: values[:, i] for i, name in enumerate(names)}
+    columns["time"] = columns["time"].astype(np.int64)
+    return columns
+
+
+def columns_to_frame(columns: Dict[str, np.ndarray], epoch: str = "ns") -> pd.DataFrame:
+    """컬럼 배열을 read_data와 같은 DataFrame(소문자 컬럼 + UTC _time_gateway)으로 만듭니다."""
+    if not columns or not len(columns["time"]):
+        return pd.DataFrame()
+    times = columns["time"] * _EPOCH_NS[epoch]
+    data = pd.DataFrame(
+        {name.lower(): values for name, values in columns.items() if name != "time"}
+    )
+    data[TIME_COL] = pd.to_datetime(times, unit="ns", utc=True)
+    return data
+
+
+def read_influxql_columnar(
+    influx_client,
+    query: str,
+    database: Optional[str] = None,
+    fmt: str = "csv",
+    chunk_size: int = 20000,
+) -> pd.DataFrame:
+    """InfluxQL 쿼리 결과를 컬럼 단위로 읽습니다.
+
+    Parameters
+    ----------
+    influx_client : influxdb.InfluxDBClient
+        v1 클라이언트 (request()로 응답 본문을 직접 받음)
+    query : str
+        SELECT 쿼리
+    database : str, optional
+        데이터베이스 (없으면 클라이언트 기본값)
+    fmt : str
+        "csv" (Accept: application/csv) 또는 "json" (chunked=true)
+    chunk_size : int
+        fmt="json"일 때 조각당 행 수
+    """
+    params = {"q": query, "db": database or influx_client._database}
+    if fmt == "csv":
+        params["epoch"] = "ns"
+        response = influx_client.request(
+            "query", params=params, headers={"Accept": "application/csv"}
+        )
+        return columns_to_frame(parse_influxql_csv(response.content), "ns")
+    if fmt == "json":
+        params.update(epoch="u", chunked="true", chunk_size=chunk_size)
+        response = influx_client.request("query", params=params, stream=True)
+        try:
+            columns = parse_influxql_chunks(response.iter_lines(chunk_size=1 << 16))
+        finally:
+            response.close()
+        return columns_to_frame(columns, "u")
+    raise ValueError(f"지원하지 않는 형식: {fmt}")
+
+
+def parse_flux_csv(body: bytes) -> pd.DataFrame:
+    """Flux annotated CSV(query_raw 응답)를 DataFrame으로 파싱합니다.
+
+    #datatype 주석으로 컬럼 타입을 정하고(dateTime은 UTC Timestamp), #default로 빈 값을
+    채웁니다. 빈 줄로 구분된 여러 테이블 블록은 이어 붙입니다.
+    """
+    if isinstance(body, str):
+        body = body.encode()
+    frames = []
+    for block in re.split(rb"\r?\n\r?\n", body):
+        lines = block.strip(b"\r\n").splitlines()
+        annotations = {}
+        while lines and lines[0].startswith(b"#"):
+            key, *values = lines.pop(0).decode().rstrip("\r").split(",")
+            annotations[key] = values
+        if not lines:
+            continue
+
+        header = lines[0].decode().rstrip("\r").split(",")
+        if "error" in header:
+            error = pd.read_csv(io.BytesIO(b"\n".join(lines)), dtype=str)
+            raise RuntimeError(f"Flux 쿼리 오류: {error['error'].iloc[0]}")
+        # 주석 행의 첫 칸은 주석 이름이므로 헤더의 첫 (빈) 컬럼과 짝이 맞음
+        datatypes = dict(zip(header[1:], annotations.get("#datatype", [])))
+        defaults = dict(zip(header[1:], annotations.get("#default", [])))
+        frame = pd.read_csv(
+            io.BytesIO(b"\n".join(lines)),
+            # long은 빈 값이 있을 수 있어 pandas 추론에 맡김
+            dtype={
+                name: _FLUX_DTYPES[kind]
+                for name, kind in datatypes.items()
+                if kind in _FLUX_DTYPES
+            },
+            engine="c",
+            float_precision="round_trip",
+        )
+        frame = frame.drop(
+            columns=[c for c in frame.columns if c.startswith("Unnamed")]
+        )
+        for name, kind in datatypes.items():
+            if name not in frame.columns:
+                continue
+            if kind.startswith("dateTime"):
+                frame[name] = pd.to_datetime(frame[name], utc=True, format="ISO8601")
+            if defaults.get(name):
+                frame[name] = frame[name].fillna(defaults[name])
+        frames.append(frame)
+
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+
+
+def query_flux_columnar(query_api, query: str) -> pd.DataFrame:
+    """Flux 쿼리를 query_raw로 실행하여 FluxRecord 생성 없이 DataFrame으로 반환합니다."""
+    response = query_api.query_raw(query)
+    try:
+        return parse_flux_csv(response.data)
+    finally:
+        response.release_conn()
+
+
+def _dict_path_frame(payload: dict) -> pd.DataFrame:
+    """read_data와 같은 행 단위(dict) 변환 (벤치마크 비교용)"""
+    from influxdb.resultset import ResultSet
+
+    data = pd.DataFrame(ResultSet(payload["results"][0]).get_points())
+    data[TIME_COL] = pd.to_datetime(data.pop("time"))
+    data.columns = [c.lower() if c != TIME_COL else c for c in data.columns]
+    return data
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    from local_influxdb import LocalInfluxDBServer, load_frame, synthetic_history
+    from test_influxdb_realtime import REALTIME_COLUMNS, SRS1InfluxDBClient
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", type=str, default=None, help="실제 InfluxDB 주소")
+    parser.add_argument("--port", type=int, default=8086)
+    parser.add_argument("--data_path", type=str, default="Data/test_sample.csv")
+    parser.add_argument("--hours", type=float, default=24.0)
+    parser.add_argument("--end_time", type=str, default=None, help="조회 끝 시각 (UTC)")
+    parser.add_argument("--chunk_size", type=int, default=20000)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    # 조회 / 서버 로그가 측정 결과에 섞이지 않도록 경고 이상만 출력
+    logging.getLogger().setLevel(logging.WARNING)
+    server = None
+    if args.host:
+        client = SRS1InfluxDBClient(host=args.host, port=args.port, verbose=False)
+        end_time = pd.Timestamp(args.end_time or pd.Timestamp.now())
+    else:
+        history = synthetic_history(load_frame(args.data_path), args.hours)
+        server = LocalInfluxDBServer(history).start()
+        client = SRS1InfluxDBClient(host=server.host, port=server.port, verbose=False)
+        end_time = pd.Timestamp(args.end_time or history[TIME_COL].max())
+
+    columns = [c for c in REALTIME_COLUMNS if c != TIME_COL]
+    range_seconds = int(args.hours * 3600)
+    query = client._make_read_query(columns, end_time, range_seconds)
+    params = {"q": query, "db": client.database}
+
+    def best_of(fn):
+        """fn을 repeats번 실행하여 (마지막 결과, 최소 초)를 반환합니다."""
+        elapsed, result = [], None
+        for _ in range(args.repeats):
+            start = time.perf_counter()
+            result = fn()
+            elapsed.append(time.perf_counter() - start)
+        return result, min(elapsed)
+
+    paths = {
+        "dict (read_data)": lambda: client.read_data(columns, end_time, range_seconds),
+        "csv (columnar)": lambda: client.read_data_columnar(
+            columns, end_time, range_seconds, fmt="csv"
+        ),
+        "chunked json (columnar)": lambda: client.read_data_columnar(
+            columns, end_time, range_seconds, fmt="json", chunk_size=args.chunk_size
+        ),
+    }
+    # 응답 본문을 미리 받아 두고 파싱(클라이언트 CPU)만 따로 측정
+    json_body = client.client.request("query", params=params).content
+    csv_body = client.client.request(
+        "query", params=dict(params, epoch="ns"), headers={"Accept": "application/csv"}
+    ).content
+    chunk_lines = (
+        client.client.request(
+            "query",
+            params=dict(params, epoch="u", chunked="true", chunk_size=args.chunk_size),
+        )
+        .content.strip()
+        .split(b"\n")
+    )
+    parsers = {
+        "dict (read_data)": lambda: _dict_path_frame(json.loads(json_body)),
+        "csv (columnar)": lambda: columns_to_frame(parse_influxql_csv(csv_body)),
+        "chunked json (columnar)": lambda: columns_to_frame(
+            parse_influxql_chunks(chunk_lines), "u"
+        ),
+    }
+
+    print(
+        f"🚀 컬럼 단위 수집 벤치마크: {args.hours:g}시간, 컬럼 {len(columns)}개 "
+        f"({'실제 InfluxDB' if args.host else '로컬 InfluxDB'})"
+    )
+    print("=" * 60)
+    frames = {}
+    try:
+        for name in paths:
+            frames[name], total = best_of(paths[name])
+            _, parse = best_of(parsers[name])
+            rows = len(frames[name])
+            print(
+                f"   {name:24s} {rows:7d}행 | 종단 {rows / total:10,.0f} rows/s "
+                f"({total * 1000:6.0f}ms) | 파싱 {rows / parse:10,.0f} rows/s "
+                f"({parse * 1000:6.0f}ms)"
+            )
+    finally:
+        client.client.close()
+        if server is not None:
+            server.stop()
+
+    # 시각 해상도(us / ns)만 다를 수 있으므로 dtype은 비교하지 않음
+    baseline = frames["dict (read_data)"]
+    for name, frame in frames.items():
+        try:
+            pd.testing.assert_frame_equal(frame, baseline, check_dtype=False)
+            print(f"🔍 {name}: read_data와 일치")
+        except AssertionError as e:
+            print(f"🔍 {name}: read_data와 불일치 ({e})")
@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+학습된 LightGBM 모델에서 더 가벼운 변형 모델을 만들고, 정확도와 지연시간을 함께 비교하는 도구
+지연시간 예산 안에서 가장 정확한 모델을 고를 수 있도록 다음 변형을 평가합니다.
+
+- 반복 수 절단: 앞쪽 k개 트리만 사용 (num_iteration=k)
+- 저이득 트리 제거: 분할 이득 합이 가장 큰 트리 대비 일정 비율 미만인 트리 제외
+- 상위 K 피처 재학습: gain 중요도 상위 K개 피처로 같은 하이퍼파라미터로 재학습
+
+정확도는 실험 노트북과 같은 방식으로 test_df의 NOx_bin(10 단위 구간)별 MAE / RMSE를 계산하며,
+target 컬럼이 없으면 nox_value를 150초 뒤로 매핑하여 생성합니다.
+
+사용 예:
+    python compact_models.py --test_path Data/test_df.parquet --latency_budget_ms 0.5
+    python compact_models.py --train_path Data/train_df.parquet --top_k 50 100 200
+"""
+
+import logging
+import os
+import pickle
+import time
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from flat_tree_model import FlatTreeModel
+
+logger = logging.getLogger(__name__)
+
+TIME_COL = "_time_gateway"
+NOX_COL = "nox_value"
+TARGET_DELTA_SEC = 150
+NOX_BINS = np.arange(0, 120, 10)
+
+
+def load_frame(path: str) -> pd.DataFrame:
+    """CSV 또는 parquet 데이터를 읽습니다."""
+    if path.endswith(".parquet"):
+        df = pd.read_parquet(path)
+    else:
+        df = pd.read_csv(path)
+    if TIME_COL in df.columns:
+        df[TIME_COL] = pd.to_datetime(df[TIME_COL])
+    return df
+
+
+def ensure_target(df: pd.DataFrame, delta_sec: int = TARGET_DELTA_SEC) -> pd.DataFrame:
+    """target 컬럼이 없으면 delta_sec초 뒤의 nox_value로 생성하고, 결측 타겟 행은 제외합니다."""
+    if "target" not in df.columns:
+        target_df = df[[TIME_COL, NOX_COL]].copy()
+        target_df[TIME_COL] = target_df[TIME_COL] - pd.Timedelta(seconds=delta_sec)
+        target_df = target_df.rename(columns={NOX_COL: "target"})
+        df = pd.merge(df, target_df, on=TIME_COL, how="left")
+    return df.dropna(subset=["target"]).reset_index(drop=True)
+
+
+def custom_weight(value) -> float:
+    """실험 노트북과 같은 타겟 구간별 학습 가중치"""
+    if pd.isna(value) or value < 20:
+        return 1.0
+    elif value < 30:
+        return 1.5
+    elif value < 40:
+        return 3.0
+    elif value >= 60:
+        return 3.0
+    return 2.0
+
+
+def tree_gains(booster) -> np.ndarray:
+    """트리별 분할 이득(split_gain) 합계를 반환합니다."""
+
+    def _sum_gain(node) -> float:
+        if "split_gain" not in node:
+            return 0.0
+        return (
+            float(node["split_gain"])
+            + _sum_gain(node["left_child"])
+            + _sum_gain(node["right_child"])
+        )
+
+    return np.array(
+        [
+            _sum_gain(tree["tree_structure"])
+            for tree in booster.dump_model()["tree_info"]
+        ]
+    )
+
+
+def drop_low_gain_trees(flat_model: FlatTreeModel, gains: np.ndarray, ratio: float):
+    """최대 트리 이득 대비 ratio 미만인 트리를 제외합니다.
+
+    첫 번째 트리는 초기 예측값(boost_from_average)을 포함하므로 항상 유지합니다.
+    """
+    keep = [0] + [t for t in range(1, len(gains)) if gains[t] >= ratio * gains.max()]
+    return flat_model.select_trees(keep), len(keep)
+
+
+def retrain_top_k(model, train_df: pd.DataFrame, feature_names: List[str], k: int):
+    """gain 중요도 상위 k개 피처로 같은 하이퍼파라미터의 모델을 재학습합니다."""
+    import lightgbm as lgb
+
+    importance = model.booster_.feature_importance(importance_type="gain")
+    order = np.argsort(importance)[::-1][:k]
+    top_features = [feature_names[i] for i in sorted(order)]
+
+    params = model.get_params()
+    params["verbose"] = -1
+    compact_model = lgb.LGBMRegressor(**params)
+    compact_model.fit(
+        train_df[top_features],
+        train_df["target"],
+        sample_weight=train_df["target"].apply(custom_weight),
+    )
+    return compact_model, top_features
+
+
+def bin_metrics(actual: np.ndarray, predicted: np.ndarray) -> pd.DataFrame:
+    """NOx_bin별 count / MAE / RMSE"""
+    result_df = pd.DataFrame({"actual": actual, "error": actual - predicted})
+    result_df["NOx_bin"] = pd.cut(result_df["actual"], bins=NOX_BINS, right=False)
+    grouped = result_df.groupby("NOx_bin", observed=True)["error"]
+    return pd.DataFrame(
+        {
+            "count": grouped.count(),
+            "MAE": grouped.apply(lambda e: np.mean(np.abs(e))),
+            "RMSE": grouped.apply(lambda e: np.sqrt(np.mean(e**2))),
+        }
+    )
+
+
+def measure_latency_ms(
+    predict_fn, X: np.ndarray, batch_size: int, repeats: int
+) -> Dict[str, float]:
+    """batch_size 행 예측의 p50 / p99 지연시간(ms)"""
+    reps = int(np.ceil(batch_size / len(X)))
+    batch = np.ascontiguousarray(np.tile(X, (reps, 1))[:batch_size])
+    predict_fn(batch)  # 워밍업
+    latencies = []
+    for i in range(repeats):
+        if batch_size == 1:
+            row = X[i % len(X) : i % len(X) + 1]
+        else:
+            row = batch
+        start = time.perf_counter()
+        predict_fn(row)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return {
+        "p50": float(np.percentile(latencies, 50)),
+        "p99": float(np.percentile(latencies, 99)),
+    }
+
+
+class Variant:
+    """평가 대상 모델 변형 (이름, 예측 함수, 사용 피처, 트리 수)"""
+
+    def __init__(self, name: str, predict_fn, features: List[str], num_trees: int):
+        self.name = name
+        self.predict_fn = predict_fn
+        self.features = features
+        self.num_trees = num_trees
+        self.model = None
+
+
+def build_variants(
+    model,
+    truncate_iterations: Sequence[int],
+    gain_ratios: Sequence[float],
+    top_k: Sequence[int],
+    train_df: Optional[pd.DataFrame] = None,
+) -> List[Variant]:
+    booster = model.booster_
+    feature_names = booster.feature_name()
+    num_trees = booster.num_trees()
+    flat_model = FlatTreeModel.from_model(model)
+
+    variants = [
+        Variant(
+            "original",
+            lambda X: model.predict(X, num_threads=1),
+            feature_names,
+            num_trees,
+        ),
+        Variant("original_flat", flat_model.predict, feature_names, num_trees),
+    ]
+
+    for k in sorted(set(truncate_iterations)):
+        if k >= num_trees:
+            continue
+        truncated = FlatTreeModel.from_booster(booster, num_iteration=k)
+        variant = Variant(f"truncate_{k}", truncated.predict, feature_names, k)
+        variant.model = truncated
+        variants.append(variant)
+
+    if gain_ratios:
+        gains = tree_gains(booster)
+        for ratio in sorted(set(gain_ratios)):
+            pruned, kept = drop_low_gain_trees(flat_model, gains, ratio)
+            variant = Variant(f"gain_ge_{ratio:g}", pruned.predict, feature_names, kept)
+            variant.model = pruned
+            variants.append(variant)
+
+    if top_k:
+        if train_df is None:
+            logger.warning("학습 데이터가 없어 상위 K 피처 재학습을 건너뜁니다.")
+        else:
+            for k in sorted(set(top_k)):
+                if k >= len(feature_names):
+                    continue
+                compact_model, top_features = retrain_top_k(
+                    model, train_df, feature_names, k
+                )
+                compact_flat = FlatTreeModel.from_model(compact_model)
+                variant = Variant(
+                    f"top{k}_features",
+                    compact_flat.predict,
+                    top_features,
+                    compact_flat.num_trees,
+                )
+                variant.model = compact_model
+                variants.append(variant)
+    return variants
+
+
+def evaluate_variants(
+    variants: List[Variant],
+    test_df: pd.DataFrame,
+    batch_size: int = 1000,
+    repeats: int = 200,
+) -> pd.DataFrame:
+    """변형별 전체 / NOx_bin별 정확도와 단건·배치 지연시간을 계산합니다."""
+    actual = test_df["target"].to_numpy(np.float64)
+    rows = []
+    for variant in variants:
+        X = test_df[variant.features].to_numpy(np.float64)
+        predicted = np.asarray(variant.predict_fn(X))
+        error = actual - predicted
+        single = measure_latency_ms(variant.predict_fn, X, 1, repeats)
+        batch = measure_latency_ms(
+            variant.predict_fn, X, batch_size, max(repeats // 10, 5)
+        )
+
+        row = {
+            "variant": variant.name,
+            "num_trees": variant.num_trees,
+            "num_features": len(variant.features),
+            "MAE": float(np.mean(np.abs(error))),
+            "RMSE": float(np.sqrt(np.mean(error**2))),
+            "single_p50_ms": single["p50"],
+            "single_p99_ms": single["p99"],
+            f"batch{batch_size}_p50_ms": batch["p50"],
+        }
+        for nox_bin, metrics in bin_metrics(actual, predicted).iterrows():
+            row[f"MAE_{nox_bin}"] = metrics["MAE"]
+            row[f"RMSE_{nox_bin}"] = metrics["RMSE"]
+        rows.append(row)
+        logger.info(
+            f"{variant.name}: MAE={row['MAE']:.4f} RMSE={row['RMSE']:.4f} "
+            f"단건 p50={single['p50']:.3f}ms"
+        )
+    return pd.DataFrame(rows)
+
+
+def choose_variant(
+    report: pd.DataFrame, latency_budget_ms: float, column: str = "single_p99_ms"
+) -> Optional[str]:
+    """지연시간 예산을 만족하는 변형 중 RMSE가 가장 낮은 변형 이름을 반환합니다."""
+    within = report[report[column] <= latency_budget_ms]
+    if within.empty:
+        return None
+    return within.sort_values("RMSE").iloc[0]["variant"]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model_path", type=str, default="Model/lgbm_model.pkl")
+    parser.add_argument("--test_path", type=str, default="Data/test_sample.csv")
+    parser.add_argument(
+        "--train_path", type=str, default=None, help="상위 K 피처 재학습용 데이터"
+    )
+    parser.add_argument(
+        "--truncate_iterations", type=int, nargs="*", default=[10, 25, 50, 75]
+    )
+    parser.add_argument(
+        "--gain_ratios", type=float, nargs="*", default=[0.001, 0.005, 0.01]
+    )
+    parser.add_argument("--top_k", type=int, nargs="*", default=[50, 100, 200])
+    parser.add_argument("--batch_size", type=int, default=1000)
+    parser.add_argument("--repeats", type=int, default=200)
+    parser.add_argument("--latency_budget_ms", type=float, default=None)
+    parser.add_argument("--output", type=str, default="compact_models_report.csv")
+    parser.add_argument(
+        "--save_dir", type=str, default=None, help="변형 모델 저장 디렉토리"
+    )
+    args = parser.parse_args()
+
+    with open(args.model_path, "rb") as f:
+        lgbm_model = pickle.load(f)
+
+    test_df = ensure_target(load_frame(args.test_path))
+    train_df = ensure_target(load_frame(args.train_path)) if args.train_path else None
+    print(f"📊 평가 데이터: {len(test_df):,}행")
+
+    variants = build_variants(
+        lgbm_model,
+        args.truncate_iterations,
+        args.gain_ratios,
+        args.top_k,
+        train_df=train_df,
+    )
+    report = evaluate_variants(
+        variants, test_df, batch_size=args.batch_size, repeats=args.repeats
+    )
+    report.to_csv(args.output, index=False)
+
+    summary_cols = [
+        "variant",
+        "num_trees",
+        "num_features",
+        "MAE",
+        "RMSE",
+        "single_p50_ms",
+        "single_p99_ms",
+        f"batch{args.batch_size}_p50_ms",
+    ]
+    print("\n📋 변형 모델 비교:")
+    print(report[summary_cols].to_string(index=False, float_format="%.4f"))
+    print(f"\n💾 NOx_bin별 결과 포함 보고서 저장: {args.output}")
+
+    if args.save_dir:
+        os.makedirs(args.save_dir, exist_ok=True)
+        for variant in variants:
+            if isinstance(variant.model, FlatTreeModel):
+                variant.model.save(os.path.join(args.save_dir, f"{variant.name}.npz"))
+            elif variant.model is not None:
+                with open(
+                    os.path.join(args.save_dir, f"{variant.name}.pkl"), "wb"
+                ) as f:
+                    pickle.dump(variant.model, f)
+        print(f"💾 변형 모델 저장: {args.save_dir}")
+
+    if args.latency_budget_ms is not None:
+        best = choose_variant(report, args.latency_budget_ms)
+        if best is None:
+            print(
+                f"⚠️ 단건 p99 {args.latency_budget_ms}ms 예산을 만족하는 변형이 없습니다."
+            )
+        else:
+            print(f"✅ 단건 p99 {args.latency_budget_ms}ms 예산 내 최적 변형: {best}")
@@ -0,0 +1,442 @@
+#!/usr/bin/env python3
+"""
+LightGBM 부스터를 연속된 NumPy 배열로 펼친 순수 NumPy 트리 평가기
+단건/소량 배치 예측에서 LGBMRegressor.predict의 고정 오버헤드(입력 검증, pandas 검사,
+스레드 풀 기동)를 제거하기 위해 사용합니다.
+"""
+
+import logging
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# LightGBM missing_type 코드 (include/LightGBM/tree.h 와 동일)
+MISSING_NONE = 0
+MISSING_ZERO = 1
+MISSING_NAN = 2
+_MISSING_TYPE_CODES = {"None": MISSING_NONE, "Zero": MISSING_ZERO, "NaN": MISSING_NAN}
+
+# LightGBM kZeroThreshold
+_ZERO_THRESHOLD = 1e-35
+
+# 출력 변환이 항등 함수인 objective 목록
+_IDENTITY_OBJECTIVES = (
+    "regression",
+    "regression_l1",
+    "huber",
+    "fair",
+    "quantile",
+    "mape",
+)
+
+_ARRAY_FIELDS = (
+    "split_feature",
+    "threshold",
+    "left_child",
+    "right_child",
+    "default_left",
+    "missing_type",
+    "value",
+    "tree_roots",
+)
+
+
+class FlatTreeModel:
+    """LightGBM 트리 앙상블의 평탄화 표현
+
+    모든 트리의 노드(내부 노드 + 리프)를 하나의 연속 배열에 담습니다.
+    리프 노드는 자기 자신을 좌/우 자식으로 가지므로, 모든 행과 모든 트리를
+    최대 깊이만큼 한꺼번에 전진시키는 방식으로 분기 없이 평가할 수 있습니다.
+    """
+
+    def __init__(
+        self,
+        split_feature: np.ndarray,
+        threshold: np.ndarray,
+        left_child: np.ndarray,
+        right_child: np.ndarray,
+        default_left: np.ndarray,
+        missing_type: np.ndarray,
+        value: np.ndarray,
+        tree_roots: np.ndarray,
+        feature_names: Sequence[str],
+        max_depth: int,
+    ):
+        self.split_feature = split_feature
+        self.threshold = threshold
+        self.left_child = left_child
+        self.right_child = right_child
+        self.default_left = default_left
+        self.missing_type = missing_type
+        self.value = value
+        self.tree_roots = tree_roots
+        self.feature_names = list(feature_names)
+        self.max_depth = int(max_depth)
+        # 모든 분기가 missing_type=None 이면 NaN→0 치환을 입력 단계에서 한 번만 수행
+        self._all_missing_none = not np.any(missing_type != MISSING_NONE)
+
+    @property
+    def num_trees(self) -> int:
+        return len(self.tree_roots)
+
+    @property
+    def num_features(self) -> int:
+        return len(self.feature_names)
+
+    @property
+    def nbytes(self) -> int:
+        """평탄화 배열이 차지하는 메모리 (bytes)"""
+        return sum(getattr(self, name).nbytes for name in _ARRAY_FIELDS)
+
+    @classmethod
+    def from_booster(cls, booster, num_iteration: Optional[int] = None):
+        """lightgbm.Booster를 평탄화합니다.
+
+        Parameters
+        ----------
+        booster : lightgbm.Booster
+        num_iteration : int, optional
+            사용할 부스팅 반복 수 (None이면 best_iteration 또는 전체)
+
+        Raises
+        ------
+        ValueError
+            지원하지 않는 모델 구성(다중 클래스, 범주형 분기, 비항등 출력 변환)
+        """
+        dump = booster.dump_model(num_iteration=num_iteration)
+
+        if dump.get("num_tree_per_iteration", 1) != 1:
+            raise ValueError("다중 클래스 모델은 지원하지 않습니다.")
+        if dump.get("average_output", False):
+            raise ValueError("average_output(rf) 모델은 지원하지 않습니다.")
+        objective = str(dump.get("objective", "regression")).split(" ")[0]
+        if objective not in _IDENTITY_OBJECTIVES:
+            raise ValueError(
+                f"출력 변환이 필요한 objective는 지원하지 않습니다: {objective}"
+            )
+
+        split_feature: List[int] = []
+        threshold: List[float] = []
+        left_child: List[int] = []
+        right_child: List[int] = []
+        default_left: List[bool] = []
+        missing_type: List[int] = []
+        value: List[float] = []
+        tree_roots: List[int] = []
+        max_depth = 0
+
+        def add_node(node, depth):
+            nonlocal max_depth
+            idx = len(value)
+            split_feature.append(0)
+            threshold.append(0.0)
+            left_child.append(idx)
+            right_child.append(idx)
+            default_left.append(True)
+            missing_type.append(MISSING_NONE)
+            value.append(0.0)
+
+            if "split_index" not in node:
+                value[idx] = node["leaf_value"]
+                max_depth = max(max_depth, depth)
+                return idx
+
+            if node["decision_type"] != "<=":
+                raise ValueError("범주형 분기는 지원하지 않습니다.")
+
+            split_feature[idx] = node["split_feature"]
+            threshold[idx] = node["threshold"]
+            default_left[idx] = node["default_left"]
+            missing_type[idx] = _MISSING_TYPE_CODES[node["missing_type"]]
+            left_child[idx] = add_node(node["left_child"], depth + 1)
+            right_child[idx] = add_node(node["right_child"], depth + 1)
+            return idx
+
+        for tree in dump["tree_info"]:
+            tree_roots.append(add_node(tree["tree_structure"], 0))
+
+        model = cls(
+            split_feature=np.asarray(split_feature, dtype=np.int32),
+            threshold=np.asarray(threshold, dtype=np.float64),
+            left_child=np.asarray(left_child, dtype=np.int32),
+            right_child=np.asarray(right_child, dtype=np.int32),
+            default_left=np.asarray(default_left, dtype=bool),
+            missing_type=np.asarray(missing_type, dtype=np.int8),
+            value=np.asarray(value, dtype=np.float64),
+            tree_roots=np.asarray(tree_roots, dtype=np.int32),
+            feature_names=dump["feature_names"],
+            max_depth=max_depth,
+        )
+        logger.info(
+            f"트리 평탄화 완료: 트리 {model.num_trees}개, 노드 {len(value)}개, 최대 깊이 {max_depth}"
+        )
+        return model
+
+    @classmethod
+    def from_model(cls, model, num_iteration: Optional[int] = None):
+        """LGBMRegressor 또는 Booster를 평탄화합니다."""
+        booster = getattr(model, "booster_", model)
+        if num_iteration is None:
+            best_iteration = getattr(model, "_best_iteration", None)
+            if best_iteration:
+                num_iteration = best_iteration
+        return cls.from_booster(booster, num_iteration=num_iteration)
+
+    def select_trees(self, tree_indices: Sequence[int]) -> "FlatTreeModel":
+        """지정한 트리만 남긴 새 평탄화 모델을 만듭니다. (트리 순서 유지)"""
+        tree_indices = sorted(int(t) for t in tree_indices)
+        node_end = np.append(self.tree_roots[1:], len(self.value))
+        parts = {name: [] for name in _ARRAY_FIELDS if name != "tree_roots"}
+        tree_roots = []
+        offset = 0
+        for t in tree_indices:
+            start, end = int(self.tree_roots[t]), int(node_end[t])
+            shift = offset - start
+            for name in parts:
+                values = getattr(self, name)[start:end]
+                if name in ("left_child", "right_child"):
+                    values = values + shift
+                parts[name].append(values)
+            tree_roots.append(offset)
+            offset += end - start
+
+        return FlatTreeModel(
+            tree_roots=np.asarray(tree_roots, dtype=self.tree_roots.dtype),
+            feature_names=self.feature_names,
+            max_depth=self.max_depth,
+            **{
+                name: np.concatenate(values).astype(getattr(self, name).dtype)
+                for name, values in parts.items()
+            },
+        )
+
+    def save(self, path: str) -> None:
+        """평탄화된 배열을 비압축 .npz로 저장합니다."""
+        np.savez(
+            path,
+            feature_names=np.asarray(self.feature_names, dtype=str),
+            max_depth=np.asarray(self.max_depth),
+            **{name: getattr(self, name) for name in _ARRAY_FIELDS},
+        )
+        logger.info(f"평탄화 모델 저장 완료: {path}")
+
+    @classmethod
+    def load(cls, path: str):
+        """save()로 저장한 .npz를 로드합니다."""
+        with np.load(path) as data:
+            arrays = {name: data[name] for name in _ARRAY_FIELDS}
+            feature_names = data["feature_names"].tolist()
+            max_depth = int(data["max_depth"])
+        return cls(feature_names=feature_names, max_depth=max_depth, **arrays)
+
+    def save_mmap(self, directory: str) -> None:
+        """배열을 필드별 .npy로 저장합니다. (load_mmap으로 메모리 매핑 로드 가능)"""
+        import json
+        import os
+
+        os.makedirs(directory, exist_ok=True)
+        for name in _ARRAY_FIELDS:
+            np.save(os.path.join(directory, f"{name}.npy"), getattr(self, name))
+        with open(os.path.join(directory, "meta.json"), "w") as f:
+            json.dump(
+                {"feature_names": self.feature_names, "max_depth": self.max_depth}, f
+            )
+        logger.info(f"평탄화 모델 저장 완료 (mmap): {directory}")
+
+    @classmethod
+    def load_mmap(cls, directory: str):
+        """save_mmap()으로 저장한 배열을 읽기 전용 메모리 매핑으로 로드합니다.
+
+        같은 파일을 매핑한 모든 프로세스가 페이지 캐시를 공유합니다.
+        """
+        import json
+        import os
+
+        arrays = {
+            name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r")
+            for name in _ARRAY_FIELDS
+        }
+        with open(os.path.join(directory, "meta.json")) as f:
+            meta = json.load(f)
+        return cls(
+            feature_names=meta["feature_names"], max_depth=meta["max_depth"], **arrays
+        )
+
+    def make_workspace(self, max_rows: int) -> "PredictWorkspace":
+        """predict_into()용 작업 버퍼를 미리 할당합니다."""
+        return PredictWorkspace(self, max_rows)
+
+    def predict_into(
+        self, X: np.ndarray, out: np.ndarray, workspace: "PredictWorkspace"
+    ) -> np.ndarray:
+        """미리 할당한 버퍼만 사용하여 예측합니다. (요청마다 배열을 새로 만들지 않음)
+
+        제한 사항
+        - 결측 처리 규칙(missing_type)이 None이 아닌 트리가 하나라도 있으면 버퍼를 쓰지 않고
+          self.predict(X)로 처리하므로 요청마다 배열을 새로 할당합니다.
+        - X를 그 자리에서 수정합니다(NaN → 0). 호출 후에도 원본이 필요하면 복사본을 넘깁니다.
+
+        Parameters
+        ----------
+        X : np.ndarray, shape (n_rows, n_features), float64, C-contiguous
+            입력 버퍼. NaN은 그 자리에서 0으로 치환됩니다. (호출자의 배열이 바뀜)
+        out : np.ndarray, shape (n_rows,), float64
+        workspace : PredictWorkspace
+            make_workspace(max_rows)로 만든 버퍼 (n_rows <= max_rows)
+        """
+        if not self._all_missing_none:
+            # 결측 처리 규칙이 섞인 모델은 일반 경로 사용
+            out[:] = self.predict(X)
+            return out
+
+        n_rows = len(X)
+        ws = workspace
+        np.copyto(X, 0.0, where=np.isnan(X, out=ws.nan_mask[:n_rows]))
+        flat_x = X.reshape(-1)
+
+        node = ws.node[:n_rows]
+        next_node = ws.next_node[:n_rows]
+        idx = ws.idx[:n_rows]
+        fval = ws.fval[:n_rows]
+        go_left = ws.go_left[:n_rows]
+        node[:] = self.tree_roots
+
+        for _ in range(self.max_depth):
+            np.take(self.split_feature, node, out=idx, mode="clip")
+            np.add(idx, ws.row_offset[:n_rows], out=idx)
+            np.take(flat_x, idx, out=fval, mode="clip")
+            np.take(self.threshold, node, out=ws.thr[:n_rows], mode="clip")
+            np.less_equal(fval, ws.thr[:n_rows], out=go_left)
+            np.take(self.right_child, node, out=next_node, mode="clip")
+            np.take(self.left_child, node, out=idx, mode="clip")
+            np.copyto(next_node, idx, where=go_left)
+            node, next_node = next_node, node
+
+        np.take(self.value, node, out=fval, mode="clip")
+        np.cumsum(fval, axis=1, out=ws.thr[:n_rows])
+        out[:] = ws.thr[:n_rows, -1]
+        return out
+
+    def predict(self, X) -> np.ndarray:
+        """한 행 또는 소량 배치를 예측합니다.
+
+        Parameters
+        ----------
+        X : array-like, shape (n_features,) 또는 (n_rows, n_features)
+            feature_names 순서로 정렬된 입력
+
+        Returns
+        -------
+        np.ndarray, shape (n_rows,)
+        """
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        n_rows, n_cols = X.shape
+        if n_cols != self.num_features:
+            raise ValueError(
+                f"입력 피처 수가 맞지 않습니다: {n_cols} (기대값 {self.num_features})"
+            )
+
+        if self._all_missing_none:
+            # missing_type=None 분기에서는 NaN을 0으로 취급 (LightGBM과 동일)
+            nan_mask = np.isnan(X)
+            if nan_mask.any():
+                X = np.where(nan_mask, 0.0, X)
+
+        flat_x = X.ravel()
+        row_offset = (np.arange(n_rows, dtype=np.intp) * n_cols)[:, None]
+        node = np.repeat(self.tree_roots[None, :], n_rows, axis=0)
+
+        for _ in range(self.max_depth):
+            fval = flat_x[row_offset + self.split_feature[node]]
+            if self._all_missing_none:
+                go_left = fval <= self.threshold[node]
+            else:
+                go_left = self._decide_with_missing(node, fval)
+            node = np.where(go_left, self.left_child[node], self.right_child[node])
+
+        # LightGBM과 동일하게 트리 순서대로 누적합하여 비트 단위 일치 보장
+        leaf_values = self.value[node]
+        return np.cumsum(leaf_values, axis=1)[:, -1]
+
+    def _decide_with_missing(self, node: np.ndarray, fval: np.ndarray) -> np.ndarray:
+        """missing_type별 결측 처리를 포함한 분기 판단"""
+        missing = self.missing_type[node]
+        is_nan = np.isnan(fval)
+        fval = np.where(is_nan & (missing != MISSING_NAN), 0.0, fval)
+        use_default = (
+            (missing == MISSING_ZERO) & (np.abs(fval) <= _ZERO_THRESHOLD)
+        ) | ((missing == MISSING_NAN) & is_nan)
+        return np.where(
+            use_default, self.default_left[node], fval <= self.threshold[node]
+        )
+
+
+class PredictWorkspace:
+    """FlatTreeModel.predict_into()가 사용하는 사전 할당 버퍼"""
+
+    def __init__(self, model: FlatTreeModel, max_rows: int):
+        shape = (max_rows, model.num_trees)
+        self.max_rows = max_rows
+        self.node = np.empty(shape, dtype=model.left_child.dtype)
+        self.next_node = np.empty(shape, dtype=model.left_child.dtype)
+        self.idx = np.empty(shape, dtype=model.left_child.dtype)
+        self.fval = np.empty(shape, dtype=np.float64)
+        self.thr = np.empty(shape, dtype=np.float64)
+        self.go_left = np.empty(shape, dtype=bool)
+        self.nan_mask = np.empty((max_rows, model.num_features), dtype=bool)
+        self.row_offset = (
+            np.arange(max_rows, dtype=model.left_child.dtype) * model.num_features
+        )[:, None]
+
+
+def export_flat_model(model_path: str, output_path: str) -> FlatTreeModel:
+    """피클된 LGBM 모델을 평탄화하여 .npz로 내보냅니다."""
+    import pickle
+
+    with open(model_path, "rb") as f:
+        model = pickle.load(f)
+    flat_model = FlatTreeModel.from_model(model)
+    flat_model.save(output_path)
+    return flat_model
+
+
+def verify_parity(model, flat_model: FlatTreeModel, data_path: str) -> bool:
+    """test_sample 데이터에서 LightGBM 예측과 비트 단위로 일치하는지 확인합니다."""
+    import pandas as pd
+
+    data = pd.read_csv(data_path)
+    X = data[flat_model.feature_names].to_numpy(dtype=np.float64)
+    booster = getattr(model, "booster_", model)
+    expected = booster.predict(X)
+    actual = flat_model.predict(X)
+    identical = np.array_equal(expected, actual)
+    logger.info(
+        f"예측 일치 검증: {'일치' if identical else '불일치'} "
+        f"(최대 오차 {np.max(np.abs(expected - actual)):.3e}, {len(X)}행)"
+    )
+    return identical
+
+
+if __name__ == "__main__":
+    import argparse
+    import pickle
+
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model_path", type=str, default="Model/lgbm_model.pkl")
+    parser.add_argument("--output_path", type=str, default="Model/lgbm_model_flat.npz")
+    parser.add_argument("--data_path", type=str, default="Data/test_sample.csv")
+    args = parser.parse_args()
+
+    flat = export_flat_model(args.model_path, args.output_path)
+    with open(args.model_path, "rb") as f:
+        lgbm_model = pickle.load(f)
+    if verify_parity(lgbm_model, flat, args.data_path):
+        print(f"✅ 평탄화 모델 내보내기 완료: {args.output_path}")
+    else:
+        print("❌ LightGBM 예측과 일치하지 않습니다.")
@@ -6,29 +6,111 @@ NOx 예측을 위한 Lambda 함수
 
 import json
 import logging
-import pickle
 import os
-from typing import Any, Dict
-import numpy as np
+from typing import Any, Dict, Optional
+
+# 콜드 스타트 단축을 위해 numpy / lightgbm / scikit-learn은 필요한 시점에 import 합니다.
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+MODEL_DIR = "trained_models/nox-model"
+MODEL_PATH = os.path.join(MODEL_DIR, "lgbm_model.pkl")
+# NOX_MODEL_BACKEND가 없을 때 Lambda가 사용하는 백엔드 (model_registry.MODEL_BACKENDS)
+COLD_START_BACKEND = "cold_start"
+
+# 웜 컨테이너에서 재사용할 모델 캐시
+_nox_model = None
+
 
 def load_nox_model():
-    """NOx LGBM 모델을 로드합니다."""
+    """NOx LGBM 모델을 로드합니다.
+
+    NOX_MODEL_BACKEND 환경 변수로 백엔드를 선택합니다.
+    기본값(cold_start)은 평탄화 모델(.npz)이 있으면 NumPy만으로 로드하고,
+    없으면 피클(lightgbm + scikit-learn import 필요)로 로드합니다.
+    (Lambda는 콜드 스타트의 import 시간이 예측 지연시간보다 크므로 상주 서비스의 auto와 다름)
+    onnx는 ONNX Runtime으로 lgbm_model.onnx를 로드합니다.
+    """
     try:
-        model_path = "trained_models/nox-model/lgbm_model.pkl"
-        with open(model_path, "rb") as f:
-            model = pickle.load(f)
-        logger.info("NOx 모델 로드 완료")
+        from model_registry import find_model_file, get_model_backend, load_model_file
+
+        backend = get_model_backend(default=COLD_START_BACKEND)
+        model_path = find_model_file(MODEL_DIR, backend)
+        if model_path is None:
+            raise FileNotFoundError(
+                f"{backend} 백엔드 모델 파일이 없습니다: {MODEL_DIR}"
+            )
+
+        model, _ = load_model_file(model_path)
+        logger.info(f"NOx 모델 로드 완료: {model_path} (backend={backend})")
         return model
     except Exception as e:
         logger.error(f"모델 로드 실패: {e}")
         raise
 
 
+def get_nox_model():
+    """캐시된 모델을 반환합니다. (최초 호출 시에만 로드)"""
+    global _nox_model
+    if _nox_model is None:
+        _nox_model = load_nox_model()
+    return _nox_model
+
+
+def parse_event_features(event: Dict[str, Any]):
+    """event에서 모델 입력 배열을 추출합니다.
+
+    "features"가 1차원 리스트이면 단건, 2차원 리스트이면 배치 예측으로 처리합니다.
+
+    Returns
+    -------
+    Tuple[np.ndarray, bool]
+        (n_rows, n_features) 입력 배열과 배치 여부
+    """
+    import numpy as np
+
+    if "features" in event:
+        features = np.array(event["features"], dtype=np.float64)
+        is_batch = features.ndim == 2
+        if not is_batch:
+            features = features.reshape(1, -1)
+    else:
+        # 테스트용 더미 데이터
+        features = np.random.rand(1, 10)  # 10개 특성으로 가정
+        is_batch = False
+        logger.info("테스트용 더미 데이터 사용")
+    return features, is_batch
+
+
+def make_prediction_response(
+    event: Dict[str, Any],
+    features,
+    predictions,
+    is_batch: bool,
+    extra: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """예측 결과를 Lambda 응답 형식으로 변환합니다."""
+    if is_batch:
+        body = {
+            "message": "NOx prediction completed",
+            "predictions": [float(p) for p in predictions],
+            "num_rows": len(predictions),
+        }
+    else:
+        body = {
+            "message": "NOx prediction completed",
+            "prediction": float(predictions[0]),
+            "input_features": (
+                features.tolist()[0] if "features" in event else "dummy_data"
+            ),
+        }
+    if extra:
+        body.update(extra)
+    return {"statusCode": 200, "body": json.dumps(body)}
+
+
 def nox_pred(event: Dict[str, Any], context) -> Dict[str, Any]:
     """
     NOx 예측을 수행하는 Lambda 함수
@@ -53,33 +135,38 @@ def nox_pred(event: Dict[str, Any], context) -> Dict[str, Any]:
         print("Hello from NOx Lambda function!")
         logger.info("Hello from NOx Lambda function!")
 
-        # 모델 로드
-        model = load_nox_model()
+        # 모델 로드 (웜 호출에서는 캐시 사용)
+        # "plant" 필드가 있으면 레지스트리에서 해당 라인/버전 모델을 선택
+        extra = None
+        if "plant" in event:
+            from model_registry import InvalidModelKeyError, get_default_registry
+
+            try:
+                model, model_version = get_default_registry(COLD_START_BACKEND).get(
+                    event["plant"], event.get("model_version")
+                )
+            except InvalidModelKeyError as e:
+                # 요청 데이터의 plant / model_version이 허용되지 않는 이름 또는 경로
+                logger.warning(f"잘못된 모델 요청: {e}")
+                return {
+                    "statusCode": 400,
+                    "body": json.dumps({"message": f"Invalid model request: {e}"}),
+                }
+            extra = {"plant": event["plant"], "model_version": model_version}
+        else:
+            model = get_nox_model()
 
         # 입력 데이터 처리 (예시)
         # 실제로는 event에서 필요한 특성들을 추출해야 함
-        if "features" in event:
-            features = np.array(event["features"]).reshape(1, -1)
-        else:
-            # 테스트용 더미 데이터
-            features = np.random.rand(1, 10)  # 10개 특성으로 가정
-            logger.info("테스트용 더미 데이터 사용")
-
-        # 예측 수행
-        prediction = model.predict(features)[0]
-
-        result = {
-            "statusCode": 200,
-            "body": json.dumps(
-                {
-                    "message": "NOx prediction completed",
-                    "prediction": float(prediction),
-                    "input_features": (
-                        features.tolist()[0] if "features" in event else "dummy_data"
-                    ),
-                }
-            ),
-        }
+        features, is_batch = parse_event_features(event)
+
+        # 예측 수행 (배치 크기에 맞춰 num_threads 결정)
+        from predict_threading import predict_adaptive
+
+        predictions = predict_adaptive(model, features)
+        prediction = predictions[0]
+
+        result = make_prediction_response(event, features, predictions, is_batch, extra)
 
         logger.info(f"예측 완료: {prediction}")
         return result
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+nox_pred 로컬 부하 테스트 하네스
+배포 전에 동시성/페이로드 크기/배치 크기별 지연시간을 한 대의 Linux 머신에서 오프라인으로 측정합니다.
+
+- inprocess: 동시성 수만큼 새 프로세스(= Lambda 실행 환경)를 띄워 핸들러를 직접 호출
+- rie: awslambdaric 런타임 인터페이스 에뮬레이터(RIE)로 실행한 컨테이너에 HTTP로 호출
+
+사용 예:
+    python lambda_load_test.py --concurrency 1 4 --batch_sizes 1 100 --payload_kb 0 64
+    docker run -p 9000:8080 <IMAGE_TAG>  # RIE 포함 이미지
+    python lambda_load_test.py --mode rie --rie_url http://localhost:9000
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import urllib.request
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import get_context
+
+# numpy는 함수 안에서 import 합니다. (spawn된 작업 프로세스가 메인 모듈을 다시 import할 때
+# numpy가 미리 로드되면 콜드 스타트 측정값이 실제보다 작아짐)
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+RIE_INVOKE_PATH = "/2015-03-31/functions/function/invocations"
+# 실행 환경이 실패했을 때 함께 보고할 stderr 끝부분 크기
+STDERR_TAIL_BYTES = 4000
+
+
+def make_event(n_features: int, batch_size: int, payload_kb: int, seed: int):
+    """지정한 배치 크기와 추가 페이로드 크기를 갖는 이벤트를 생성합니다."""
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    rows = rng.random((batch_size, n_features)).round(6).tolist()
+    event = {"features": rows[0] if batch_size == 1 else rows}
+    if payload_kb > 0:
+        # 실제 이벤트의 메타데이터를 흉내 내는 패딩 필드
+        event["padding"] = "x" * (payload_kb * 1024)
+    return event
+
+
+def _read_tail(f, size: int = STDERR_TAIL_BYTES) -> str:
+    f.flush()
+    f.seek(max(0, f.seek(0, os.SEEK_END) - size))
+    return f.read().decode("utf-8", errors="replace")
+
+
+def _run_instance(workdir: str, events: list) -> dict:
+    """새 프로세스에서 Lambda 실행 환경 하나를 흉내 냅니다.
+
+    첫 호출은 import + 모델 로드를 포함한 콜드 호출로 기록됩니다.
+    핸들러의 stdout은 버리고, stderr(로그 / 트레이스백)는 임시 파일에 받아 오류 응답이
+    있거나 예외가 발생하면 끝부분을 함께 반환합니다.
+    """
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, 1)
+    stderr_file = tempfile.TemporaryFile()
+    os.dup2(stderr_file.fileno(), 2)
+
+    os.chdir(workdir)
+    sys.path.insert(0, REPO_DIR)
+
+    latencies = []
+    errors = 0
+    try:
+        start = time.perf_counter()
+        import lambda_func
+
+        init_ms = (time.perf_counter() - start) * 1000
+        for event in events:
+            t0 = time.perf_counter()
+            response = lambda_func.nox_pred(event, None)
+            latencies.append((time.perf_counter() - t0) * 1000)
+            if response["statusCode"] != 200:
+                errors += 1
+    except BaseException:
+        import traceback
+
+        traceback.print_exc()
+        sys.stderr.flush()
+        raise RuntimeError(
+            f"실행 환경 실패 (pid={os.getpid()})\n{_read_tail(stderr_file)}"
+        ) from None
+
+    sys.stderr.flush()
+    return {
+        "cold_ms": init_ms + latencies[0],
+        "warm_ms": latencies[1:],
+        "errors": errors,
+        # ru_maxrss는 fork 이전 부모 값이 남으므로 exec 이후 기준인 VmHWM 사용
+        "max_rss_mb": read_vm_hwm_mb(os.getpid()),
+        "stderr_tail": _read_tail(stderr_file) if errors else "",
+    }
+
+
+def run_inprocess(workdir: str, events: list, concurrency: int) -> dict:
+    """동시성 수만큼 새 프로세스를 띄워 각각 events를 순차 호출합니다.
+
+    max_tasks_per_child=1로 실행 환경마다 새 프로세스를 쓰므로, 모든 콜드 측정값이
+    import + 모델 로드를 포함합니다. (작업 프로세스를 재사용하면 두 번째부터 웜 상태)
+    """
+    ctx = get_context("spawn")
+    start = time.perf_counter()
+    with ProcessPoolExecutor(
+        max_workers=concurrency, mp_context=ctx, max_tasks_per_child=1
+    ) as pool:
+        futures = [
+            pool.submit(_run_instance, workdir, events) for _ in range(concurrency)
+        ]
+        instances = [f.result() for f in futures]
+    wall_s = time.perf_counter() - start
+
+    return {
+        "cold_ms": [inst["cold_ms"] for inst in instances],
+        "warm_ms": [lat for inst in instances for lat in inst["warm_ms"]],
+        "errors": sum(inst["errors"] for inst in instances),
+        "max_rss_mb": max(inst["max_rss_mb"] for inst in instances),
+        "invocations": concurrency * len(events),
+        "wall_s": wall_s,
+        "stderr_tail": next(
+            (inst["stderr_tail"] for inst in instances if inst["stderr_tail"]), ""
+        ),
+    }
+
+
+def _invoke_rie(url: str, payload: bytes):
+    request = urllib.request.Request(
+        url, data=payload, headers={"Content-Type": "application/json"}
+    )
+    t0 = time.perf_counter()
+    with urllib.request.urlopen(request, timeout=60) as resp:
+        body = json.loads(resp.read())
+    return (time.perf_counter() - t0) * 1000, body.get("statusCode", 500) == 200
+
+
+def read_vm_hwm_mb(pid: int):
+    """/proc/<pid>/status의 VmHWM(메모리 최고 사용량)을 MB로 읽습니다."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return float("nan")
+
+
+def run_rie(
+    rie_url: str,
+    events: list,
+    concurrency: int,
+    rie_pid: int = None,
+    cold: bool = True,
+):
+    """RIE 엔드포인트에 동시성 수만큼 스레드로 호출합니다.
+
+    RIE는 컨테이너 하나를 계속 재사용하므로 컨테이너 기동 후 첫 호출만 콜드입니다.
+    같은 컨테이너로 여러 조합을 측정할 때는 첫 조합만 cold=True로 호출하고, 이후 조합의
+    첫 호출은 웜 지연시간으로 기록합니다.
+    """
+    url = rie_url.rstrip("/") + RIE_INVOKE_PATH
+    payloads = [json.dumps(event).encode() for event in events]
+
+    first_ms, first_ok = _invoke_rie(url, payloads[0])
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(
+            pool.map(
+                lambda p: _invoke_rie(url, p),
+                [p for _ in range(concurrency) for p in payloads],
+            )
+        )
+    wall_s = time.perf_counter() - start
+
+    # 처리량(invocations / wall_s)은 동시 호출 구간만으로 계산
+    return {
+        "cold_ms": [first_ms] if cold else [],
+        "warm_ms": ([] if cold else [first_ms]) + [lat for lat, _ in results],
+        "errors": sum(1 for _, ok in results if not ok) + (not first_ok),
+        "max_rss_mb": read_vm_hwm_mb(rie_pid) if rie_pid else float("nan"),
+        "invocations": len(results),
+        "wall_s": wall_s,
+    }
+
+
+def print_histogram(title: str, values, bins: int = 10):
+    """지연시간 분포를 텍스트 히스토그램으로 출력합니다."""
+    import numpy as np
+
+    values = np.asarray(values)
+    if len(values) == 0:
+        return
+    print(f"   {title} (n={len(values)})")
+    counts, edges = np.histogram(values, bins=min(bins, max(1, len(values))))
+    scale = 40 / max(counts.max(), 1)
+    for count, lo, hi in zip(counts, edges[:-1], edges[1:]):
+        print(f"     {lo:9.2f} ~ {hi:9.2f} ms | {'#' * int(count * scale):<40} {count}")
+
+
+def report(result: dict):
+    """콜드/웜 지연시간, 처리량, 메모리 최고 사용량을 출력합니다."""
+    import numpy as np
+
+    warm = np.asarray(result["warm_ms"])
+    cold = np.asarray(result["cold_ms"])
+    if len(cold):
+        print(
+            f"   콜드: median={np.median(cold):.1f}ms max={cold.max():.1f}ms "
+            f"(n={len(cold)})"
+        )
+    else:
+        print("   콜드: 없음 (이미 기동한 RIE 컨테이너, 첫 조합에서만 측정)")
+    if len(warm):
+        print(
+            f"   웜: p50={np.percentile(warm, 50):.2f}ms "
+            f"p90={np.percentile(warm, 90):.2f}ms p99={np.percentile(warm, 99):.2f}ms"
+        )
+    print(
+        f"   처리량: {result['invocations'] / result['wall_s']:.1f} req/s "
+        f"(호출 {result['invocations']}회, {result['wall_s']:.2f}s)"
+    )
+    print(f"   메모리 최고 사용량: {result['max_rss_mb']:.1f} MB")
+    if result["errors"]:
+        print(f"   ❌ 오류 응답: {result['errors']}회")
+        if result.get("stderr_tail"):
+            print("   --- 실행 환경 stderr (끝부분) ---")
+            print(result["stderr_tail"])
+    print_histogram("콜드 지연시간 분포", cold)
+    print_histogram("웜 지연시간 분포", warm)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mode", choices=["inprocess", "rie"], default="inprocess")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--batch_sizes", type=int, nargs="+", default=[1, 100])
+    parser.add_argument("--payload_kb", type=int, nargs="+", default=[0])
+    parser.add_argument(
+        "--invocations", type=int, default=50, help="실행 환경당 호출 수"
+    )
+    parser.add_argument("--n_features", type=int, default=358)
+    parser.add_argument(
+        "--workdir",
+        type=str,
+        default=None,
+        help="trained_models/nox-model이 있는 디렉토리 (없으면 Model/lgbm_model.pkl로 생성)",
+    )
+    parser.add_argument("--model_path", type=str, default="Model/lgbm_model.pkl")
+    parser.add_argument("--rie_url", type=str, default="http://localhost:9000")
+    parser.add_argument("--rie_pid", type=int, default=None, help="VmHWM을 읽을 PID")
+    args = parser.parse_args()
+
+    workdir = args.workdir
+    cleanup_workdir = args.mode == "inprocess" and workdir is None
+    if cleanup_workdir:
+        from profile_cold_start import prepare_workdir
+
+        workdir = prepare_workdir(os.path.abspath(args.model_path), use_flat=True)
+
+    print("🚀 nox_pred 부하 테스트 시작")
+    print("=" * 60)
+    # RIE 컨테이너는 조합마다 재시작하지 않으므로 콜드 호출은 첫 조합에서 한 번뿐
+    rie_cold = True
+    try:
+        for payload_kb in args.payload_kb:
+            for batch_size in args.batch_sizes:
+                events = [
+                    make_event(args.n_features, batch_size, payload_kb, seed=i)
+                    for i in range(args.invocations)
+                ]
+                for concurrency in args.concurrency:
+                    print(
+                        f"\n📊 mode={args.mode} concurrency={concurrency} "
+                        f"batch={batch_size} payload={payload_kb}KB"
+                    )
+                    if args.mode == "inprocess":
+                        result = run_inprocess(workdir, events, concurrency)
+                    else:
+                        result = run_rie(
+                            args.rie_url,
+                            events,
+                            concurrency,
+                            args.rie_pid,
+                            cold=rie_cold,
+                        )
+                        rie_cold = False
+                    report(result)
+    finally:
+        if cleanup_workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,820 @@
+#!/usr/bin/env python3
+"""
+오프라인 테스트 / 벤치마크용 로컬 InfluxDB 대체 서버
+플랜트 InfluxDB(10.238.x.x)에 접속하지 않고도 조회 경로를 실행할 수 있도록, CSV / parquet의
+SRS1 스키마 데이터를 InfluxQL(v1, /query)과 Flux(v2, /api/v2/query) HTTP API로 제공합니다.
+influxdb.InfluxDBClient와 influxdb_client.InfluxDBClient를 그대로 사용할 수 있습니다.
+
+- v1: SHOW DATABASES / SHOW MEASUREMENTS, SELECT ... FROM SRS1 WHERE time 범위
+  (절대 시각 또는 now() - 기간), ORDER BY time [DESC], LIMIT
+  FROM "<컬럼>"으로 조회하면 해당 컬럼을 value 필드로 반환합니다.
+- v1: SELECT mean / min / max("컬럼") ... GROUP BY time(d) [fill(none)] 집계 쿼리
+- v2: range / filter(_measurement ==) / last() / aggregateWindow / pivot 조합의 Flux 쿼리
+  (realtime_nox_prediction의 실시간 특성 쿼리) — 컬럼 하나를 측정값 하나로 취급
+- v1 /query는 Accept: application/csv이면 CSV(name,tags,time,...)로, chunked=true이면
+  chunk_size 행 단위의 줄 구분 JSON(partial 표시)으로 응답합니다. (columnar_ingest 확인용)
+- /write, /api/v2/write로 들어온 line protocol은 written에 보관 (prediction_sink 확인용)
+- 응답 지연(latency_ms, jitter_ms)과 장애(failure_rate, fail_next, 상태 코드 / 연결 끊김)를
+  주입할 수 있습니다.
+- now()와 Flux 상대 범위의 기준 시각은 기본적으로 데이터의 마지막 시각 직후이며, set_now()로
+  바꿀 수 있습니다. (재생 / 리플레이용)
+
+사용 예:
+    python local_influxdb.py --data_path Data/test_sample.csv --port 8086 --latency_ms 20
+
+    with LocalInfluxDBServer.from_file("Data/test_sample.csv") as server:
+        client = SRS1InfluxDBClient(host=server.host, port=server.port)
+"""
+
+import gzip
+import json
+import logging
+import random
+import re
+import socket
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+TIME_COL = "_time_gateway"
+DEFAULT_MEASUREMENT = "SRS1"
+
+_DURATION_UNITS = {
+    "ns": 1e-9,
+    "us": 1e-6,
+    "µs": 1e-6,
+    "u": 1e-6,
+    "ms": 1e-3,
+    "s": 1,
+    "m": 60,
+    "h": 3600,
+    "d": 86400,
+    "w": 604800,
+}
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ns|us|µs|u|ms|s|m|h|d|w)")
+_EPOCH_SCALE = {"ns": 1, "u": 1000, "ms": 10**6, "s": 10**9, "m": 6 * 10**10}
+_AGGREGATES = {
+    "min": np.minimum.reduceat,
+    "max": np.maximum.reduceat,
+    "sum": np.add.reduceat,
+    "count": lambda values, starts: np.diff(np.r_[starts, len(values)]).astype(float),
+    "first": lambda values, starts: values[starts],
+    "last": lambda values, starts: values[np.r_[starts[1:], len(values)] - 1],
+}
+
+
+def synthetic_history(sample: pd.DataFrame, hours: float) -> pd.DataFrame:
+    """샘플 행을 반복하여 1초 주기 hours 시간 분량의 SRS1 데이터를 만듭니다. (벤치마크용)"""
+    n_rows = int(hours * 3600)
+    repeated = sample.iloc[np.arange(n_rows) % len(sample)].reset_index(drop=True)
+    start = pd.to_datetime(sample[TIME_COL]).min()
+    repeated[TIME_COL] = start + pd.to_timedelta(np.arange(n_rows), unit="s")
+    return repeated
+
+
+def parse_duration(text: str) -> pd.Timedelta:
+    """InfluxQL / Flux 기간 문자열(예: 1h, 5m30s, -5m)을 Timedelta로 변환합니다."""
+    text = text.strip()
+    sign = -1 if text.startswith("-") else 1
+    parts = _DURATION_RE.findall(text.lstrip("+-"))
+    if not parts:
+        raise ValueError(f"기간 형식 오류: {text}")
+    seconds = sum(float(value) * _DURATION_UNITS[unit] for value, unit in parts)
+    return pd.Timedelta(seconds=sign * seconds)
+
+
+def load_frame(path: str) -> pd.DataFrame:
+    """CSV / parquet 파일을 읽어 UTC 시각 컬럼(_time_gateway)을 가진 DataFrame으로 반환"""
+    if str(path).endswith(".parquet"):
+        data = pd.read_parquet(path)
+    else:
+        data = pd.read_csv(path)
+    if TIME_COL not in data.columns and "time" in data.columns:
+        data = data.rename(columns={"time": TIME_COL})
+    return data
+
+
+class SRS1Store:
+    """시간순 정렬된 SRS1 데이터 (시각 int64 ns + 컬럼별 float64 배열)
+
+    컬럼 이름은 대소문자를 구분하지 않고 찾습니다. (InfluxDB는 대문자, 로컬 데이터는 소문자)
+    """
+
+    def __init__(self, data: pd.DataFrame):
+        times = pd.to_datetime(data[TIME_COL])
+        if times.dt.tz is not None:
+            times = times.dt.tz_convert("UTC").dt.tz_localize(None)
+        order = np.argsort(times.to_numpy("datetime64[ns]"), kind="stable")
+        self.times = times.to_numpy("datetime64[ns]").astype(np.int64)[order]
+        self.columns: Dict[str, np.ndarray] = {}
+        for col in data.columns:
+            if col == TIME_COL:
+                continue
+            values = pd.to_numeric(data[col], errors="coerce")
+            self.columns[col.lower()] = values.to_numpy(dtype=np.float64)[order]
+
+    @property
+    def last_time_ns(self) -> int:
+        return int(self.times[-1]) if len(self.times) else time.time_ns()
+
+    def has_column(self, name: str) -> bool:
+        return name.lower() in self.columns
+
+    def column(self, name: str) -> np.ndarray:
+        return self.columns[name.lower()]
+
+    def window(
+        self, start_ns: Optional[int], stop_ns: Optional[int], include_start=False
+    ) -> slice:
+        """start < time <= stop (include_start=True이면 start <= time < stop) 구간"""
+        if include_start:
+            lo = (
+                0 if start_ns is None else np.searchsorted(self.times, start_ns, "left")
+            )
+            hi = (
+                len(self.times)
+                if stop_ns is None
+                else np.searchsorted(self.times, stop_ns, "left")
+            )
+        else:
+            lo = (
+                0
+                if start_ns is None
+                else np.searchsorted(self.times, start_ns, "right")
+            )
+            hi = (
+                len(self.times)
+                if stop_ns is None
+                else np.searchsorted(self.times, stop_ns, "right")
+            )
+        return slice(int(lo), int(hi))
+
+    def aggregate(
+        self, name: str, window: slice, every_ns: int, fn: str
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """구간 내 한 컬럼을 epoch 기준 every_ns 간격으로 집계합니다.
+
+        Returns
+        -------
+        Tuple[np.ndarray, np.ndarray]
+            (구간 시작 시각 ns, 집계 값) — 값이 하나도 없는 구간은 제외
+        """
+        times = self.times[window]
+        values = self.column(name)[window]
+        valid = ~np.isnan(values)
+        times, values = times[valid], values[valid]
+        if not len(times):
+            return np.empty(0, dtype=np.int64), np.empty(0)
+
+        buckets = times // every_ns
+        starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+        if fn == "mean":
+            sums = np.add.reduceat(values, starts)
+            counts = np.diff(np.r_[starts, len(values)])
+            result = sums / counts
+        elif fn in _AGGREGATES:
+            result = _AGGREGATES[fn](values, starts)
+        else:
+            raise ValueError(f"지원하지 않는 집계 함수: {fn}")
+        return buckets[starts] * every_ns, result
+
+
+def _rfc3339(time_ns: int) -> str:
+    return (
+        pd.Timestamp(time_ns).strftime("%Y-%m-%dT%H:%M:%S.%fZ").replace(".000000Z", "Z")
+    )
+
+
+def _json_value(value: float):
+    return None if np.isnan(value) else float(value)
+
+
+def render_influxql_csv(result: dict) -> bytes:
+    """InfluxQL 결과를 InfluxDB 1.x의 CSV 응답 형식(name,tags,time,필드...)으로 변환합니다."""
+    lines = []
+    for statement in result["results"]:
+        if "error" in statement:
+            raise ValueError(statement["error"])
+        for series in statement.get("series", []):
+            lines.append(",".join(["name", "tags"] + series["columns"]))
+            prefix = f"{series['name']},"
+            lines.extend(
+                prefix + "," + ",".join("" if v is None else str(v) for v in row)
+                for row in series["values"]
+            )
+    return ("\n".join(lines) + "\n").encode() if lines else b""
+
+
+def render_influxql_chunks(result: dict, chunk_size: int) -> bytes:
+    """InfluxQL 결과를 chunked=true 응답 형식(chunk_size 행마다 JSON 한 줄)으로 변환합니다.
+
+    마지막 조각이 아닌 series / statement에는 InfluxDB와 같이 partial=true를 붙입니다.
+    """
+    chunks = []
+    for statement in result["results"]:
+        series_list = statement.get("series")
+        if not series_list:
+            chunks.append({"results": [statement]})
+            continue
+        for index, series in enumerate(series_list):
+            values = series["values"]
+            for start in range(0, max(len(values), 1), chunk_size):
+                part = dict(series, values=values[start : start + chunk_size])
+                last_chunk = start + chunk_size >= len(values)
+                if not last_chunk:
+                    part["partial"] = True
+                chunk = {"statement_id": statement["statement_id"], "series": [part]}
+                if not (last_chunk and index == len(series_list) - 1):
+                    chunk["partial"] = True
+                chunks.append({"results": [chunk]})
+    return b"".join(json.dumps(chunk).encode() + b"\n" for chunk in chunks)
+
+
+class InfluxQLEngine:
+    """read_data / 연결 테스트 스크립트가 쓰는 InfluxQL 부분 집합 실행기"""
+
+    _SELECT_RE = re.compile(
+        r"^\s*SELECT\s+(?P<fields>.+?)\s+FROM\s+(?P<source>\S+)"
+        r"(?:\s+WHERE\s+(?P<where>.+?))?"
+        r"(?:\s+GROUP\s+BY\s+time\((?P<every>\w+)\)(?:\s+fill\((?P<fill>\w+)\))?)?"
+        r"(?:\s+ORDER\s+BY\s+time(?:\s+(?P<order>ASC|DESC))?)?"
+        r"(?:\s+LIMIT\s+(?P<limit>\d+))?\s*;?\s*$",
+        re.IGNORECASE | re.DOTALL,
+    )
+    _AGGREGATE_FIELD_RE = re.compile(
+        r'^(?P<fn>\w+)\(\s*"?(?P<column>[^")]+)"?\s*\)(?:\s+AS\s+"?(?P<alias>[^"]+)"?)?$',
+        re.IGNORECASE,
+    )
+    _TIME_COND_RE = re.compile(
+        r"time\s*(?P<op>>=|<=|>|<)\s*(?P<value>'[^']*'|now\(\)(?:\s*-\s*\w+)?)",
+        re.IGNORECASE,
+    )
+
+    def __init__(self, store: SRS1Store, measurement: str, database: str):
+        self.store = store
+        self.measurement = measurement
+        self.database = database
+
+    def execute(self, query: str, now_ns: int, epoch: Optional[str]) -> dict:
+        statements = [s for s in query.split(";") if s.strip()]
+        results = []
+        for statement_id, statement in enumerate(statements):
+            result = self._execute_one(statement.strip(), now_ns, epoch)
+            result["statement_id"] = statement_id
+            results.append(result)
+        return {"results": results}
+
+    def _execute_one(self, statement: str, now_ns: int, epoch: Optional[str]) -> dict:
+        upper = statement.upper()
+        if upper.startswith("SHOW DATABASES"):
+            return self._series("databases", ["name"], [[self.database]])
+        if upper.startswith("SHOW MEASUREMENTS"):
+            return self._series("measurements", ["name"], [[self.measurement]])
+        if upper.startswith("SHOW FIELD KEYS"):
+            rows = [[name.upper(), "float"] for name in self.store.columns]
+            return self._series(self.measurement, ["fieldKey", "fieldType"], rows)
+
+        match = self._SELECT_RE.match(statement)
+        if not match:
+            return {"error": f"지원하지 않는 쿼리: {statement}"}
+
+        source = match["source"].strip('"')
+        if match["every"]:
+            return self._execute_aggregate(match, source, now_ns, epoch)
+        if source.lower() == self.measurement.lower():
+            names = [f.strip().strip('"') for f in match["fields"].split(",")]
+            if names == ["*"]:
+                names = [name.upper() for name in self.store.columns]
+            names = [n for n in names if n.lower() != "time"]
+            missing = [n for n in names if not self.store.has_column(n)]
+            names = [n for n in names if n not in missing]
+            arrays = [self.store.column(n) for n in names]
+        elif self.store.has_column(source):
+            # 컬럼별 measurement 스키마 (FROM "NOX_Value" → value 필드)
+            names, arrays = ["value"], [self.store.column(source)]
+        else:
+            return {}
+
+        start_ns, stop_ns = self._time_bounds(match["where"], now_ns)
+        window = self.store.window(start_ns, stop_ns)
+        times = self.store.times[window]
+        values = np.column_stack([a[window] for a in arrays]) if arrays else None
+
+        # InfluxDB는 모든 필드가 비어 있는 행을 반환하지 않음
+        if values is not None and len(times):
+            keep = ~np.isnan(values).all(axis=1)
+            times, values = times[keep], values[keep]
+        if match["order"] and match["order"].upper() == "DESC":
+            times, values = times[::-1], None if values is None else values[::-1]
+        if match["limit"]:
+            limit = int(match["limit"])
+            times, values = times[:limit], None if values is None else values[:limit]
+        if not len(times):
+            return {}
+        return self._rows(source, names, times, values, epoch)
+
+    def _execute_aggregate(
+        self, match, source: str, now_ns: int, epoch: Optional[str]
+    ) -> dict:
+        """SELECT fn("컬럼") AS "별칭", ... GROUP BY time(d) [fill(none)] 실행"""
+        if source.lower() != self.measurement.lower():
+            return {}
+        fields = []
+        for field in match["fields"].split(","):
+            parsed = self._AGGREGATE_FIELD_RE.match(field.strip())
+            if not parsed:
+                return {"error": f"GROUP BY time()에는 집계 함수가 필요합니다: {field}"}
+            if self.store.has_column(parsed["column"]):
+                fn = parsed["fn"].lower()
+                fields.append((parsed["column"], fn, parsed["alias"] or fn))
+
+        every_ns = parse_duration(match["every"]).value
+        start_ns, stop_ns = self._time_bounds(match["where"], now_ns)
+        window = self.store.window(start_ns, stop_ns)
+        first = (self.store.times[window][:1] // every_ns * every_ns).tolist()
+        last = self.store.times[window][-1:].tolist()
+        if not fields or not first:
+            return {}
+
+        # 전체 구간 격자에 집계 값을 배치 (fill(none)이면 값이 없는 구간 제외)
+        grid = np.arange(first[0], last[0] + 1, every_ns, dtype=np.int64)
+        values = np.full((len(grid), len(fields)), np.nan)
+        for j, (column, fn, _) in enumerate(fields):
+            starts, result = self.store.aggregate(column, window, every_ns, fn)
+            values[(starts - grid[0]) // every_ns, j] = result
+        if (match["fill"] or "null").lower() == "none":
+            keep = ~np.isnan(values).all(axis=1)
+            grid, values = grid[keep], values[keep]
+        if match["order"] and match["order"].upper() == "DESC":
+            grid, values = grid[::-1], values[::-1]
+        if match["limit"]:
+            grid, values = grid[: int(match["limit"])], values[: int(match["limit"])]
+        if not len(grid):
+            return {}
+        return self._rows(
+            source, [alias for _, _, alias in fields], grid, values, epoch
+        )
+
+    def _rows(self, source, names, times, values, epoch) -> dict:
+        if epoch:
+            time_values = (times // _EPOCH_SCALE.get(epoch, 1)).tolist()
+        else:
+            time_values = [_rfc3339(t) for t in times]
+        rows = [
+            [t] + [_json_value(v) for v in row]
+            for t, row in zip(time_values, values.tolist())
+        ]
+        return self._series(source, ["time"] + names, rows)
+
+    def _time_bounds(
+        self, where: Optional[str], now_ns: int
+    ) -> Tuple[Optional[int], Optional[int]]:
+        """WHERE 절의 time 조건을 (start 초과, stop 이하) ns 경계로 변환합니다."""
+        start_ns, stop_ns = None, None
+        for cond in self._TIME_COND_RE.finditer(where or ""):
+            value = cond["value"]
+            if value.startswith("'"):
+                bound = pd.Timestamp(value.strip("'"))
+                if bound.tzinfo is not None:
+                    bound = bound.tz_convert("UTC").tz_localize(None)
+                bound_ns = bound.value
+            else:
+                offset = value.split("-", 1)[1] if "-" in value else "0s"
+                bound_ns = now_ns - parse_duration(offset).value
+            if cond["op"] in (">", ">="):
+                start_ns = bound_ns - (1 if cond["op"] == ">=" else 0)
+            else:
+                stop_ns = bound_ns - (1 if cond["op"] == "<" else 0)
+        return start_ns, stop_ns
+
+    @staticmethod
+    def _series(name: str, columns: List[str], rows: List[list]) -> dict:
+        return {"series": [{"name": name, "columns": columns, "values": rows}]}
+
+
+class FluxEngine:
+    """실시간 특성 쿼리가 쓰는 Flux 부분 집합 실행기 (컬럼 하나 = _measurement 하나)"""
+
+    _AGGREGATE_WINDOW_RE = re.compile(
+        r"aggregateWindow\(\s*every:\s*([^,\s]+)\s*,\s*fn:\s*(\w+)"
+    )
+    _RANGE_RE = re.compile(r"range\(\s*start:\s*([^,)]+)(?:,\s*stop:\s*([^)]+))?\)")
+    _MEASUREMENT_RE = re.compile(r'r\["_measurement"\]\s*==\s*"([^"]+)"')
+    _BUCKET_RE = re.compile(r'from\(\s*bucket:\s*"([^"]+)"\s*\)')
+
+    def __init__(self, store: SRS1Store, bucket: str):
+        self.store = store
+        self.bucket = bucket
+
+    def _bound(self, text: str, now_ns: int) -> int:
+        text = text.strip()
+        if text == "now()":
+            return now_ns
+        if text.startswith("-"):
+            return now_ns + parse_duration(text).value
+        bound = pd.Timestamp(text)
+        if bound.tzinfo is not None:
+            bound = bound.tz_convert("UTC").tz_localize(None)
+        return bound.value
+
+    def execute(self, query: str, now_ns: int) -> str:
+        bucket = self._BUCKET_RE.search(query)
+        if bucket and bucket.group(1) != self.bucket:
+            raise ValueError(f'bucket "{bucket.group(1)}" not found')
+        range_match = self._RANGE_RE.search(query)
+        if not range_match:
+            raise ValueError("range() 가 필요합니다.")
+        start_ns = self._bound(range_match.group(1), now_ns)
+        stop_ns = (
+            self._bound(range_match.group(2), now_ns)
+            if range_match.group(2)
+            else now_ns
+        )
+        measurements = self._MEASUREMENT_RE.findall(query) or [
+            name.upper() for name in self.store.columns
+        ]
+        measurements = [m for m in measurements if self.store.has_column(m)]
+
+        window = self.store.window(start_ns, stop_ns, include_start=True)
+        aggregates = self._AGGREGATE_WINDOW_RE.findall(query)
+        if aggregates:
+            return self._aggregate_csv(
+                measurements, window, aggregates, stop_ns, "pivot(" in query
+            )
+
+        times = self.store.times[window]
+        is_last = "last()" in query
+        is_pivot = "pivot(" in query
+
+        records = []  # (measurement, time_ns, value)
+        for name in measurements:
+            values = self.store.column(name)[window]
+            valid = np.flatnonzero(~np.isnan(values))
+            if is_last:
+                valid = valid[-1:]
+            records.extend((name, int(times[i]), float(values[i])) for i in valid)
+
+        if is_pivot:
+            return self._pivot_csv(records, start_ns)
+        return self._records_csv(records, start_ns, stop_ns)
+
+    def _aggregate_csv(
+        self, measurements, window: slice, aggregates, stop_ns: int, is_pivot: bool
+    ) -> str:
+        """aggregateWindow 결과 (_time은 구간 끝, _field는 집계 함수 이름)
+
+        pivot이 있으면 _time을 행 키로 "<측정값>_<함수>" 컬럼을 가진 한 테이블로 반환합니다.
+        """
+        series = {}  # (measurement, fn) -> {time_ns: value}
+        for every, fn in aggregates:
+            every_ns = parse_duration(every).value
+            for name in measurements:
+                starts, values = self.store.aggregate(name, window, every_ns, fn)
+                stops = np.minimum(starts + every_ns, stop_ns)
+                series[(name, fn)] = dict(zip(stops.tolist(), values.tolist()))
+        if not any(series.values()):
+            return ""
+
+        if not is_pivot:
+            lines = [
+                "#datatype,string,long,dateTime:RFC3339,double,string,string",
+                "#group,false,false,false,false,true,true",
+                "#default,_result,,,,,",
+                ",result,table,_time,_value,_field,_measurement",
+            ]
+            for table, ((name, fn), points) in enumerate(series.items()):
+                lines.extend(
+                    f",,{table},{_rfc3339(t)},{v!r},{fn},{name}"
+                    for t, v in points.items()
+                )
+            return "\n".join(lines) + "\n\n"
+
+        names = [f"{name}_{fn}" for name, fn in series]
+        row_times = sorted(set().union(*(points.keys() for points in series.values())))
+        lines = [
+            "#datatype,string,long,dateTime:RFC3339" + ",double" * len(names),
+            "#group,false,false,false" + ",false" * len(names),
+            "#default,_result,," + "," * len(names),
+            ",result,table,_time," + ",".join(names),
+        ]
+        for t in row_times:
+            cells = [
+                "" if t not in points else repr(points[t]) for points in series.values()
+            ]
+            lines.append(f",,0,{_rfc3339(t)}," + ",".join(cells))
+        return "\n".join(lines) + "\n\n"
+
+    @staticmethod
+    def _pivot_csv(records, start_ns: int) -> str:
+        if not records:
+            return ""
+        names = list(dict.fromkeys(name for name, _, _ in records))
+        row = {name: value for name, _, value in records}
+        header = ["result", "table", "_start"] + names
+        lines = [
+            "#datatype,string,long,dateTime:RFC3339" + ",double" * len(names),
+            "#group,false,false,true" + ",false" * len(names),
+            "#default,_result,," + "," * len(names),
+            "," + ",".join(header),
+            ",,0," + _rfc3339(start_ns) + "".join(f",{row[name]!r}" for name in names),
+        ]
+        return "\n".join(lines) + "\n\n"
+
+    @staticmethod
+    def _records_csv(records, start_ns: int, stop_ns: int) -> str:
+        if not records:
+            return ""
+        lines = [
+            "#datatype,string,long,dateTime:RFC3339,dateTime:RFC3339,"
+            "dateTime:RFC3339,double,string,string",
+            "#group,false,false,true,true,false,false,true,true",
+            "#default,_result,,,,,,,",
+            ",result,table,_start,_stop,_time,_value,_field,_measurement",
+        ]
+        start, stop = _rfc3339(start_ns), _rfc3339(stop_ns)
+        table_ids = {}
+        for name, time_ns, value in records:
+            table = table_ids.setdefault(name, len(table_ids))
+            lines.append(
+                f",,{table},{start},{stop},{_rfc3339(time_ns)},{value!r},value,{name}"
+            )
+        return "\n".join(lines) + "\n\n"
+
+
+class LocalInfluxDBServer:
+    """InfluxDB v1 / v2 HTTP API를 흉내 내는 로컬 서버 (백그라운드 스레드)
+
+    Parameters
+    ----------
+    data : pd.DataFrame
+        _time_gateway 컬럼과 센서 컬럼을 가진 SRS1 데이터 (naive 시각은 UTC로 취급)
+    host, port : str, int
+        바인드 주소 (port=0이면 빈 포트 자동 선택)
+    latency_ms, jitter_ms : float
+        모든 응답 전에 latency_ms + U(0, jitter_ms) 만큼 지연
+    failure_rate : float
+        요청이 실패할 확률 (0~1)
+    failure_mode : str
+        "status" (failure_status 응답) 또는 "disconnect" (응답 없이 연결 종료)
+    failure_status : int
+        failure_mode="status"일 때 응답 코드
+    seed : int, optional
+        지연 / 장애 주입 난수 시드
+    """
+
+    def __init__(
+        self,
+        data: pd.DataFrame,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        measurement: str = DEFAULT_MEASUREMENT,
+        database: str = "SRS1",
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        failure_rate: float = 0.0,
+        failure_mode: str = "status",
+        failure_status: int = 503,
+        seed: Optional[int] = None,
+    ):
+        if failure_mode not in ("status", "disconnect"):
+            raise ValueError(f"지원하지 않는 failure_mode: {failure_mode}")
+        self.store = SRS1Store(data)
+        self.influxql = InfluxQLEngine(self.store, measurement, database)
+        self.flux = FluxEngine(self.store, database)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.failure_rate = failure_rate
+        self.failure_mode = failure_mode
+        self.failure_status = failure_status
+        self.written: List[str] = []
+        self.stats = {"requests": 0, "failures": 0, "bytes_sent": 0, "lines_written": 0}
+
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._fail_next = 0
+        self._now_ns: Optional[int] = None
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs) -> "LocalInfluxDBServer":
+        return cls(load_frame(path), **kwargs)
+
+    @property
+    def host(self) -> str:
+        return self._httpd.server_address[0]
+
+    @property
+    def port(self) -> int:
+        return self._httpd.server_address[1]
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> "LocalInfluxDBServer":
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, name="local-influxdb", daemon=True
+        )
+        self._thread.start()
+        logger.info(f"로컬 InfluxDB 시작: {self.url} ({len(self.store.times)}행)")
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def set_now(self, now) -> None:
+        """now() / 상대 범위의 기준 시각을 지정합니다. (None이면 데이터 마지막 시각 직후)"""
+        if now is None:
+            self._now_ns = None
+            return
+        now = pd.Timestamp(now)
+        if now.tzinfo is not None:
+            now = now.tz_convert("UTC").tz_localize(None)
+        self._now_ns = now.value
+
+    def now_ns(self) -> int:
+        if self._now_ns is not None:
+            return self._now_ns
+        # Flux range의 stop(now)은 구간에 포함되지 않으므로 마지막 행 직후를 기준으로 함
+        return self.store.last_time_ns + 1
+
+    def fail_next(self, count: int = 1) -> None:
+        """다음 count개 요청을 실패시킵니다."""
+        with self._lock:
+            self._fail_next += count
+
+    def _should_fail(self) -> bool:
+        with self._lock:
+            self.stats["requests"] += 1
+            fail = self._fail_next > 0 or (
+                self.failure_rate > 0 and self._rng.random() < self.failure_rate
+            )
+            if self._fail_next > 0:
+                self._fail_next -= 1
+            if fail:
+                self.stats["failures"] += 1
+            delay = self.latency_ms + self._rng.uniform(0, self.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000)
+        return fail
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                # 헤더와 본문을 따로 보내므로 Nagle + 지연 ACK로 응답마다 ~40ms가
+                # 더해지지 않도록 함 (지연시간 측정 왜곡 방지)
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+            def _send(self, status: int, body: bytes, content_type: str):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("X-Influxdb-Version", "local")
+                self.end_headers()
+                self.wfile.write(body)
+                with server._lock:
+                    server.stats["bytes_sent"] += len(body)
+
+            def _send_json(self, status: int, payload: dict):
+                self._send(status, json.dumps(payload).encode(), "application/json")
+
+            def _read_body(self) -> bytes:
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                if self.headers.get("Content-Encoding") == "gzip":
+                    body = gzip.decompress(body)
+                return body
+
+            def _handle(self):
+                parsed = urllib.parse.urlparse(self.path)
+                params = dict(urllib.parse.parse_qsl(parsed.query))
+                body = self._read_body()
+
+                if server._should_fail():
+                    if server.failure_mode == "disconnect":
+                        self.close_connection = True
+                        self.connection.shutdown(2)
+                        return
+                    self._send_json(
+                        server.failure_status,
+                        {"code": "unavailable", "message": "injected failure"},
+                    )
+                    return
+
+                path = parsed.path
+                try:
+                    if path == "/ping":
+                        self.send_response(204)
+                        self.send_header("X-Influxdb-Version", "local")
+                        self.send_header("Content-Length", "0")
+                        self.end_headers()
+                    elif path in ("/health", "/ready"):
+                        self._send_json(200, {"name": "influxdb", "status": "pass"})
+                    elif path == "/query":
+                        if not params.get("q") and body:
+                            params.update(urllib.parse.parse_qsl(body.decode()))
+                        result = server.influxql.execute(
+                            params.get("q", ""), server.now_ns(), params.get("epoch")
+                        )
+                        if "csv" in (self.headers.get("Accept") or ""):
+                            self._send(200, render_influxql_csv(result), "text/csv")
+                        elif params.get("chunked") == "true":
+                            chunk_size = int(params.get("chunk_size") or 10000)
+                            self._send(
+                                200,
+                                render_influxql_chunks(result, chunk_size),
+                                "application/json",
+                            )
+                        else:
+                            self._send_json(200, result)
+                    elif path == "/api/v2/query":
+                        payload = json.loads(body or b"{}")
+                        csv_text = server.flux.execute(
+                            payload.get("query", ""), server.now_ns()
+                        )
+                        self._send(200, csv_text.encode(), "text/csv; charset=utf-8")
+                    elif path in ("/write", "/api/v2/write"):
+                        lines = [l for l in body.decode().splitlines() if l.strip()]
+                        with server._lock:
+                            server.written.extend(lines)
+                            server.stats["lines_written"] += len(lines)
+                        self.send_response(204)
+                        self.send_header("Content-Length", "0")
+                        self.end_headers()
+                    else:
+                        self._send_json(404, {"message": f"not found: {path}"})
+                except Exception as e:
+                    logger.warning(f"로컬 InfluxDB 쿼리 오류: {e}")
+                    self._send_json(400, {"code": "invalid", "error": str(e)})
+
+            do_GET = _handle
+            do_POST = _handle
+            do_HEAD = _handle
+
+        return Handler
+
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--data_path", type=str, default="Data/test_sample.csv")
+    parser.add_argument("--host", type=str, default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8086)
+    parser.add_argument("--latency_ms", type=float, default=0.0)
+    parser.add_argument("--jitter_ms", type=float, default=0.0)
+    parser.add_argument("--failure_rate", type=float, default=0.0)
+    parser.add_argument(
+        "--failure_mode", type=str, default="status", choices=["status", "disconnect"]
+    )
+    parser.add_argument("--now", type=str, default=None, help="now() 기준 시각")
+    args = parser.parse_args()
+
+    server = LocalInfluxDBServer.from_file(
+        args.data_path,
+        host=args.host,
+        port=args.port,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        failure_rate=args.failure_rate,
+        failure_mode=args.failure_mode,
+    )
+    server.set_now(args.now)
+    server.start()
+    print(f"🚀 로컬 InfluxDB 실행 중: {server.url} (Ctrl+C로 종료)")
+    print(f"   데이터: {args.data_path} ({len(server.store.times)}행)")
+    print(f"   now(): {pd.Timestamp(server.now_ns())}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print(f"🛑 종료 (통계: {server.stats})")
+        server.stop()
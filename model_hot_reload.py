@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+상주 예측기용 무중단 모델 핫 리로드
+모델 디렉토리(trained_models/nox-model 등)의 새 아티팩트 또는 manifest.json의 새 run_id를
+감지하면, 백그라운드에서 새 모델을 로드·검증·워밍업한 뒤 예측 사이에 원자적으로 교체합니다.
+
+파생 아티팩트(lgbm_model_flat.npz / lgbm_model.onnx)가 lgbm_model.pkl보다 오래되었으면
+(pkl만 새로 배포된 경우) 오래된 파생 아티팩트 대신 pkl을 로드합니다. 모델 디렉토리의 파일은
+기본적으로 읽기만 하며, regenerate_derived=True일 때만 pkl에서 파생 아티팩트를 다시 만들어
+로드합니다. (다시 만들 수 없으면 교체하지 않음)
+
+manifest.json 예시
+------------------
+{"run_id": "<MLFLOW_RUN_ID>", "model_file": "lgbm_model.pkl"}
+"""
+
+import gc
+import json
+import logging
+import os
+import threading
+import time
+from typing import Optional, Tuple
+
+import numpy as np
+
+from model_registry import (
+    FLAT_MODEL_FILE,
+    MODEL_FILE,
+    ONNX_MODEL_FILE,
+    find_model_file,
+    load_model_file,
+)
+from predict_threading import predict_adaptive
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "manifest.json"
+# 변경 감지 대상 (어느 파일이 바뀌어도 서명이 달라짐)
+ARTIFACT_FILES = (MODEL_FILE, FLAT_MODEL_FILE, ONNX_MODEL_FILE)
+
+
+def is_stale_derived_artifact(model_path: str) -> bool:
+    """model_path가 같은 디렉토리의 pkl보다 오래된 파생 아티팩트(npz / onnx)인지 확인합니다."""
+    if os.path.basename(model_path) not in (FLAT_MODEL_FILE, ONNX_MODEL_FILE):
+        return False
+    source = os.path.join(os.path.dirname(model_path), MODEL_FILE)
+    return (
+        os.path.exists(source)
+        and os.stat(source).st_mtime_ns > os.stat(model_path).st_mtime_ns
+    )
+
+
+def refresh_derived_artifact(model_path: str) -> str:
+    """model_path가 같은 디렉토리의 pkl보다 오래된 파생 아티팩트이면 pkl에서 다시 만듭니다.
+
+    임시 파일에 쓴 뒤 os.replace로 교체하므로 다른 프로세스가 쓰다 만 파일을 읽지 않습니다.
+    다시 만들 수 없으면(예: onnxmltools 미설치) 예외를 그대로 전달합니다.
+
+    Returns
+    -------
+    str
+        로드할 모델 경로 (model_path와 같음)
+    """
+    if not is_stale_derived_artifact(model_path):
+        return model_path
+    name = os.path.basename(model_path)
+    source = os.path.join(os.path.dirname(model_path), MODEL_FILE)
+
+    logger.warning(f"{name}이(가) {MODEL_FILE}보다 오래되어 다시 생성합니다.")
+    tmp_path = os.path.join(os.path.dirname(model_path), f".tmp-{name}")
+    try:
+        if name == FLAT_MODEL_FILE:
+            from flat_tree_model import export_flat_model
+
+            export_flat_model(source, tmp_path)
+        else:
+            from onnx_model import export_onnx_model
+
+            export_onnx_model(source, tmp_path)
+        os.replace(tmp_path, model_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return model_path
+
+
+def model_num_features(model) -> Optional[int]:
+    """모델의 입력 피처 수를 반환합니다. (알 수 없으면 None)"""
+    for attr in ("num_features", "n_features_in_"):
+        try:
+            return int(getattr(model, attr))
+        except Exception:
+            continue
+    try:
+        return int(model.num_feature())
+    except Exception:
+        return None
+
+
+class HotReloadableModel:
+    """예측 중에도 교체 가능한 모델 참조
+
+    predict()는 호출 시점의 모델 참조를 한 번만 읽으므로, 교체가 진행 중이어도
+    각 예측은 이전 모델 또는 새 모델 중 하나로 온전히 수행됩니다.
+    """
+
+    def __init__(self, model, version: str = None):
+        self._model = model
+        self.version = version
+        self.reload_count = 0
+
+    @property
+    def current(self):
+        return self._model
+
+    def predict(self, X) -> np.ndarray:
+        return predict_adaptive(self._model, X)
+
+    def swap(self, model, version: str = None) -> None:
+        old_model = self._model
+        self._model = model
+        self.version = version
+        self.reload_count += 1
+        # 이전 모델 참조를 즉시 끊어 두 모델이 오래 공존하지 않도록 함
+        del old_model
+        gc.collect()
+
+
+class ModelWatcher:
+    """모델 디렉토리를 주기적으로 확인하여 HotReloadableModel을 교체하는 백그라운드 스레드
+
+    regenerate_derived가 False(기본)이면 모델 디렉토리에 쓰지 않고, 오래된 파생 아티팩트
+    대신 pkl을 로드합니다. True이면 파생 아티팩트를 pkl에서 다시 만들어 로드합니다.
+    """
+
+    def __init__(
+        self,
+        model_dir: str,
+        target: HotReloadableModel = None,
+        poll_interval: float = 5.0,
+        warmup_rows: Optional[np.ndarray] = None,
+        warmup_iterations: int = 3,
+        regenerate_derived: bool = False,
+    ):
+        self.model_dir = model_dir
+        self.regenerate_derived = regenerate_derived
+        self.poll_interval = poll_interval
+        self.warmup_rows = warmup_rows
+        self.warmup_iterations = warmup_iterations
+        self._pending_signature = None
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        if target is None:
+            model_path, _ = self._current_artifact()
+            if model_path is None:
+                raise FileNotFoundError(f"모델 파일이 없습니다: {model_dir}")
+            model_path, signature = self._prepare_artifact(model_path)
+            model, _ = load_model_file(model_path)
+            target = HotReloadableModel(model, version=self._version_of(signature))
+            self._signature = signature
+        else:
+            self._signature = self._current_artifact()[1]
+        self.target = target
+
+    def _read_manifest(self) -> Optional[dict]:
+        path = os.path.join(self.model_dir, MANIFEST_FILE)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            # 작성 중인 manifest는 다음 주기에 다시 확인
+            return None
+
+    def _artifact_stats(self) -> tuple:
+        """감지 대상 아티팩트 전체의 (파일명, 크기, mtime)"""
+        stats = []
+        for name in ARTIFACT_FILES:
+            try:
+                stat = os.stat(os.path.join(self.model_dir, name))
+            except FileNotFoundError:
+                continue
+            stats.append((name, stat.st_size, stat.st_mtime_ns))
+        return tuple(stats)
+
+    def _current_artifact(self) -> Tuple[Optional[str], Optional[tuple]]:
+        """현재 모델 파일 경로와 변경 감지용 서명을 반환합니다.
+
+        서명은 pkl / npz / onnx 전체의 (파일명, 크기, mtime)이며, manifest.json이 있으면
+        run_id를 앞에 붙입니다. 로드하는 파일 외의 아티팩트가 바뀌어도(예: pkl만 재배포)
+        변경으로 감지합니다.
+        """
+        manifest = self._read_manifest()
+        if manifest and manifest.get("run_id"):
+            model_file = manifest.get("model_file")
+            model_path = (
+                os.path.join(self.model_dir, model_file)
+                if model_file
+                else find_model_file(self.model_dir)
+            )
+            if model_path is None or not os.path.exists(model_path):
+                return None, None
+            stat = os.stat(model_path)
+            return model_path, (
+                "run_id",
+                manifest["run_id"],
+                stat.st_size,
+                self._artifact_stats(),
+            )
+
+        model_path = find_model_file(self.model_dir)
+        if model_path is None:
+            return None, None
+        return model_path, ("files", self._artifact_stats())
+
+    def _prepare_artifact(self, model_path: str) -> Tuple[str, Optional[tuple]]:
+        """오래된 파생 아티팩트를 처리한 뒤 (로드할 경로, 서명)을 반환합니다."""
+        if not is_stale_derived_artifact(model_path):
+            return model_path, self._current_artifact()[1]
+        if self.regenerate_derived:
+            refresh_derived_artifact(model_path)
+            # 다시 생성했으면 파일 시각이 바뀌므로 서명을 새로 계산
+            return self._current_artifact()
+        logger.warning(
+            f"{os.path.basename(model_path)}이(가) {MODEL_FILE}보다 오래되어 "
+            f"{MODEL_FILE}을 로드합니다. (파생 아티팩트 재생성은 regenerate_derived=True)"
+        )
+        return (
+            os.path.join(os.path.dirname(model_path), MODEL_FILE),
+            self._current_artifact()[1],
+        )
+
+    @staticmethod
+    def _version_of(signature) -> Optional[str]:
+        if signature and signature[0] == "run_id":
+            return signature[1]
+        return None
+
+    def check_once(self) -> bool:
+        """새 모델을 확인하고, 있으면 검증 후 교체합니다.
+
+        파일 복사 도중 로드하지 않도록, 서명이 연속 두 번 같을 때만 로드합니다.
+
+        Returns
+        -------
+        bool
+            모델 교체 여부
+        """
+        model_path, signature = self._current_artifact()
+        if signature is None or signature == self._signature:
+            self._pending_signature = None
+            return False
+        if signature != self._pending_signature:
+            self._pending_signature = signature
+            return False
+
+        self._pending_signature = None
+        try:
+            start = time.perf_counter()
+            # 파생 아티팩트가 pkl보다 오래되었으면 pkl 로드 또는 재생성 (실패하면 기존 모델 유지)
+            model_path, signature = self._prepare_artifact(model_path)
+            new_model, size = load_model_file(model_path)
+            self._validate_and_warmup(new_model)
+        except Exception as e:
+            logger.error(f"새 모델 검증 실패, 기존 모델 유지: {e}")
+            # 같은 아티팩트를 반복해서 로드하지 않도록 서명은 기록
+            self._signature = signature
+            return False
+
+        self.target.swap(new_model, version=self._version_of(signature))
+        self._signature = signature
+        logger.info(
+            f"모델 교체 완료: {model_path} (version={self.target.version}, "
+            f"{size / 1024 / 1024:.1f}MB, {(time.perf_counter() - start) * 1000:.0f}ms)"
+        )
+        return True
+
+    def _validate_and_warmup(self, new_model) -> None:
+        """입력 피처 수와 예측값의 유효성을 확인하고 워밍업 예측을 수행합니다."""
+        expected = model_num_features(self.target.current)
+        actual = model_num_features(new_model)
+        if expected is not None and actual is not None and expected != actual:
+            raise ValueError(f"입력 피처 수 불일치: {actual} (기존 {expected})")
+
+        rows = self.warmup_rows
+        if rows is None:
+            rows = np.zeros((1, actual or expected or 1))
+        rows = np.atleast_2d(np.asarray(rows, dtype=np.float64))
+
+        for _ in range(self.warmup_iterations):
+            predictions = predict_adaptive(new_model, rows)
+        predictions = np.asarray(predictions)
+        if predictions.shape != (len(rows),) or not np.all(np.isfinite(predictions)):
+            raise ValueError("워밍업 예측값이 유효하지 않습니다.")
+
+    def _run(self):
+        while not self._stop_event.wait(self.poll_interval):
+            try:
+                self.check_once()
+            except Exception as e:
+                logger.error(f"모델 감시 중 오류 발생: {e}")
+
+    def start(self) -> "ModelWatcher":
+        self._thread = threading.Thread(
+            target=self._run, name="nox-model-watcher", daemon=True
+        )
+        self._thread.start()
+        logger.info(f"모델 감시 시작: {self.model_dir} (주기 {self.poll_interval}초)")
+        return self
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join()
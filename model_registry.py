@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+한 서빙 프로세스에서 여러 소각 라인(plant)과 모델 버전을 제공하는 모델 레지스트리
+모델은 처음 요청될 때 로드되며, 메모리 예산을 넘으면 가장 오래 사용하지 않은 모델부터 내립니다.
+
+디렉토리 구조
+-------------
+{root}/{plant}/{version}/lgbm_model.onnx     (auto: onnxruntime이 있으면 우선 사용)
+{root}/{plant}/{version}/lgbm_model_flat.npz  (cold_start(Lambda)에서 우선 사용)
+{root}/{plant}/{version}/lgbm_model.pkl
+{root}/{plant}/LATEST                         (선택: 기본 버전 이름)
+
+환경 변수
+---------
+NOX_MODEL_ROOT : 레지스트리 루트 디렉토리 (기본 trained_models)
+NOX_REGISTRY_MEMORY_MB : 동시에 메모리에 올릴 모델의 예산 (기본 512MB)
+NOX_MODEL_BACKEND : auto / cold_start / flat / onnx / lightgbm
+    지정하지 않으면 상주 서비스(nox_server, 실시간 예측기)는 auto, Lambda는 cold_start
+
+백엔드별 지연시간 (이 모델, 중앙값)
+    1행: ONNX 0.010ms, Booster(num_threads=1) 0.03ms, 평탄화 0.12ms, sklearn 래퍼 0.44ms
+    64행: Booster 0.23ms, 평탄화 1.65ms
+평탄화 모델은 예측이 가장 느리지만 lightgbm / scikit-learn import가 없어 콜드 스타트가
+짧으므로 Lambda(cold_start)에서만 우선 사용합니다.
+NOX_REGISTRY_VERSION_TTL : 기본 버전(LATEST / 최신 디렉토리) 확인 주기 (초, 기본 60)
+
+plant / version 이름은 요청 데이터에서 오므로 영문자, 숫자, "_", ".", "-"만 허용하고
+레지스트리 루트 밖의 경로는 거부합니다. (피클 로드 = 임의 코드 실행 방지)
+"""
+
+import importlib.util
+import logging
+import os
+import pickle
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL_ROOT = "trained_models"
+DEFAULT_MEMORY_BUDGET_MB = 512
+DEFAULT_VERSION_TTL_SECONDS = 60.0
+MODEL_FILE = "lgbm_model.pkl"
+FLAT_MODEL_FILE = "lgbm_model_flat.npz"
+ONNX_MODEL_FILE = "lgbm_model.onnx"
+LATEST_FILE = "LATEST"
+
+# 추론 백엔드별 모델 파일 (나열된 순서대로 먼저 있는 파일 사용)
+# auto: 예측 지연시간 기준 (ONNX Runtime → 피클 모델의 네이티브 Booster)
+# cold_start: import / 로드 시간 기준 (평탄화 → 피클), Lambda 기본값
+MODEL_BACKENDS = {
+    "auto": (ONNX_MODEL_FILE, MODEL_FILE),
+    "cold_start": (FLAT_MODEL_FILE, MODEL_FILE),
+    "flat": (FLAT_MODEL_FILE,),
+    "onnx": (ONNX_MODEL_FILE,),
+    "lightgbm": (MODEL_FILE,),
+}
+
+
+_NAME_RE = re.compile(r"^[A-Za-z0-9_.-]+$")
+
+
+class ModelNotFoundError(FileNotFoundError):
+    """요청한 plant/version의 모델 파일이 없을 때 발생합니다."""
+
+
+class InvalidModelKeyError(ValueError):
+    """plant/version 이름이 허용되지 않거나 레지스트리 루트를 벗어날 때 발생합니다."""
+
+
+def validate_model_name(kind: str, name) -> str:
+    """plant / version 이름을 검사합니다. (경로 구분자, "..", 빈 문자열 거부)"""
+    name = str(name)
+    if not _NAME_RE.match(name) or ".." in name or name == ".":
+        raise InvalidModelKeyError(f"허용되지 않는 {kind} 이름: {name!r}")
+    return name
+
+
+def get_model_backend(backend: Optional[str] = None, default: str = "auto") -> str:
+    """추론 백엔드 이름을 반환합니다.
+
+    지정하지 않으면 NOX_MODEL_BACKEND 환경 변수, 그것도 없으면 default를 사용합니다.
+    """
+    backend = (backend or os.environ.get("NOX_MODEL_BACKEND") or default).lower()
+    if backend not in MODEL_BACKENDS:
+        raise ValueError(
+            f"지원하지 않는 모델 백엔드: {backend} ({', '.join(MODEL_BACKENDS)})"
+        )
+    return backend
+
+
+def find_model_file(
+    model_dir: str, backend: Optional[str] = None, default: str = "auto"
+) -> Optional[str]:
+    """모델 디렉토리에서 백엔드에 맞는 모델 파일 경로를 찾습니다.
+
+    auto는 onnxruntime이 설치되지 않았으면 .onnx 파일을 건너뜁니다.
+    """
+    backend = get_model_backend(backend, default)
+    for name in MODEL_BACKENDS[backend]:
+        if (
+            name == ONNX_MODEL_FILE
+            and backend != "onnx"
+            and importlib.util.find_spec("onnxruntime") is None
+        ):
+            continue
+        path = os.path.join(model_dir, name)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def load_model_file(model_path: str):
+    """.npz(평탄화 모델), .onnx(ONNX Runtime) 또는 피클 모델을 로드합니다.
+
+    Returns
+    -------
+    Tuple[model, int]
+        모델과 추정 메모리 사용량(bytes)
+    """
+    if model_path.endswith(".npz"):
+        from flat_tree_model import FlatTreeModel
+
+        model = FlatTreeModel.load(model_path)
+        return model, model.nbytes
+
+    if model_path.endswith(".onnx"):
+        from onnx_model import OnnxNOxModel
+
+        model = OnnxNOxModel.load(model_path)
+        # ONNX Runtime 세션은 파일 크기로 메모리 사용량을 근사
+        return model, os.path.getsize(model_path)
+
+    with open(model_path, "rb") as f:
+        model = pickle.load(f)
+    # 피클 모델은 파일 크기로 메모리 사용량을 근사
+    return model, os.path.getsize(model_path)
+
+
+class ModelRegistry:
+    """(plant, version) 키 기반 지연 로딩 + LRU 모델 캐시"""
+
+    def __init__(
+        self,
+        root: str = DEFAULT_MODEL_ROOT,
+        memory_budget_mb: float = DEFAULT_MEMORY_BUDGET_MB,
+        version_ttl_seconds: float = DEFAULT_VERSION_TTL_SECONDS,
+        default_backend: str = "auto",
+    ):
+        self.root = root
+        # NOX_MODEL_BACKEND가 없을 때의 백엔드 (Lambda는 cold_start)
+        self.default_backend = default_backend
+        self.memory_budget_bytes = int(memory_budget_mb * 1024 * 1024)
+        self.version_ttl_seconds = version_ttl_seconds
+        # plant -> (기본 버전, 만료 시각): 캐시된 모델 요청마다 디스크를 읽지 않도록 함
+        self._versions = {}
+        self._models: "OrderedDict[Tuple[str, str], Tuple[object, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._loading_locks = {}
+        self.stats = {"hits": 0, "loads": 0, "evictions": 0}
+
+    @classmethod
+    def from_env(cls, default_backend: str = "auto"):
+        return cls(
+            default_backend=default_backend,
+            root=os.environ.get("NOX_MODEL_ROOT", DEFAULT_MODEL_ROOT),
+            memory_budget_mb=float(
+                os.environ.get("NOX_REGISTRY_MEMORY_MB", DEFAULT_MEMORY_BUDGET_MB)
+            ),
+            version_ttl_seconds=float(
+                os.environ.get("NOX_REGISTRY_VERSION_TTL", DEFAULT_VERSION_TTL_SECONDS)
+            ),
+        )
+
+    @property
+    def memory_used_bytes(self) -> int:
+        return sum(size for _, size in self._models.values())
+
+    def model_dir(self, plant: str, version: str) -> str:
+        """검사한 plant / version의 모델 디렉토리 (레지스트리 루트 밖이면 거부)"""
+        plant = validate_model_name("plant", plant)
+        version = validate_model_name("version", version)
+        model_dir = os.path.join(self.root, plant, version)
+        root = os.path.realpath(self.root)
+        if os.path.commonpath([root, os.path.realpath(model_dir)]) != root:
+            raise InvalidModelKeyError(f"레지스트리 루트 밖의 모델 경로: {model_dir}")
+        return model_dir
+
+    def resolve_version(self, plant: str, version: Optional[str] = None) -> str:
+        """버전이 없으면 LATEST 파일 또는 이름순 마지막 버전을 사용합니다.
+
+        기본 버전은 version_ttl_seconds 동안 캐시하므로, LATEST 변경은 그 안에 반영됩니다.
+        """
+        plant = validate_model_name("plant", plant)
+        if version:
+            return validate_model_name("version", version)
+
+        now = time.monotonic()
+        with self._lock:
+            cached = self._versions.get(plant)
+        if cached is not None and cached[1] > now:
+            return cached[0]
+
+        version = validate_model_name("version", self._read_default_version(plant))
+        with self._lock:
+            self._versions[plant] = (version, now + self.version_ttl_seconds)
+        return version
+
+    def _read_default_version(self, plant: str) -> str:
+        plant_dir = os.path.join(self.root, plant)
+        latest_path = os.path.join(plant_dir, LATEST_FILE)
+        if os.path.exists(latest_path):
+            with open(latest_path) as f:
+                return f.read().strip()
+        if not os.path.isdir(plant_dir):
+            raise ModelNotFoundError(f"plant 모델 디렉토리가 없습니다: {plant_dir}")
+        versions = sorted(
+            name
+            for name in os.listdir(plant_dir)
+            if os.path.isdir(os.path.join(plant_dir, name))
+        )
+        if not versions:
+            raise ModelNotFoundError(f"plant 모델 버전이 없습니다: {plant_dir}")
+        return versions[-1]
+
+    def get(self, plant: str, version: Optional[str] = None):
+        """모델을 반환합니다. (캐시에 없으면 로드)
+
+        Returns
+        -------
+        Tuple[model, str]
+            모델과 실제 사용된 버전
+        """
+        version = self.resolve_version(plant, version)
+        key = (plant, version)
+
+        with self._lock:
+            if key in self._models:
+                self._models.move_to_end(key)
+                self.stats["hits"] += 1
+                return self._models[key][0], version
+            loading_lock = self._loading_locks.setdefault(key, threading.Lock())
+
+        # 같은 모델을 여러 스레드가 동시에 로드하지 않도록 키별 잠금
+        with loading_lock:
+            with self._lock:
+                if key in self._models:
+                    self._models.move_to_end(key)
+                    self.stats["hits"] += 1
+                    return self._models[key][0], version
+
+            model, size = self._load(plant, version)
+
+            with self._lock:
+                self._models[key] = (model, size)
+                self.stats["loads"] += 1
+                self._evict(keep=key)
+                self._loading_locks.pop(key, None)
+        return model, version
+
+    def _load(self, plant: str, version: str):
+        model_dir = self.model_dir(plant, version)
+        model_path = find_model_file(model_dir, default=self.default_backend)
+        if model_path is None:
+            raise ModelNotFoundError(f"모델 파일이 없습니다: {model_dir}")
+        model, size = load_model_file(model_path)
+
+        logger.info(
+            f"모델 로드 완료: plant={plant}, version={version} ({size / 1024 / 1024:.1f}MB)"
+        )
+        return model, size
+
+    def _evict(self, keep: Tuple[str, str]) -> None:
+        """메모리 예산을 넘으면 가장 오래 사용하지 않은 모델부터 제거합니다."""
+        while (
+            self.memory_used_bytes > self.memory_budget_bytes and len(self._models) > 1
+        ):
+            key = next(iter(self._models))
+            if key == keep:
+                break
+            del self._models[key]
+            self.stats["evictions"] += 1
+            logger.info(f"모델 캐시 제거 (LRU): plant={key[0]}, version={key[1]}")
+
+
+_default_registry = None
+
+
+def get_default_registry(default_backend: str = "auto") -> ModelRegistry:
+    """환경 변수 기반 레지스트리를 프로세스당 한 번만 생성하여 반환합니다.
+
+    default_backend는 처음 생성할 때만 적용됩니다.
+    """
+    global _default_registry
+    if _default_registry is None:
+        _default_registry = ModelRegistry.from_env(default_backend)
+    return _default_registry
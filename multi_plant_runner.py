@@ -0,0 +1,637 @@
+#!/usr/bin/env python3
+"""
+여러 소각 라인(플랜트)의 실시간 NOx 예측을 한 호스트에서 동시에 실행하는 러너
+realtime_nox_prediction은 한 플랜트(SRS1 org / bucket / 모델 하나)에 고정되어 있습니다.
+MultiPlantRunner는 플랜트 설정마다 조회 클라이언트, 센서 버퍼, 모델, 격자 정렬 스케줄을
+따로 두고, 하나의 이벤트 루프와 공유 작업 풀에서 함께 실행합니다.
+
+- 조회(InfluxDB v1 read_data)는 I/O 전용 스레드 풀에서 실행하여 CPU 작업 슬롯을 차지하지
+  않습니다. 플랜트마다 조회는 한 번에 하나만 실행하고, 이전 조회가 끝나지 않았으면 그 주기를
+  건너뜁니다. (증분 버퍼를 두 스레드가 동시에 갱신하지 않음)
+- 전처리 / 예측은 FairWorkPool에서 실행합니다. 플랜트별 대기열을 라운드로빈으로 꺼내므로
+  한 플랜트의 작업이 몰려도 다른 플랜트가 굶지 않습니다.
+- 전처리(NOxDataPreprocessor, 주기당 약 1.5초)는 대부분 GIL을 잡는 pandas 연산이라 스레드를
+  늘려도 코어 하나 이상을 쓰지 못합니다. 코어를 모두 쓰려면 --processes로 전처리를 프로세스
+  풀에서 실행합니다. 호스트당 실행 가능한 플랜트 수는 대략
+  (전처리 프로세스 수 × 주기) / 전처리 p50 이며, 실행이 끝나면 측정값으로 이 추정치를 출력합니다.
+- InfluxDB 계정은 설정 파일의 username / password 또는 환경변수
+  SRS1_INFLUX_USERNAME / SRS1_INFLUX_PASSWORD에서 읽습니다.
+- 같은 주기의 플랜트들이 같은 격자 시각에 몰리지 않도록 시작 시각을 주기 안에서 분산합니다.
+- 플랜트별 단계 지연시간 / 작업 풀 대기 시간 / 종단 지연시간과 스케줄 집계를 보고합니다.
+- catch_up이 켜진 플랜트는 매 주기 조회 전에 처리 지연 / 재시작으로 누락된 주기를
+  realtime_catchup으로 복구하여 on_result로 전달합니다. (catch_up_state_path가 있으면
+  마지막 예측 주기를 저장 / 복원) 복구는 드물게 일어나므로 조회와 같은 I/O 스레드에서 실행합니다.
+
+설정 파일 예 (plants.json):
+    [
+      {"name": "SRS1", "host": "10.238.24.150", "database": "SRS1",
+       "model_path": "Model/lgbm_model.pkl", "interval_seconds": 5},
+      {"name": "SRS2", "host": "10.238.24.151", "database": "SRS2",
+       "model_path": "Model/srs2/lgbm_model.pkl", "interval_seconds": 5,
+       "checkpoint_path": "state/srs2_buffer.npz",
+       "catch_up": true, "catch_up_state_path": "state/srs2_catch_up.json"}
+    ]
+
+사용 예:
+    python multi_plant_runner.py --config plants.json
+    python multi_plant_runner.py --demo_plants 4 --max_ticks 6   # 로컬 InfluxDB 모의
+    python multi_plant_runner.py --demo_plants 2 --max_ticks 4 --catch_up
+"""
+
+import asyncio
+import functools
+import json
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from realtime_pipeline import StageMetrics
+from realtime_scheduler import AlignedTickScheduler
+
+logger = logging.getLogger(__name__)
+
+
+class PlantConfig:
+    """플랜트(소각 라인) 하나의 연결 / 모델 / 스케줄 설정"""
+
+    def __init__(
+        self,
+        name: str,
+        host: str,
+        port: int = 8086,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        database: str = "SRS1",
+        table_name: str = "SRS1",
+        model_path: str = "Model/lgbm_model.pkl",
+        interval_seconds: float = 5.0,
+        deadline_seconds: Optional[float] = None,
+        offset_seconds: Optional[float] = None,
+        checkpoint_path: Optional[str] = None,
+        catch_up: bool = False,
+        max_backlog_seconds: float = 900.0,
+        catch_up_state_path: Optional[str] = None,
+    ):
+        self.name = name
+        self.host = host
+        self.port = port
+        # 계정은 설정 파일에 두거나 환경변수로 전달 (코드에 기본 비밀번호를 두지 않음)
+        self.username = username or os.environ.get("SRS1_INFLUX_USERNAME")
+        self.password = password or os.environ.get("SRS1_INFLUX_PASSWORD")
+        self.database = database
+        self.table_name = table_name
+        self.model_path = model_path
+        self.interval_seconds = interval_seconds
+        self.deadline_seconds = deadline_seconds
+        # None이면 MultiPlantRunner가 주기 안에서 분산 배치
+        self.offset_seconds = offset_seconds
+        self.checkpoint_path = checkpoint_path
+        # 누락 주기 복구 (realtime_catchup.BacklogCatchUp)
+        self.catch_up = catch_up
+        self.max_backlog_seconds = max_backlog_seconds
+        self.catch_up_state_path = catch_up_state_path
+
+    @classmethod
+    def from_dict(cls, config: Dict[str, Any]) -> "PlantConfig":
+        return cls(**config)
+
+
+def load_plant_configs(path: str) -> List[PlantConfig]:
+    """JSON 파일(설정 딕셔너리 리스트)에서 플랜트 설정을 읽습니다."""
+    with open(path) as f:
+        configs = [PlantConfig.from_dict(c) for c in json.load(f)]
+    names = [c.name for c in configs]
+    if len(set(names)) != len(names):
+        raise ValueError(f"플랜트 이름이 중복되었습니다: {names}")
+    return configs
+
+
+_worker_preprocessor = None
+
+
+def _init_worker(log_level: int) -> None:
+    """전처리 프로세스 초기화 (무거운 import를 미리 하고 로그 / 경고 설정을 맞춤)"""
+    import warnings
+
+    import pandas as pd
+
+    import data_preprocessor  # noqa: F401
+
+    logging.getLogger().setLevel(log_level)
+    warnings.filterwarnings("ignore", category=pd.errors.PerformanceWarning)
+
+
+def _preprocess_features(raw_data, feature_names: List[str]):
+    """프로세스 풀에서 실행하는 전처리 (build_srs1_stages의 preprocess와 같은 결과)
+
+    pickle로 전달해야 하므로 모듈 수준 함수로 두고, 전처리기는 프로세스마다 하나를 재사용합니다.
+    """
+    import numpy as np
+
+    from data_preprocessor import NOxDataPreprocessor
+
+    global _worker_preprocessor
+    if _worker_preprocessor is None:
+        _worker_preprocessor = NOxDataPreprocessor()
+    model_data, _ = _worker_preprocessor.preprocess_realtime_data(raw_data)
+    return (
+        model_data.reindex(columns=feature_names).iloc[-1:].to_numpy(dtype=np.float64)
+    )
+
+
+def _timed_call(fn: Callable, arg):
+    # perf_counter는 리눅스에서 CLOCK_MONOTONIC이라 프로세스 간에도 비교 가능
+    started = time.perf_counter()
+    return started, fn(arg), time.perf_counter()
+
+
+class FairWorkPool:
+    """플랜트별 대기열을 라운드로빈으로 꺼내 공유 스레드 / 프로세스 풀에서 실행하는 작업 풀
+
+    동시에 max_workers개까지만 실행하고, 나머지는 플랜트별 대기열에 둡니다.
+    빈 슬롯이 생기면 다음 차례 플랜트의 가장 오래된 작업을 실행합니다.
+    processes=True이면 프로세스 풀(spawn)을 쓰므로 fn / arg / 결과가 pickle 가능해야 합니다.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, processes: bool = False):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.processes = processes
+        if processes:
+            # 이벤트 루프 / I/O 스레드가 도는 중에 fork하지 않도록 spawn 사용
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(logging.getLogger().level,),
+            )
+        else:
+            self.executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="plant-cpu"
+            )
+        self._queues: Dict[str, deque] = {}
+        self._order: deque = deque()
+        self._running = 0
+
+    async def run(
+        self, key: str, fn: Callable, arg, metrics: Optional[StageMetrics] = None
+    ):
+        """key(플랜트) 대기열에 fn(arg)를 넣고 결과를 기다립니다."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        if key not in self._queues:
+            self._queues[key] = deque()
+            self._order.append(key)
+        self._queues[key].append((fn, arg, future, time.perf_counter(), metrics))
+        self._dispatch()
+        return await future
+
+    def _next_job(self):
+        for _ in range(len(self._order)):
+            key = self._order[0]
+            self._order.rotate(-1)
+            queue = self._queues[key]
+            while queue:
+                job = queue.popleft()
+                # 마감 초과로 취소된 작업은 실행하지 않음
+                if not job[2].cancelled():
+                    return job
+        return None
+
+    def _dispatch(self) -> None:
+        loop = asyncio.get_running_loop()
+        while self._running < self.max_workers:
+            job = self._next_job()
+            if job is None:
+                return
+            fn, arg, future, submitted, metrics = job
+            self._running += 1
+            task = loop.run_in_executor(self.executor, _timed_call, fn, arg)
+            task.add_done_callback(
+                lambda task, future=future, submitted=submitted, metrics=metrics: (
+                    self._on_done(task, future, submitted, metrics)
+                )
+            )
+
+    def _on_done(self, task, future, submitted, metrics) -> None:
+        self._running -= 1
+        if not future.cancelled():
+            if task.exception() is not None:
+                if metrics is not None:
+                    metrics.errors += 1
+                future.set_exception(task.exception())
+            else:
+                started, value, done = task.result()
+                if metrics is not None:
+                    metrics.record(
+                        (done - started) * 1000, (started - submitted) * 1000
+                    )
+                future.set_result(value)
+        self._dispatch()
+
+    def pending(self) -> Dict[str, int]:
+        return {key: len(queue) for key, queue in self._queues.items()}
+
+    def warm_up(self) -> None:
+        """프로세스 풀이면 작업 프로세스를 미리 띄움 (첫 주기가 기동 시간으로 마감을 넘지 않게)"""
+        if self.processes:
+            for future in [
+                self.executor.submit(os.getpid) for _ in range(self.max_workers)
+            ]:
+                future.result()
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=True)
+
+
+class PlantRunner:
+    """플랜트 하나의 조회 → 전처리 → 예측 주기 실행기"""
+
+    STAGES = ("fetch", "preprocess", "predict")
+
+    def __init__(
+        self,
+        config: PlantConfig,
+        model,
+        pool: FairWorkPool,
+        io_executor: Executor,
+        client=None,
+        on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+        predict_pool: Optional[FairWorkPool] = None,
+    ):
+        from realtime_pipeline import build_srs1_stages, model_feature_names
+        from sensor_buffer import IncrementalSRS1Fetcher
+        from test_influxdb_realtime import REALTIME_COLUMNS, SRS1InfluxDBClient
+
+        self.config = config
+        self.name = config.name
+        self.pool = pool
+        # 전처리를 프로세스 풀에서 실행하면 예측(모델 공유)은 별도 스레드 풀에서 실행
+        self.predict_pool = predict_pool or pool
+        self.io_executor = io_executor
+        self.on_result = on_result
+        self.client = client or SRS1InfluxDBClient(
+            host=config.host,
+            port=config.port,
+            username=config.username,
+            password=config.password,
+            database=config.database,
+            verbose=False,
+        )
+        self.fetcher = IncrementalSRS1Fetcher(
+            self.client,
+            REALTIME_COLUMNS,
+            table_name=config.table_name,
+            checkpoint_path=config.checkpoint_path,
+        )
+        self.stages = build_srs1_stages(self.fetcher, model)
+        if pool.processes:
+            fetch, _, predict = self.stages
+            preprocess = functools.partial(
+                _preprocess_features, feature_names=model_feature_names(model)
+            )
+            self.stages = (fetch, preprocess, predict)
+        self.catch_up = None
+        if config.catch_up:
+            from realtime_catchup import BacklogCatchUp
+
+            # 실시간 주기와 같은 원시 컬럼 / 전처리 / 모델 피처로 복구
+            self.catch_up = BacklogCatchUp(
+                self.client,
+                model,
+                interval_seconds=config.interval_seconds,
+                max_backlog_seconds=config.max_backlog_seconds,
+                columns=REALTIME_COLUMNS,
+                table_name=config.table_name,
+                state_path=config.catch_up_state_path,
+            )
+        # 플랜트별 조회는 한 번에 하나만 (증분 버퍼 / 체크포인트는 스레드 안전하지 않음)
+        self._fetch_lock = threading.Lock()
+        self.fetch_busy_skips = 0
+        self.scheduler = AlignedTickScheduler(
+            config.interval_seconds,
+            config.deadline_seconds,
+            offset_seconds=config.offset_seconds or 0.0,
+        )
+        self.metrics = {stage: StageMetrics() for stage in self.STAGES}
+        self.metrics["end_to_end"] = StageMetrics()
+        self.last_prediction: Optional[float] = None
+
+    def _recover_and_fetch(self, tick_time: float):
+        """I/O 스레드에서 누락 주기 복구(catch_up이 있을 때) 후 조회합니다."""
+        recovered = self.catch_up.recover(tick_time) if self.catch_up else []
+        recovered_at = time.perf_counter()
+        return recovered, recovered_at, self.stages[0](tick_time)
+
+    async def on_tick(self, tick_time: float) -> None:
+        _, preprocess, predict = self.stages
+        start = time.perf_counter()
+        loop = asyncio.get_running_loop()
+
+        # 이전 주기의 조회가 아직 실행 중이면(마감 초과로 주기가 취소되어도 스레드는 계속 실행)
+        # 이번 주기를 건너뜀
+        if not self._fetch_lock.acquire(blocking=False):
+            self.fetch_busy_skips += 1
+            logger.warning(
+                f"{self.name}: 이전 조회가 진행 중이라 이번 주기를 건너뜁니다."
+            )
+            return
+
+        # 조회는 I/O 풀에서 (CPU 슬롯을 기다리지 않음). 잠금은 작업이 끝나거나 취소될 때 해제
+        try:
+            job = self.io_executor.submit(self._recover_and_fetch, tick_time)
+        except BaseException:
+            self._fetch_lock.release()
+            raise
+        job.add_done_callback(lambda _: self._fetch_lock.release())
+        try:
+            recovered, recovered_at, raw_data = await asyncio.wrap_future(
+                job, loop=loop
+            )
+        except Exception:
+            self.metrics["fetch"].errors += 1
+            raise
+        fetched = time.perf_counter()
+        self.metrics["fetch"].record((fetched - recovered_at) * 1000, 0.0)
+        if self.on_result:
+            for result in recovered:
+                self.on_result(
+                    {
+                        "plant": self.name,
+                        **result,
+                        "end_to_end_ms": (recovered_at - start) * 1000,
+                    }
+                )
+
+        features = await self.pool.run(
+            self.name, preprocess, raw_data, self.metrics["preprocess"]
+        )
+        prediction = await self.predict_pool.run(
+            self.name, predict, features, self.metrics["predict"]
+        )
+        end_to_end_ms = (time.perf_counter() - start) * 1000
+        self.metrics["end_to_end"].record(end_to_end_ms, 0.0)
+        self.last_prediction = prediction
+        if self.catch_up is not None:
+            # 격자 시각으로 기록 (offset_seconds로 분산된 주기도 같은 격자 주기로 취급)
+            self.catch_up.mark(self.catch_up.current_tick(tick_time))
+
+        if self.on_result:
+            self.on_result(
+                {
+                    "plant": self.name,
+                    "tick_time": tick_time,
+                    "prediction": prediction,
+                    "end_to_end_ms": end_to_end_ms,
+                }
+            )
+
+    async def run(self, max_ticks: Optional[int] = None) -> Dict[str, Any]:
+        try:
+            return await self.scheduler.run(self.on_tick, max_ticks=max_ticks)
+        finally:
+            self.fetcher.checkpoint()
+
+    def metrics_summary(self) -> Dict[str, Any]:
+        summary = {stage: m.summary() for stage, m in self.metrics.items()}
+        summary["schedule"] = dict(self.scheduler.stats)
+        summary["schedule"]["fetch_busy_skips"] = self.fetch_busy_skips
+        if self.catch_up is not None:
+            summary["catch_up"] = dict(self.catch_up.stats)
+        return summary
+
+
+class MultiPlantRunner:
+    """여러 PlantRunner를 하나의 이벤트 루프와 공유 작업 풀에서 실행합니다.
+
+    Parameters
+    ----------
+    configs : List[PlantConfig]
+        플랜트 설정
+    cpu_workers : int, optional
+        전처리 / 예측 동시 실행 수 (기본값: CPU 코어 수)
+    io_workers : int, optional
+        조회 스레드 수 (기본값: 플랜트 수)
+    stagger : bool
+        offset_seconds가 없는 플랜트의 시작 시각을 주기 안에서 균등 분산
+    processes : bool
+        전처리를 프로세스 풀에서 실행 (GIL 때문에 스레드로는 코어 하나만 사용)
+    """
+
+    def __init__(
+        self,
+        configs: List[PlantConfig],
+        cpu_workers: Optional[int] = None,
+        io_workers: Optional[int] = None,
+        stagger: bool = True,
+        on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+        processes: bool = False,
+    ):
+        from model_registry import load_model_file
+
+        self.pool = FairWorkPool(cpu_workers, processes=processes)
+        self.predict_pool = FairWorkPool(cpu_workers) if processes else self.pool
+        self.io_executor = ThreadPoolExecutor(
+            max_workers=io_workers or len(configs), thread_name_prefix="plant-io"
+        )
+        if stagger:
+            for i, config in enumerate(configs):
+                if config.offset_seconds is None:
+                    config.offset_seconds = i * config.interval_seconds / len(configs)
+
+        # 같은 모델 파일을 쓰는 플랜트는 읽기 전용 모델 객체를 공유 (메모리 절약)
+        models = {}
+        for config in configs:
+            if config.model_path not in models:
+                models[config.model_path], _ = load_model_file(config.model_path)
+
+        self.runners = [
+            PlantRunner(
+                config,
+                models[config.model_path],
+                self.pool,
+                self.io_executor,
+                on_result=on_result,
+                predict_pool=self.predict_pool,
+            )
+            for config in configs
+        ]
+        self.pool.warm_up()
+
+    async def run(self, max_ticks: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+        """모든 플랜트를 max_ticks 주기(None이면 중지할 때까지) 실행합니다."""
+        try:
+            await asyncio.gather(*(runner.run(max_ticks) for runner in self.runners))
+        finally:
+            self.io_executor.shutdown(wait=True)
+            self.pool.shutdown()
+            if self.predict_pool is not self.pool:
+                self.predict_pool.shutdown()
+        return self.metrics_summary()
+
+    def stop(self) -> None:
+        for runner in self.runners:
+            runner.scheduler.stop()
+
+    def metrics_summary(self) -> Dict[str, Dict[str, Any]]:
+        return {runner.name: runner.metrics_summary() for runner in self.runners}
+
+    def capacity_estimate(self) -> Optional[Dict[str, float]]:
+        """측정한 전처리 p50으로 이 호스트에서 실행 가능한 플랜트 수를 추정합니다.
+
+        스레드 풀이면 GIL 때문에 전처리 동시 실행 수를 1로 봅니다.
+        (전처리 동안 GIL을 놓는 구간이 있어 실제로는 조금 더 나올 수 있음)
+        """
+        preprocess_p50 = [
+            runner.metrics["preprocess"].summary().get("latency_p50_ms")
+            for runner in self.runners
+        ]
+        preprocess_p50 = [p for p in preprocess_p50 if p]
+        if not preprocess_p50:
+            return None
+        p50_ms = float(sorted(preprocess_p50)[len(preprocess_p50) // 2])
+        parallel = min(self.pool.max_workers, os.cpu_count() or 1)
+        if not self.pool.processes:
+            parallel = 1
+        interval = min(runner.config.interval_seconds for runner in self.runners)
+        return {
+            "preprocess_p50_ms": p50_ms,
+            "parallel_preprocess": parallel,
+            "plants_per_host": parallel * interval * 1000 / p50_ms,
+        }
+
+
+if __name__ == "__main__":
+    import argparse
+    import warnings
+
+    import pandas as pd
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--config", type=str, default=None, help="플랜트 설정 JSON")
+    parser.add_argument(
+        "--demo_plants",
+        type=int,
+        default=3,
+        help="--config가 없을 때 로컬 InfluxDB로 모의할 플랜트 수",
+    )
+    parser.add_argument("--data_path", type=str, default="Data/test_sample.csv")
+    parser.add_argument("--interval", type=float, default=5.0)
+    parser.add_argument("--cpu_workers", type=int, default=None)
+    parser.add_argument(
+        "--processes",
+        action="store_true",
+        help="전처리를 프로세스 풀에서 실행 (여러 코어 사용)",
+    )
+    parser.add_argument("--max_ticks", type=int, default=None)
+    parser.add_argument(
+        "--no_stagger", action="store_true", help="모든 플랜트를 같은 격자 시각에 시작"
+    )
+    parser.add_argument(
+        "--catch_up",
+        action="store_true",
+        help="모의 플랜트의 누락 주기 복구 (시작 전 150초 동안 중단된 상태로 시작)",
+    )
+    args = parser.parse_args()
+
+    # 전처리 단계별 INFO 로그 / pandas 단편화 경고가 출력에 섞이지 않도록 함
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger().setLevel(logging.WARNING)
+    warnings.filterwarnings("ignore", category=pd.errors.PerformanceWarning)
+
+    servers = []
+    state_dir = None
+    if args.config:
+        configs = load_plant_configs(args.config)
+    else:
+        from local_influxdb import TIME_COL, LocalInfluxDBServer, load_frame
+
+        # 샘플 데이터를 현재 시각 기준으로 옮겨 플랜트마다 로컬 InfluxDB 하나씩 실행
+        sample = load_frame(args.data_path)
+        times = pd.to_datetime(sample[TIME_COL])
+        shift = pd.Timestamp.now(tz="UTC").tz_localize(None) - pd.Timedelta(minutes=5)
+        sample[TIME_COL] = times - times.min() + shift
+        configs = []
+        if args.catch_up:
+            import tempfile
+
+            state_dir = tempfile.mkdtemp(prefix="nox_catch_up_")
+        for i in range(args.demo_plants):
+            server = LocalInfluxDBServer(sample, latency_ms=20, jitter_ms=10).start()
+            servers.append(server)
+            state_path = None
+            if state_dir:
+                # 마지막 예측 주기가 150초 전인 상태로 재시작한 것처럼 저장
+                state_path = os.path.join(state_dir, f"DEMO{i + 1}.json")
+                with open(state_path, "w") as f:
+                    json.dump({"last_tick": time.time() - 150}, f)
+            configs.append(
+                PlantConfig(
+                    f"DEMO{i + 1}",
+                    server.host,
+                    server.port,
+                    interval_seconds=args.interval,
+                    catch_up=args.catch_up,
+                    catch_up_state_path=state_path,
+                )
+            )
+
+    runner = MultiPlantRunner(
+        configs,
+        cpu_workers=args.cpu_workers,
+        stagger=not args.no_stagger,
+        processes=args.processes,
+        on_result=lambda r: print(
+            f"{'🔄' if r.get('catch_up') else '✅'} {r['plant']} "
+            f"{time.strftime('%H:%M:%S', time.localtime(r['tick_time']))} "
+            f"NOx = {r['prediction']:.4f} ({r['end_to_end_ms']:.0f}ms)"
+        ),
+    )
+    print(
+        f"🚀 플랜트 {len(configs)}개 동시 실행 (작업 풀 {runner.pool.max_workers}슬롯, "
+        f"{'프로세스' if args.processes else '스레드'})"
+    )
+    print("=" * 60)
+    try:
+        summary = asyncio.run(runner.run(max_ticks=args.max_ticks))
+    except KeyboardInterrupt:
+        print("🛑 예측 중지")
+        summary = runner.metrics_summary()
+    finally:
+        for server in servers:
+            server.stop()
+        if state_dir:
+            import shutil
+
+            shutil.rmtree(state_dir, ignore_errors=True)
+
+    print("\n📊 플랜트별 지표")
+    for name, metrics in summary.items():
+        e2e = metrics["end_to_end"]
+        preprocess = metrics["preprocess"]
+        schedule = metrics["schedule"]
+        print(
+            f"   {name}: 주기 {schedule['ticks']}회, 마감 초과 {schedule['deadline_exceeded']}회, "
+            f"누락 {schedule['missed']}회, 조회 중 건너뜀 {schedule['fetch_busy_skips']}회 | 종단 p50={e2e.get('latency_p50_ms', 0):.0f}ms "
+            f"p99={e2e.get('latency_p99_ms', 0):.0f}ms | 전처리 대기 "
+            f"p50={preprocess.get('queue_wait_p50_ms', 0):.0f}ms"
+        )
+        if "catch_up" in metrics:
+            catch_up_stats = metrics["catch_up"]
+            print(
+                f"      누락 주기 복구 {catch_up_stats['recovered_ticks']}개, "
+                f"데이터 없음 {catch_up_stats['no_data_ticks']}개, "
+                f"상한 초과 {catch_up_stats['capped_ticks']}개"
+            )
+
+    capacity = runner.capacity_estimate()
+    if capacity:
+        print(
+            f"\n📈 전처리 p50 {capacity['preprocess_p50_ms']:.0f}ms × 동시 실행 "
+            f"{capacity['parallel_preprocess']}개 기준, 이 호스트의 추정 상한은 "
+            f"플랜트 약 {capacity['plants_per_host']:.1f}개입니다. (CPU {os.cpu_count()}코어)"
+        )
@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+"""
+동적 마이크로 배칭을 적용한 asyncio HTTP 추론 서버
+Lambda 밖에서 같은 모델을 상주 서비스로 제공합니다.
+
+동시에 들어온 요청을 최대 배치 크기 / 최대 대기 시간 한도 안에서 하나의 배치로 모아
+작업 스레드에서 predict를 한 번만 호출하고, 결과를 각 요청으로 나누어 돌려줍니다.
+요청/응답 형식은 lambda_func.nox_pred와 동일하며, Lambda 런타임 인터페이스 에뮬레이터와
+같은 경로도 제공하므로 클라이언트는 URL만 바꿔 전환할 수 있습니다.
+"plant"(/ "model_version") 필드가 있으면 nox_pred와 같이 model_registry의 해당 라인/버전
+모델로 예측하며, 배치는 모델별로 나누어 실행합니다. 라인/버전 모델의 첫 로드는 예측 스레드가
+아닌 별도 로드 스레드에서 수행하므로 다른 요청의 예측을 막지 않습니다. 기본 모델은 NOX_MODEL_BACKEND에 따라
+선택합니다. (기본 auto: ONNX Runtime → 네이티브 Booster. 평탄화 모델은 배치 예측이 느려
+서버에서는 명시적으로 flat을 지정할 때만 사용)
+
+사용 예:
+    python nox_server.py --port 9000 --max_batch_size 64 --max_wait_ms 5
+    curl -XPOST localhost:9000/2015-03-31/functions/function/invocations \\
+        -d '{"features": [...]}'
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+from lambda_func import MODEL_DIR, make_prediction_response, parse_event_features
+from model_hot_reload import HotReloadableModel, ModelWatcher
+from model_registry import (
+    InvalidModelKeyError,
+    find_model_file,
+    get_default_registry,
+    get_model_backend,
+    load_model_file,
+)
+from predict_threading import PredictThreadingPolicy
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+INVOKE_PATHS = ("/invocations", "/2015-03-31/functions/function/invocations")
+
+_STATUS_TEXT = {200: "OK", 404: "Not Found", 405: "Method Not Allowed", 500: "Error"}
+
+
+class MicroBatcher:
+    """동시 요청을 모아 한 번의 predict로 처리하는 마이크로 배처
+
+    요청은 모델 키(key)별로 묶어 predict_fn(X, model)을 호출합니다.
+    (key / model이 None이면 기본 모델) model은 submit 전에 로드해 두어야 하며,
+    예측 스레드에서는 로드하지 않습니다.
+    """
+
+    def __init__(
+        self,
+        predict_fn,
+        max_batch_size: int = 64,
+        max_wait_ms: float = 5.0,
+        executor: ThreadPoolExecutor = None,
+    ):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait_s = max_wait_ms / 1000
+        self.executor = executor or ThreadPoolExecutor(max_workers=1)
+        self._queue: asyncio.Queue = None
+        self._task: asyncio.Task = None
+        self.stats = {"requests": 0, "batches": 0, "rows": 0, "predict_ms": 0.0}
+
+    async def start(self):
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self.executor.shutdown(wait=True)
+
+    async def submit(
+        self, features: np.ndarray, key: Optional[Hashable] = None, model=None
+    ) -> np.ndarray:
+        """(n_rows, n_features) 입력을 큐에 넣고 해당 행들의 예측값을 기다립니다."""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((features, future, key, model))
+        return await future
+
+    async def _collect(self) -> List[Tuple[np.ndarray, asyncio.Future, Hashable, Any]]:
+        """첫 요청을 받은 뒤 최대 배치 크기 또는 최대 대기 시간까지 요청을 모읍니다."""
+        batch = [await self._queue.get()]
+        rows = len(batch[0][0])
+        deadline = time.monotonic() + self.max_wait_s
+
+        while rows < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self._queue.get(), timeout=remaining)
+            except asyncio.TimeoutError:
+                break
+            batch.append(item)
+            rows += len(item[0])
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = []
+            try:
+                batch = await self._collect()
+                groups = {}
+                for item in batch:
+                    groups.setdefault(item[2], []).append(item)
+                for items in groups.values():
+                    await self._run_batch(items, items[0][3])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # 예상하지 못한 오류로 배처 작업이 끝나면 이후 요청이 모두 멈추므로 계속 진행
+                logger.error(f"마이크로 배치 처리 오류: {e}")
+                for _, future, _, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    async def _run_batch(self, batch, model):
+        loop = asyncio.get_running_loop()
+        inputs = [item[0] for item in batch]
+        try:
+            X = np.concatenate(inputs, axis=0) if len(inputs) > 1 else inputs[0]
+            start = time.perf_counter()
+            predictions = await loop.run_in_executor(
+                self.executor, self.predict_fn, X, model
+            )
+            self.stats["predict_ms"] += (time.perf_counter() - start) * 1000
+        except Exception as e:
+            if len(batch) == 1:
+                # 클라이언트 연결 종료 / 시간 초과로 이미 취소된 요청일 수 있음
+                if not batch[0][1].done():
+                    batch[0][1].set_exception(e)
+            else:
+                # 잘못된 요청 하나가 배치 전체를 실패시키지 않도록 개별 처리
+                await self._run_individually(batch, model)
+            return
+
+        self.stats["requests"] += len(batch)
+        self.stats["batches"] += 1
+        self.stats["rows"] += len(X)
+
+        offset = 0
+        for features, future, _, _ in batch:
+            n_rows = len(features)
+            if not future.done():
+                future.set_result(predictions[offset : offset + n_rows])
+            offset += n_rows
+
+    async def _run_individually(self, batch, model):
+        loop = asyncio.get_running_loop()
+        for features, future, _, _ in batch:
+            try:
+                start = time.perf_counter()
+                result = await loop.run_in_executor(
+                    self.executor, self.predict_fn, features, model
+                )
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+                continue
+
+            # 성공한 요청은 배치 경로와 같이 집계 (개별 predict 한 번 = 배치 1개)
+            self.stats["predict_ms"] += (time.perf_counter() - start) * 1000
+            self.stats["requests"] += 1
+            self.stats["batches"] += 1
+            self.stats["rows"] += len(features)
+            if not future.done():
+                future.set_result(result)
+
+
+class NOxInferenceServer:
+    """마이크로 배처를 감싼 최소 HTTP/1.1 서버 (keep-alive 지원)"""
+
+    def __init__(
+        self,
+        batcher: MicroBatcher,
+        host: str = "0.0.0.0",
+        port: int = 9000,
+        registry=None,
+        load_executor: ThreadPoolExecutor = None,
+    ):
+        self.batcher = batcher
+        self.host = host
+        self.port = port
+        # "plant" 요청의 버전 확인 / 모델 로드용 (기본값: model_registry.get_default_registry())
+        self.registry = registry
+        # 라인/버전 모델 로드 전용 스레드 (예측 스레드가 로드 중 멈추지 않도록 분리)
+        self.load_executor = load_executor or ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="nox-model-loader"
+        )
+
+    async def handle_event(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        """nox_pred와 같은 형식의 응답을 생성합니다."""
+        try:
+            key, model, extra = None, None, None
+            if "plant" in event:
+                registry = self.registry or get_default_registry()
+                try:
+                    version = registry.resolve_version(
+                        event["plant"], event.get("model_version")
+                    )
+                except InvalidModelKeyError as e:
+                    logger.warning(f"잘못된 모델 요청: {e}")
+                    return {
+                        "statusCode": 400,
+                        "body": json.dumps({"message": f"Invalid model request: {e}"}),
+                    }
+                key = (event["plant"], version)
+                extra = {"plant": event["plant"], "model_version": version}
+                # 캐시에 없으면 로드 스레드에서 로드 (다른 요청의 예측은 계속 진행)
+                model, _ = await asyncio.get_running_loop().run_in_executor(
+                    self.load_executor, registry.get, *key
+                )
+
+            features, is_batch = parse_event_features(event)
+            predictions = await self.batcher.submit(features, key, model)
+            return make_prediction_response(
+                event, features, predictions, is_batch, extra
+            )
+        except Exception as e:
+            logger.error(f"예측 중 오류 발생: {e}")
+            return {
+                "statusCode": 500,
+                "body": json.dumps({"message": f"Prediction failed: {str(e)}"}),
+            }
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get("content-length", 0))
+                body = await reader.readexactly(length) if length else b""
+
+                status, payload = await self._route(method, path, body)
+                data = json.dumps(payload).encode()
+                keep_alive = headers.get("connection", "").lower() != "close"
+                writer.write(
+                    (
+                        f"HTTP/1.1 {status} {_STATUS_TEXT.get(status, 'OK')}\r\n"
+                        f"Content-Type: application/json\r\n"
+                        f"Content-Length: {len(data)}\r\n"
+                        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+                    ).encode()
+                    + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionResetError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, method: str, path: str, body: bytes):
+        path = path.split("?", 1)[0]
+        if path in INVOKE_PATHS:
+            if method != "POST":
+                return 405, {"message": "POST only"}
+            try:
+                event = json.loads(body) if body else {}
+            except json.JSONDecodeError as e:
+                return 200, {
+                    "statusCode": 500,
+                    "body": json.dumps({"message": f"Prediction failed: {str(e)}"}),
+                }
+            return 200, await self.handle_event(event)
+        if path == "/health":
+            return 200, {"status": "ok"}
+        if path == "/stats":
+            stats = dict(self.batcher.stats)
+            stats["avg_batch_rows"] = stats["rows"] / max(stats["batches"], 1)
+            return 200, stats
+        return 404, {"message": "Not Found"}
+
+    async def serve_forever(self):
+        await self.batcher.start()
+        server = await asyncio.start_server(
+            self._handle_connection, self.host, self.port
+        )
+        logger.info(f"NOx 추론 서버 시작: http://{self.host}:{self.port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.batcher.stop()
+            self.load_executor.shutdown(wait=True)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--model_path",
+        type=str,
+        default=None,
+        help="기본 모델 파일 (기본값: NOX_MODEL_BACKEND에 맞는 trained_models/nox-model 파일)",
+    )
+    parser.add_argument("--host", type=str, default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--max_batch_size", type=int, default=64)
+    parser.add_argument("--max_wait_ms", type=float, default=5.0)
+    parser.add_argument(
+        "--watch", action="store_true", help="모델 디렉토리를 감시하여 무중단 교체"
+    )
+    parser.add_argument("--watch_interval", type=float, default=5.0)
+    parser.add_argument(
+        "--regenerate_derived",
+        action="store_true",
+        help="감시 중 pkl보다 오래된 npz / onnx를 다시 생성 (기본: pkl 로드)",
+    )
+    args = parser.parse_args()
+
+    if args.model_path is None:
+        backend = get_model_backend()
+        args.model_path = find_model_file(MODEL_DIR, backend)
+        if args.model_path is None:
+            raise FileNotFoundError(
+                f"{backend} 백엔드 모델 파일이 없습니다: {MODEL_DIR}"
+            )
+    model, _ = load_model_file(args.model_path)
+    logger.info(f"NOx 모델 로드 완료: {args.model_path}")
+    hot_model = HotReloadableModel(model)
+    watcher = None
+    if args.watch:
+        watcher = ModelWatcher(
+            os.path.dirname(os.path.abspath(args.model_path)),
+            target=hot_model,
+            poll_interval=args.watch_interval,
+            regenerate_derived=args.regenerate_derived,
+        ).start()
+
+    policy = PredictThreadingPolicy.from_env()
+    registry = get_default_registry()
+
+    def predict(X, model=None):
+        # model: 로드 스레드에서 미리 로드한 plant / version 모델 (None이면 기본 모델)
+        return policy.predict(hot_model.current if model is None else model, X)
+
+    batcher = MicroBatcher(
+        predict,
+        max_batch_size=args.max_batch_size,
+        max_wait_ms=args.max_wait_ms,
+    )
+    server = NOxInferenceServer(
+        batcher, host=args.host, port=args.port, registry=registry
+    )
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        logger.info("NOx 추론 서버 종료")
+    finally:
+        if watcher:
+            watcher.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+LightGBM 회귀 모델의 ONNX 변환 및 ONNX Runtime(CPU) 추론 백엔드
+onnxmltools로 변환한 모델을 onnxruntime으로 실행하며, 추론 시에는 lightgbm / scikit-learn이
+필요하지 않습니다. 입력은 float64(DoubleTensorType)로 변환하여 분할 임계값 비교 오차를 줄입니다.
+
+환경 변수
+---------
+NOX_ONNX_NUM_THREADS : 세션의 intra-op 스레드 수 (기본 1, 단건 예측 지연시간 기준)
+
+사용 예:
+    python onnx_model.py --model_path Model/lgbm_model.pkl --output Model/lgbm_model.onnx
+"""
+
+import json
+import logging
+import os
+from typing import List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+INPUT_NAME = "input"
+# ONNX Runtime 트리 앙상블은 리프 값을 float32로 누적하므로 허용 오차를 둡니다.
+PARITY_ATOL = 1e-4
+
+
+class OnnxNOxModel:
+    """ONNX Runtime 세션을 감싼 모델 (predict 인터페이스는 LGBMRegressor와 동일)"""
+
+    def __init__(self, session, feature_names: Optional[List[str]] = None):
+        self.session = session
+        self.feature_names = feature_names
+        self._input_name = session.get_inputs()[0].name
+        self.num_features = session.get_inputs()[0].shape[1]
+
+    @classmethod
+    def load(cls, path: str, num_threads: Optional[int] = None) -> "OnnxNOxModel":
+        import onnxruntime as ort
+
+        if num_threads is None:
+            num_threads = int(os.environ.get("NOX_ONNX_NUM_THREADS", 1))
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = num_threads
+        options.inter_op_num_threads = 1
+        session = ort.InferenceSession(
+            path, sess_options=options, providers=["CPUExecutionProvider"]
+        )
+
+        feature_names = None
+        metadata = session.get_modelmeta().custom_metadata_map
+        if "feature_names" in metadata:
+            feature_names = json.loads(metadata["feature_names"])
+        return cls(session, feature_names)
+
+    def predict(self, X) -> np.ndarray:
+        X = np.ascontiguousarray(np.atleast_2d(X), dtype=np.float64)
+        output = self.session.run(None, {self._input_name: X})[0]
+        return output.ravel().astype(np.float64)
+
+
+def convert_to_onnx(model):
+    """LGBMRegressor 또는 Booster를 ONNX 모델(ModelProto)로 변환합니다."""
+    import onnxmltools
+    from onnxmltools.convert.common.data_types import DoubleTensorType
+
+    booster = getattr(model, "booster_", model)
+    feature_names = booster.feature_name()
+    onnx_model = onnxmltools.convert_lightgbm(
+        booster,
+        initial_types=[(INPUT_NAME, DoubleTensorType([None, len(feature_names)]))],
+    )
+    entry = onnx_model.metadata_props.add()
+    entry.key = "feature_names"
+    entry.value = json.dumps(feature_names)
+    return onnx_model
+
+
+def export_onnx_model(model_path: str, output_path: str) -> str:
+    """피클 모델을 ONNX 파일로 저장합니다."""
+    import pickle
+
+    with open(model_path, "rb") as f:
+        model = pickle.load(f)
+
+    onnx_model = convert_to_onnx(model)
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    with open(output_path, "wb") as f:
+        f.write(onnx_model.SerializeToString())
+
+    size_mb = os.path.getsize(output_path) / 1024 / 1024
+    logger.info(f"ONNX 모델 저장 완료: {output_path} ({size_mb:.2f}MB)")
+    return output_path
+
+
+def verify_parity(
+    model, onnx_model: OnnxNOxModel, data_path: str, atol: float = PARITY_ATOL
+) -> float:
+    """샘플 데이터에서 원본 모델과 ONNX 모델의 예측 차이를 확인합니다.
+
+    Returns
+    -------
+    float
+        최대 절대 오차
+
+    Raises
+    ------
+    AssertionError
+        최대 절대 오차가 atol을 넘는 경우
+    """
+    import pandas as pd
+
+    feature_names = model.booster_.feature_name()
+    X = pd.read_csv(data_path)[feature_names].to_numpy(dtype=np.float64)
+    expected = model.predict(X)
+    actual = onnx_model.predict(X)
+
+    max_abs_diff = float(np.max(np.abs(expected - actual)))
+    logger.info(f"ONNX 예측 최대 절대 오차: {max_abs_diff:.3e} ({len(X)}행)")
+    assert max_abs_diff <= atol, f"ONNX 예측 불일치: {max_abs_diff:.3e} > {atol}"
+    return max_abs_diff
+
+
+if __name__ == "__main__":
+    import argparse
+    import pickle
+
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model_path", type=str, default="Model/lgbm_model.pkl")
+    parser.add_argument("--output", type=str, default="Model/lgbm_model.onnx")
+    parser.add_argument("--data_path", type=str, default="Data/test_sample.csv")
+    parser.add_argument("--atol", type=float, default=PARITY_ATOL)
+    args = parser.parse_args()
+
+    export_onnx_model(args.model_path, args.output)
+
+    with open(args.model_path, "rb") as f:
+        lgbm_model = pickle.load(f)
+    max_diff = verify_parity(
+        lgbm_model, OnnxNOxModel.load(args.output), args.data_path, args.atol
+    )
+    print(f"✅ ONNX 변환 및 예측 일치 확인 완료 (최대 절대 오차 {max_diff:.3e})")
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+배치 크기와 동일 호스트 작업자 수에 따라 LightGBM predict의 num_threads를 정하는 정책
+LightGBM은 기본적으로 모든 코어를 사용하므로, 단건 호출에서는 스레드 풀 기동 비용이 커지고
+다중 작업자 서버에서는 CPU를 과점유합니다.
+
+환경 변수
+---------
+NOX_PREDICT_SINGLE_THREAD_MAX_ROWS : 이 행 수 이하이면 단일 스레드로 예측 (보정값보다 우선)
+NOX_PREDICT_WORKERS : 같은 호스트에서 predict를 호출하는 작업자(프로세스) 수
+NOX_PREDICT_MAX_THREADS : 작업자 하나가 사용할 최대 스레드 수
+NOX_PREDICT_CALIBRATION_FILE : calibrate()가 저장한 보정 결과(JSON) 경로
+
+사용 예:
+    python predict_threading.py --calibrate --workers 4
+"""
+
+import json
+import logging
+import os
+import time
+from typing import Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CALIBRATION_FILE = "predict_threading_calibration.json"
+# 보정 결과가 없을 때 사용하는 기본 임계값 (행 수)
+DEFAULT_SINGLE_THREAD_MAX_ROWS = 1000
+
+
+class PredictThreadingPolicy:
+    """배치 크기별 num_threads 결정 정책"""
+
+    def __init__(
+        self,
+        single_thread_max_rows: int = DEFAULT_SINGLE_THREAD_MAX_ROWS,
+        workers: int = 1,
+        max_threads: Optional[int] = None,
+    ):
+        self.single_thread_max_rows = single_thread_max_rows
+        self.workers = max(1, workers)
+        self.max_threads = max_threads
+
+    @classmethod
+    def from_env(cls):
+        """환경 변수와 보정 파일에서 정책을 생성합니다."""
+        calibration_file = os.environ.get(
+            "NOX_PREDICT_CALIBRATION_FILE", DEFAULT_CALIBRATION_FILE
+        )
+        threshold = DEFAULT_SINGLE_THREAD_MAX_ROWS
+        if os.path.exists(calibration_file):
+            try:
+                with open(calibration_file) as f:
+                    threshold = int(json.load(f)["single_thread_max_rows"])
+                logger.info(
+                    f"predict 스레드 보정값 로드: {threshold}행 ({calibration_file})"
+                )
+            except Exception as e:
+                logger.warning(f"predict 스레드 보정 파일을 읽지 못했습니다: {e}")
+
+        threshold = int(os.environ.get("NOX_PREDICT_SINGLE_THREAD_MAX_ROWS", threshold))
+        workers = int(os.environ.get("NOX_PREDICT_WORKERS", 1))
+        max_threads = os.environ.get("NOX_PREDICT_MAX_THREADS")
+        return cls(
+            single_thread_max_rows=threshold,
+            workers=workers,
+            max_threads=int(max_threads) if max_threads else None,
+        )
+
+    def threads_per_worker(self) -> int:
+        """작업자 하나에 배분되는 코어 수"""
+        threads = max(1, (os.cpu_count() or 1) // self.workers)
+        if self.max_threads:
+            threads = min(threads, self.max_threads)
+        return threads
+
+    def num_threads(self, batch_size: int) -> int:
+        """배치 크기에 맞는 num_threads를 반환합니다."""
+        if batch_size <= self.single_thread_max_rows:
+            return 1
+        return self.threads_per_worker()
+
+    def predict(self, model, X) -> np.ndarray:
+        """정책에 따라 num_threads를 지정하여 예측합니다.
+
+        LightGBM 모델(LGBMRegressor, Booster)만 num_threads를 전달하며,
+        그 밖의 모델(평탄화 / ONNX 모델 등)은 그대로 predict를 호출합니다.
+        LGBMRegressor는 sklearn 래퍼의 입력 검사 비용(단건 약 0.4ms)을 피하도록
+        네이티브 Booster로 예측합니다. (결과는 래퍼와 동일)
+        """
+        if not _is_lightgbm_model(model):
+            return model.predict(X)
+        booster = getattr(model, "booster_", model)
+        return booster.predict(X, num_threads=self.num_threads(len(X)))
+
+    def calibrate(
+        self,
+        model,
+        X_sample: np.ndarray,
+        batch_sizes: Sequence[int] = (1, 10, 100, 1000, 10000),
+        repeats: int = 20,
+        min_speedup: float = 1.1,
+    ) -> int:
+        """단일 스레드 대비 다중 스레드가 min_speedup 이상 빨라지는 최소 배치 크기를 찾습니다.
+
+        Returns
+        -------
+        int
+            단일 스레드로 예측할 최대 행 수 (다중 스레드가 이득이 없으면 가장 큰 배치 크기)
+        """
+        threads = self.threads_per_worker()
+        threshold = max(batch_sizes)
+        for batch_size in sorted(batch_sizes):
+            reps = int(np.ceil(batch_size / len(X_sample)))
+            X = np.ascontiguousarray(np.tile(X_sample, (reps, 1))[:batch_size])
+            single_ms = _median_latency_ms(model, X, 1, repeats)
+            multi_ms = _median_latency_ms(model, X, threads, repeats)
+            logger.info(
+                f"   batch={batch_size:>6} 1스레드={single_ms:.3f}ms "
+                f"{threads}스레드={multi_ms:.3f}ms"
+            )
+            if threads > 1 and single_ms / multi_ms >= min_speedup:
+                threshold = batch_size - 1
+                break
+
+        self.single_thread_max_rows = threshold
+        logger.info(f"✅ 단일 스레드 임계값: {threshold}행 (작업자당 {threads}스레드)")
+        return threshold
+
+    def save_calibration(self, path: str = DEFAULT_CALIBRATION_FILE) -> None:
+        with open(path, "w") as f:
+            json.dump(
+                {
+                    "single_thread_max_rows": self.single_thread_max_rows,
+                    "workers": self.workers,
+                    "threads_per_worker": self.threads_per_worker(),
+                    "cpu_count": os.cpu_count(),
+                },
+                f,
+                indent=2,
+            )
+        logger.info(f"보정 결과 저장: {path}")
+
+
+def _is_lightgbm_model(model) -> bool:
+    return type(model).__module__.startswith("lightgbm")
+
+
+def _median_latency_ms(model, X, num_threads: int, repeats: int) -> float:
+    model = getattr(model, "booster_", model)
+    model.predict(X, num_threads=num_threads)  # 워밍업
+    latencies = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model.predict(X, num_threads=num_threads)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return float(np.median(latencies))
+
+
+_default_policy = None
+
+
+def get_default_policy() -> PredictThreadingPolicy:
+    """환경 변수 기반 정책을 프로세스당 한 번만 생성하여 반환합니다."""
+    global _default_policy
+    if _default_policy is None:
+        _default_policy = PredictThreadingPolicy.from_env()
+    return _default_policy
+
+
+def predict_adaptive(model, X) -> np.ndarray:
+    """기본 정책으로 예측합니다."""
+    return get_default_policy().predict(model, X)
+
+
+if __name__ == "__main__":
+    import argparse
+    import pickle
+
+    import pandas as pd
+
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calibrate", action="store_true")
+    parser.add_argument("--model_path", type=str, default="Model/lgbm_model.pkl")
+    parser.add_argument("--data_path", type=str, default="Data/test_sample.csv")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--output", type=str, default=DEFAULT_CALIBRATION_FILE)
+    args = parser.parse_args()
+
+    with open(args.model_path, "rb") as f:
+        lgbm_model = pickle.load(f)
+    feature_names = lgbm_model.booster_.feature_name()
+    sample = pd.read_csv(args.data_path)[feature_names].to_numpy(dtype=np.float64)
+
+    policy = PredictThreadingPolicy(workers=args.workers)
+    if args.calibrate:
+        policy.calibrate(lgbm_model, sample)
+        policy.save_calibration(args.output)
+    for batch_size in [1, 100, 10000]:
+        print(f"batch={batch_size:>6} → num_threads={policy.num_threads(batch_size)}")
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+예측 결과를 InfluxDB에 일괄 비동기로 기록하는 싱크
+예측 루프는 write()로 결과를 메모리 버퍼에 넣기만 하고, 백그라운드 스레드가 배치 크기 또는
+플러시 주기마다 line protocol로 모아 gzip 압축 후 한 번의 HTTP 요청으로 기록합니다.
+기록에 실패하면 지수 백오프로 재시도하며, InfluxDB가 내려가 있는 동안에도 버퍼는
+max_buffer 행을 넘지 않도록 가장 오래된 행부터 버립니다.
+연결 오류 / 429 / 5xx만 재시도하며, 4xx(잘못된 line protocol, 필드 타입 충돌)로 거부된
+배치는 다시 보내도 성공하지 않으므로 오류를 기록하고 버립니다.
+
+환경 변수
+---------
+NOX_SINK_URL : InfluxDB 주소 (예: http://10.238.27.132:8086)
+NOX_SINK_API : v2(/api/v2/write, 기본) 또는 v1(/write)
+NOX_SINK_TOKEN : v2 토큰 또는 v1 "사용자:비밀번호"
+NOX_SINK_ORG / NOX_SINK_BUCKET : v2 org / bucket (v1에서는 bucket이 database)
+NOX_SINK_MEASUREMENT : 기록할 measurement 이름 (기본 nox_prediction)
+"""
+
+import gzip
+import logging
+import math
+import os
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MEASUREMENT = "nox_prediction"
+
+
+_KEY_ESCAPES = str.maketrans({",": "\\,", "=": "\\=", " ": "\\ "})
+_MEASUREMENT_ESCAPES = str.maketrans({",": "\\,", " ": "\\ "})
+
+
+def _timestamp_ns(result: Dict[str, Any]) -> int:
+    if "tick_time" in result:
+        return int(round(float(result["tick_time"]) * 1e9))
+    if "timestamp" in result:
+        return int(datetime.fromisoformat(result["timestamp"]).timestamp() * 1e9)
+    return time.time_ns()
+
+
+def to_line_protocol(
+    result: Dict[str, Any],
+    measurement: str = DEFAULT_MEASUREMENT,
+    tags: Optional[Dict[str, str]] = None,
+) -> Optional[str]:
+    """예측 결과 딕셔너리를 line protocol 한 줄로 변환합니다.
+
+    prediction과 함께 입력 특성(features, f_ 접두어)과 단계별 소요 시간
+    (timings_ms / stage_ms, ms_ 접두어) 중 유한한 숫자 값만 필드로 기록합니다.
+    결과의 tags(예: 누락 복구 결과의 catch_up=true)는 싱크 공통 tags와 합쳐 태그로 기록합니다.
+    유한한 필드가 하나도 없으면(예: NaN 예측) 올바른 line protocol이 아니므로 None을
+    반환합니다.
+    """
+    fields = {"prediction": result["prediction"]}
+    for key, value in (result.get("features") or {}).items():
+        fields[f"f_{key}"] = value
+    for key, value in (
+        result.get("timings_ms") or result.get("stage_ms") or {}
+    ).items():
+        fields[f"ms_{key}"] = value
+
+    field_parts = []
+    for key, value in fields.items():
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            continue
+        if math.isfinite(value):
+            field_parts.append(f"{str(key).translate(_KEY_ESCAPES)}={value!r}")
+    if not field_parts:
+        return None
+
+    head = measurement.translate(_MEASUREMENT_ESCAPES)
+    tags = {**(tags or {}), **(result.get("tags") or {})}
+    for key, value in sorted(tags.items()):
+        head += f",{key.translate(_KEY_ESCAPES)}={str(value).translate(_KEY_ESCAPES)}"
+    return f"{head} {','.join(field_parts)} {_timestamp_ns(result)}"
+
+
+class PredictionSink:
+    """배치 / 주기 단위로 line protocol을 기록하는 백그라운드 싱크
+
+    Parameters
+    ----------
+    url : str
+        InfluxDB 주소
+    bucket : str
+        v2 bucket 또는 v1 database
+    api : str
+        "v2" 또는 "v1"
+    batch_size : int
+        한 번에 기록할 최대 행 수 (버퍼가 이만큼 차면 즉시 플러시)
+    flush_interval : float
+        배치가 차지 않아도 기록하는 주기 (초)
+    max_buffer : int
+        메모리에 보관할 최대 행 수 (초과 시 가장 오래된 행부터 버림)
+    max_retries : int
+        배치 하나의 재시도 횟수 (연결 오류 / 429 / 5xx가 계속되면 버퍼 앞쪽으로 되돌리고
+        다음 주기에 재시도, 4xx는 재시도 없이 버림)
+    """
+
+    def __init__(
+        self,
+        url: str,
+        bucket: str,
+        org: Optional[str] = None,
+        token: Optional[str] = None,
+        api: str = "v2",
+        measurement: str = DEFAULT_MEASUREMENT,
+        tags: Optional[Dict[str, str]] = None,
+        batch_size: int = 500,
+        flush_interval: float = 5.0,
+        max_buffer: int = 10000,
+        use_gzip: bool = True,
+        max_retries: int = 3,
+        retry_backoff: float = 0.5,
+        timeout: float = 10.0,
+    ):
+        self.write_url = self._make_write_url(url, api, bucket, org, token)
+        self.headers = {"Content-Type": "text/plain; charset=utf-8"}
+        if api == "v2" and token:
+            self.headers["Authorization"] = f"Token {token}"
+        if use_gzip:
+            self.headers["Content-Encoding"] = "gzip"
+        self.measurement = measurement
+        self.tags = tags or {}
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.use_gzip = use_gzip
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.timeout = timeout
+
+        self._buffer: deque = deque()
+        self._condition = threading.Condition()
+        self._in_flight = 0
+        self._closed = False
+        self._dropping = False
+        # stats는 호출 스레드(write)와 기록 스레드가 함께 갱신하므로 _lock으로 보호
+        self._lock = threading.Lock()
+        self.stats = {
+            "written": 0,
+            "dropped": 0,
+            "retries": 0,
+            "failed_batches": 0,
+            "rejected_batches": 0,
+            "skipped": 0,
+        }
+        self._thread = threading.Thread(
+            target=self._run, name="nox-prediction-sink", daemon=True
+        )
+        self._thread.start()
+
+    @staticmethod
+    def _make_write_url(url, api, bucket, org, token) -> str:
+        url = url.rstrip("/")
+        if api == "v1":
+            params = {"db": bucket, "precision": "ns"}
+            if token and ":" in token:
+                params["u"], params["p"] = token.split(":", 1)
+            return f"{url}/write?{urllib.parse.urlencode(params)}"
+        params = {"bucket": bucket, "precision": "ns"}
+        if org:
+            params["org"] = org
+        return f"{url}/api/v2/write?{urllib.parse.urlencode(params)}"
+
+    @classmethod
+    def from_env(cls, **kwargs) -> Optional["PredictionSink"]:
+        """환경 변수로 싱크를 생성합니다. (NOX_SINK_URL이 없으면 None)"""
+        url = os.environ.get("NOX_SINK_URL")
+        if not url:
+            return None
+        return cls(
+            url=url,
+            bucket=os.environ.get("NOX_SINK_BUCKET", "SRS1"),
+            org=os.environ.get("NOX_SINK_ORG", "SRS1"),
+            token=os.environ.get("NOX_SINK_TOKEN"),
+            api=os.environ.get("NOX_SINK_API", "v2"),
+            measurement=os.environ.get("NOX_SINK_MEASUREMENT", DEFAULT_MEASUREMENT),
+            **kwargs,
+        )
+
+    def write(self, result: Dict[str, Any]) -> None:
+        """예측 결과를 버퍼에 넣습니다. (네트워크 I/O 없음)"""
+        line = to_line_protocol(result, self.measurement, self.tags)
+        if line is None:
+            self._count("skipped")
+            logger.warning(f"기록할 유한한 값이 없는 예측 결과를 건너뜀: {result}")
+            return
+        with self._condition:
+            self._buffer.append(line)
+            self._trim()
+            if len(self._buffer) >= self.batch_size:
+                self._condition.notify()
+
+    def _trim(self) -> None:
+        overflow = len(self._buffer) - self.max_buffer
+        for _ in range(max(0, overflow)):
+            self._buffer.popleft()
+        if overflow > 0:
+            self._count("dropped", overflow)
+            # 장애 동안 매 예측마다 경고하지 않도록 버리기 시작할 때 한 번만 기록
+            if not self._dropping:
+                logger.warning(
+                    f"싱크 버퍼가 가득 차 오래된 예측부터 버립니다. (최대 {self.max_buffer}건)"
+                )
+                self._dropping = True
+
+    def _count(self, key: str, n: int = 1) -> None:
+        with self._lock:
+            self.stats[key] += n
+
+    def _take_batch(self) -> List[str]:
+        n = min(self.batch_size, len(self._buffer))
+        return [self._buffer.popleft() for _ in range(n)]
+
+    def _post(self, lines: List[str]) -> None:
+        body = "\n".join(lines).encode("utf-8")
+        if self.use_gzip:
+            body = gzip.compress(body)
+        request = urllib.request.Request(
+            self.write_url, data=body, headers=self.headers, method="POST"
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            if response.status >= 300:
+                raise RuntimeError(f"HTTP {response.status}")
+
+    @staticmethod
+    def _is_retryable(error: Exception) -> bool:
+        """연결 오류 / 429 / 5xx만 재시도 대상 (그 외 4xx는 다시 보내도 실패)"""
+        if isinstance(error, urllib.error.HTTPError):
+            return error.code == 429 or error.code >= 500
+        return True
+
+    def _write_batch(self, lines: List[str]) -> bool:
+        """배치를 기록합니다. (기록했거나 거부되어 버렸으면 True, 재시도가 필요하면 False)"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                self._post(lines)
+                self._count("written", len(lines))
+                self._dropping = False
+                return True
+            except Exception as e:
+                if not self._is_retryable(e):
+                    # 잘못된 배치를 되돌리면 이후 기록이 모두 막히므로 버림
+                    self._count("rejected_batches")
+                    self._count("dropped", len(lines))
+                    logger.error(
+                        f"InfluxDB가 예측 결과를 거부하여 버림 ({len(lines)}건): {e}"
+                    )
+                    return True
+                if attempt >= self.max_retries or self._closed:
+                    logger.error(f"예측 결과 기록 실패 ({len(lines)}건): {e}")
+                    return False
+                self._count("retries")
+                time.sleep(self.retry_backoff * 2**attempt)
+        return False
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                if not self._closed and len(self._buffer) < self.batch_size:
+                    self._condition.wait(timeout=self.flush_interval)
+                if self._closed and not self._buffer:
+                    self._condition.notify_all()
+                    return
+                batch = self._take_batch()
+                self._in_flight = len(batch)
+
+            if batch and not self._write_batch(batch):
+                self._count("failed_batches")
+                with self._condition:
+                    # 실패한 배치는 순서를 유지하여 버퍼 앞쪽으로 되돌림
+                    self._buffer.extendleft(reversed(batch))
+                    self._trim()
+                    self._in_flight = 0
+                    if self._closed:
+                        self._condition.notify_all()
+                        return
+                # InfluxDB 장애 동안 재시도 폭주를 막기 위해 한 주기 대기
+                time.sleep(self.flush_interval)
+                continue
+
+            with self._condition:
+                self._in_flight = 0
+                self._condition.notify_all()
+
+    def flush(self, timeout: float = 30.0) -> bool:
+        """버퍼가 모두 기록될 때까지 기다립니다. (성공 여부 반환)"""
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            self._condition.notify()
+            while self._buffer or self._in_flight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._condition.notify()
+                self._condition.wait(timeout=min(remaining, 0.1))
+        return True
+
+    def close(self, timeout: float = 30.0) -> None:
+        """남은 결과를 기록하고 백그라운드 스레드를 종료합니다."""
+        self.flush(timeout)
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join(timeout=timeout)
+        if self._buffer:
+            logger.warning(f"기록하지 못한 예측 {len(self._buffer)}건이 남아 있습니다.")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
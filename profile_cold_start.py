@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Lambda 콜드 스타트 import 예산 측정 스크립트
+매 측정마다 새 인터프리터에서 lambda_func를 import하고 첫 호출까지의 시간을 측정하며,
+`python -X importtime`으로 추론 경로의 모듈별 import 시간을 프로파일링합니다.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 새 인터프리터에서 실행할 측정 코드
+CHILD_CODE = """
+import json, sys, time
+t0 = time.perf_counter()
+import lambda_func
+t1 = time.perf_counter()
+lambda_func.get_nox_model()
+t2 = time.perf_counter()
+model = lambda_func.get_nox_model()
+n_features = getattr(model, "num_features", None) or model.n_features_in_
+event = {"features": [0.0] * n_features}
+response = lambda_func.nox_pred(event, None)
+t3 = time.perf_counter()
+lambda_func.nox_pred(event, None)
+t4 = time.perf_counter()
+print(json.dumps({
+    "status_code": response["statusCode"],
+    "import_ms": (t1 - t0) * 1000,
+    "model_load_ms": (t2 - t1) * 1000,
+    "first_invoke_ms": (t3 - t2) * 1000,
+    "warm_invoke_ms": (t4 - t3) * 1000,
+    "pandas_loaded": "pandas" in sys.modules,
+    "sklearn_loaded": "sklearn" in sys.modules,
+    "lightgbm_loaded": "lightgbm" in sys.modules,
+}))
+"""
+
+
+def prepare_workdir(model_path: str, use_flat: bool) -> str:
+    """Lambda 이미지와 같은 trained_models/nox-model 구조의 임시 작업 디렉토리를 만듭니다."""
+    workdir = tempfile.mkdtemp(prefix="nox_cold_start_")
+    model_dir = os.path.join(workdir, "trained_models", "nox-model")
+    os.makedirs(model_dir)
+    shutil.copy(model_path, os.path.join(model_dir, "lgbm_model.pkl"))
+    if use_flat:
+        sys.path.insert(0, REPO_DIR)
+        from flat_tree_model import export_flat_model
+
+        export_flat_model(model_path, os.path.join(model_dir, "lgbm_model_flat.npz"))
+    return workdir
+
+
+def run_child(workdir: str, importtime: bool = False):
+    """새 인터프리터에서 측정 코드를 실행합니다."""
+    env = dict(os.environ, PYTHONPATH=REPO_DIR, PYTHONDONTWRITEBYTECODE="1")
+    cmd = [sys.executable]
+    if importtime:
+        cmd += ["-X", "importtime"]
+    cmd += ["-c", CHILD_CODE]
+    start = subprocess.run(cmd, cwd=workdir, env=env, capture_output=True, text=True)
+    if start.returncode != 0:
+        raise RuntimeError(start.stderr[-2000:])
+    timings = json.loads(start.stdout.strip().splitlines()[-1])
+    return timings, start.stderr
+
+
+def parse_importtime(stderr: str, top_n: int):
+    """-X importtime 출력에서 최상위 모듈별 누적 import 시간(ms)을 추출합니다."""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        name = name[1:]
+        # 들여쓰기된 항목은 하위 import이므로 최상위 모듈만 집계
+        if name.startswith(" "):
+            continue
+        modules.append((name, int(cumulative_us) / 1000, int(self_us) / 1000))
+    modules.sort(key=lambda m: m[1], reverse=True)
+    return modules[:top_n]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model_path", type=str, default="Model/lgbm_model.pkl")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top_n", type=int, default=15)
+    parser.add_argument(
+        "--budget_ms",
+        type=float,
+        default=1000.0,
+        help="import + 모델 로드 + 첫 호출 예산",
+    )
+    args = parser.parse_args()
+
+    model_path = os.path.abspath(args.model_path)
+    for mode, use_flat in [("flat_npz", True), ("pickle", False)]:
+        print("=" * 60)
+        print(f"🚀 콜드 스타트 측정: {mode}")
+        print("=" * 60)
+        workdir = prepare_workdir(model_path, use_flat)
+        try:
+            runs = [run_child(workdir)[0] for _ in range(args.runs)]
+            for key in [
+                "import_ms",
+                "model_load_ms",
+                "first_invoke_ms",
+                "warm_invoke_ms",
+            ]:
+                values = sorted(r[key] for r in runs)
+                print(
+                    f"   {key:<16} median={values[len(values) // 2]:.1f}ms max={values[-1]:.1f}ms"
+                )
+
+            total = sorted(
+                r["import_ms"] + r["model_load_ms"] + r["first_invoke_ms"] for r in runs
+            )
+            median_total = total[len(total) // 2]
+            status = "✅ 예산 내" if median_total <= args.budget_ms else "❌ 예산 초과"
+            print(
+                f"   콜드 스타트 합계 median={median_total:.1f}ms (예산 {args.budget_ms:.0f}ms) {status}"
+            )
+            print(
+                f"   pandas={runs[0]['pandas_loaded']} sklearn={runs[0]['sklearn_loaded']} "
+                f"lightgbm={runs[0]['lightgbm_loaded']}"
+            )
+
+            _, stderr = run_child(workdir, importtime=True)
+            print(f"\n📋 import 시간 상위 {args.top_n}개 (누적 ms):")
+            for name, cumulative_ms, self_ms in parse_importtime(stderr, args.top_n):
+                print(f"   {name:<40} {cumulative_ms:8.1f} (self {self_ms:.1f})")
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
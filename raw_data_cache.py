@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+SRS1 원시 데이터 read-through 디스크 캐시
+테스트 스크립트 / 디버깅 / 백필에서 같은 과거 구간을 반복 조회하므로, 조회 결과를 1시간
+블록 parquet로 저장해 두고 다시 쓰입니다.
+
+- 블록 키: (measurement, 컬럼 집합, 시각) → cache_dir/<measurement>/<컬럼 해시>/<YYYYMMDDTHH>.parquet
+  블록 하나는 read_data와 같은 (정각, 정각 + 1시간] 구간의 행을 담습니다.
+- 요청 구간의 블록이 모두 있으면 디스크에서만 읽고, 없는 시간만 연속 구간으로 묶어
+  InfluxDB에서 조회한 뒤 블록으로 나누어 저장합니다.
+- 아직 데이터가 들어오고 있을 수 있는 최근 블록(끝 시각이 현재 - settle_seconds 이후)은
+  저장하지 않고 매번 조회합니다.
+- 전체 크기가 max_bytes를 넘으면 가장 오래 사용하지 않은 블록부터 삭제합니다.
+  블록 목록 / 크기는 처음 한 번만 디렉토리를 훑어 읽고 이후에는 메모리에서 갱신합니다.
+  (같은 디렉토리를 쓰는 다른 프로세스의 블록은 읽을 때 목록에 추가)
+
+환경 변수
+---------
+SRS1_CACHE_DIR : 캐시 디렉토리 (없으면 캐시 사용 안 함)
+SRS1_CACHE_MAX_MB : 캐시 최대 크기 (MB, 기본 2048)
+
+SRS1InfluxDBClient는 cache를 지정하지 않으면 RawDataCache.from_env()를 사용합니다.
+
+사용 예:
+    client = SRS1InfluxDBClient(cache=RawDataCache("Data/cache"))
+    data = client.read_data(columns, end_time, 6 * 3600)   # 두 번째부터 디스크에서 조회
+"""
+
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, List, Optional
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+TIME_COL = "_time_gateway"
+BLOCK = pd.Timedelta(hours=1)
+
+
+def _to_naive_utc(value) -> pd.Timestamp:
+    value = pd.Timestamp(value)
+    if value.tzinfo is not None:
+        value = value.tz_convert("UTC").tz_localize(None)
+    return value
+
+
+class RawDataCache:
+    """read_data 결과의 1시간 블록 parquet 캐시
+
+    Parameters
+    ----------
+    cache_dir : str
+        블록 파일을 저장할 디렉토리
+    max_bytes : int
+        캐시 최대 크기. 넘으면 최근 사용 시각(mtime)이 오래된 블록부터 삭제
+    settle_seconds : float
+        끝 시각이 현재 - settle_seconds 이후인 블록은 저장하지 않음 (늦게 도착하는 데이터)
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        max_bytes: int = 2 * 1024**3,
+        settle_seconds: float = 300.0,
+    ):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.settle = pd.Timedelta(seconds=settle_seconds)
+        self._lock = threading.Lock()
+        # 블록 경로 → 크기 (최근 사용 순서, 앞이 가장 오래됨). 처음 사용할 때 디렉토리에서 생성
+        self._index: Optional[OrderedDict] = None
+        self._total = 0
+        self.stats = {
+            "hit_blocks": 0,
+            "miss_blocks": 0,
+            "queries": 0,
+            "uncached_queries": 0,
+            "evicted_blocks": 0,
+        }
+
+    @classmethod
+    def from_env(cls, **kwargs) -> Optional["RawDataCache"]:
+        """환경 변수로 캐시를 생성합니다. (SRS1_CACHE_DIR이 없으면 None)"""
+        cache_dir = os.environ.get("SRS1_CACHE_DIR")
+        if not cache_dir:
+            return None
+        max_mb = float(os.environ.get("SRS1_CACHE_MAX_MB", 2048))
+        return cls(cache_dir, max_bytes=int(max_mb * 1024**2), **kwargs)
+
+    def _block_dir(self, table_name: str, columns: List[str]) -> str:
+        names = sorted({c.lower() for c in columns if c != TIME_COL})
+        digest = hashlib.sha1(",".join(names).encode()).hexdigest()[:16]
+        return os.path.join(self.cache_dir, table_name, digest)
+
+    @staticmethod
+    def _block_name(hour: pd.Timestamp) -> str:
+        return f"{hour.strftime('%Y%m%dT%H')}.parquet"
+
+    def _ensure_index(self) -> OrderedDict:
+        """블록 목록을 한 번만 디렉토리에서 읽습니다. (self._lock 안에서 호출)"""
+        if self._index is None:
+            blocks = sorted(self._blocks(), key=lambda item: item[1].st_mtime)
+            self._index = OrderedDict((path, stat.st_size) for path, stat in blocks)
+            self._total = sum(self._index.values())
+        return self._index
+
+    def _touch(self, path: str, size: int) -> None:
+        """블록을 가장 최근 사용으로 기록합니다."""
+        with self._lock:
+            index = self._ensure_index()
+            self._total += size - index.pop(path, 0)
+            index[path] = size
+
+    def _load_block(self, path: str) -> Optional[pd.DataFrame]:
+        try:
+            data = pd.read_parquet(path)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            # 깨진 블록은 다시 조회하여 덮어씀
+            logger.warning(f"캐시 블록 읽기 실패, 다시 조회: {path} ({e})")
+            return None
+        # 최근 사용 시각 갱신 (삭제 순서 기준, 재시작 후 목록을 다시 읽을 때 사용)
+        try:
+            os.utime(path)
+            self._touch(path, os.path.getsize(path))
+        except OSError:
+            pass
+        return data
+
+    def _save_block(self, path: str, data: pd.DataFrame) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        data.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+        self._touch(path, os.path.getsize(path))
+
+    def read(
+        self,
+        fetch: Callable[..., pd.DataFrame],
+        columns: list,
+        start_time: pd.Timestamp,
+        query_range_seconds: int,
+        table_name: str = "SRS1",
+    ) -> pd.DataFrame:
+        """(start_time - query_range_seconds, start_time] 구간을 캐시를 거쳐 조회합니다.
+
+        Parameters
+        ----------
+        fetch : Callable
+            fetch(columns, start_time, query_range_seconds, table_name) -> DataFrame
+            캐시에 없는 구간을 조회하는 함수 (실패 시 예외를 발생시켜야 함)
+        columns, start_time, query_range_seconds, table_name
+            SRS1InfluxDBClient.read_data와 같음
+
+        Returns
+        -------
+        pd.DataFrame
+            read_data와 같은 형태 (데이터가 없으면 빈 DataFrame)
+        """
+        hi = _to_naive_utc(start_time)
+        lo = hi - pd.Timedelta(seconds=query_range_seconds)
+        block_dir = self._block_dir(table_name, columns)
+        cacheable_until = pd.Timestamp.now("UTC").tz_localize(None) - self.settle
+
+        # 블록 h는 (h, h + 1시간] 구간
+        hours = pd.date_range(lo.floor("h"), hi.ceil("h") - BLOCK, freq=BLOCK)
+        frames, missing, recent = [], [], []
+        for hour in hours:
+            if hour + BLOCK > cacheable_until:
+                recent.append(hour)
+                continue
+            block = self._load_block(os.path.join(block_dir, self._block_name(hour)))
+            if block is None:
+                missing.append(hour)
+            else:
+                frames.append(block)
+        self.stats["hit_blocks"] += len(hours) - len(missing) - len(recent)
+        self.stats["miss_blocks"] += len(missing)
+
+        # 없는 시간은 연속 구간마다 한 번씩 조회하여 블록으로 나누어 저장
+        wrote = False
+        for run in self._runs(missing):
+            run_start, run_end = run[0], run[-1] + BLOCK
+            data = fetch(
+                columns, run_end, int((run_end - run_start).total_seconds()), table_name
+            )
+            self.stats["queries"] += 1
+            times = self._naive_times(data)
+            for hour in run:
+                block = (
+                    data[(times > hour) & (times <= hour + BLOCK)]
+                    if len(data)
+                    else pd.DataFrame()
+                )
+                self._save_block(os.path.join(block_dir, self._block_name(hour)), block)
+                frames.append(block)
+                wrote = True
+
+        if recent:
+            recent_start = max(lo, recent[0])
+            frames.append(
+                fetch(
+                    columns,
+                    hi,
+                    int(round((hi - recent_start).total_seconds())),
+                    table_name,
+                )
+            )
+            self.stats["uncached_queries"] += 1
+
+        if wrote:
+            self.evict()
+
+        frames = [frame for frame in frames if len(frame)]
+        if not frames:
+            return pd.DataFrame()
+        data = pd.concat(frames, ignore_index=True)
+        times = self._naive_times(data)
+        data = data[(times > lo) & (times <= hi)]
+        data = data.sort_values(TIME_COL, kind="stable").reset_index(drop=True)
+
+        order = [
+            c.lower() for c in columns if c != TIME_COL and c.lower() in data.columns
+        ]
+        order += [c for c in data.columns if c not in order and c != TIME_COL]
+        return data[order + [TIME_COL]]
+
+    @staticmethod
+    def _runs(hours: List[pd.Timestamp]) -> List[List[pd.Timestamp]]:
+        runs = []
+        for hour in hours:
+            if runs and hour - runs[-1][-1] == BLOCK:
+                runs[-1].append(hour)
+            else:
+                runs.append([hour])
+        return runs
+
+    @staticmethod
+    def _naive_times(data: pd.DataFrame) -> pd.Series:
+        if not len(data):
+            return pd.Series(dtype="datetime64[ns]")
+        times = pd.to_datetime(data[TIME_COL])
+        if times.dt.tz is not None:
+            times = times.dt.tz_convert("UTC").dt.tz_localize(None)
+        return times
+
+    def size_bytes(self) -> int:
+        with self._lock:
+            self._ensure_index()
+            return self._total
+
+    def _blocks(self):
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith(".parquet"):
+                    path = os.path.join(root, name)
+                    try:
+                        yield path, os.stat(path)
+                    except OSError:
+                        continue
+
+    def evict(self) -> int:
+        """캐시 크기가 max_bytes 이하가 될 때까지 오래 사용하지 않은 블록을 삭제합니다."""
+        with self._lock:
+            index = self._ensure_index()
+            removed = 0
+            while index and self._total > self.max_bytes:
+                path, size = index.popitem(last=False)
+                self._total -= size
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    continue
+                except OSError as e:
+                    logger.warning(f"캐시 블록 삭제 실패: {path} ({e})")
+                    continue
+                removed += 1
+            if removed:
+                self.stats["evicted_blocks"] += removed
+                logger.info(
+                    f"캐시 블록 {removed}개 삭제 (현재 {self._total / 1024**2:.1f}MB)"
+                )
+            return removed
+
+    def clear(self) -> None:
+        """캐시 블록을 모두 삭제합니다."""
+        with self._lock:
+            for path, _ in list(self._blocks()):
+                os.remove(path)
+            self._index = OrderedDict()
+            self._total = 0
+
+
+if __name__ == "__main__":
+    import argparse
+    import shutil
+    import tempfile
+    import time
+
+    from local_influxdb import LocalInfluxDBServer, load_frame, synthetic_history
+    from test_influxdb_realtime import REALTIME_COLUMNS, SRS1InfluxDBClient
+
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger().setLevel(logging.WARNING)
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--data_path", type=str, default="Data/test_sample.csv")
+    parser.add_argument("--hours", type=float, default=12.0, help="모의 데이터 길이")
+    parser.add_argument("--window_hours", type=float, default=6.0, help="조회 구간")
+    parser.add_argument("--latency_ms", type=float, default=20.0)
+    parser.add_argument("--cache_dir", type=str, default=None)
+    args = parser.parse_args()
+
+    history = synthetic_history(load_frame(args.data_path), args.hours)
+    cache_dir = args.cache_dir or tempfile.mkdtemp(prefix="srs1_cache_")
+    columns = [c for c in REALTIME_COLUMNS if c != TIME_COL]
+    end_time = pd.Timestamp(history[TIME_COL].max())
+    window = int(args.window_hours * 3600)
+
+    with LocalInfluxDBServer(history, latency_ms=args.latency_ms) as server:
+        plain = SRS1InfluxDBClient(
+            host=server.host, port=server.port, verbose=False, cache=False
+        )
+        cache = RawDataCache(cache_dir)
+        cached = SRS1InfluxDBClient(
+            host=server.host, port=server.port, verbose=False, cache=cache
+        )
+
+        def run(label, client, end, seconds):
+            requests = server.stats["requests"]
+            start = time.perf_counter()
+            data = client.read_data(columns, end, seconds)
+            elapsed = (time.perf_counter() - start) * 1000
+            print(
+                f"   {label:28s} {len(data):7d}행 {elapsed:7.0f}ms, "
+                f"InfluxDB 요청 {server.stats['requests'] - requests}회"
+            )
+            return data
+
+        print(f"🚀 원시 데이터 캐시: {args.window_hours:g}시간 구간 → {cache_dir}")
+        print("=" * 60)
+        expected = run("캐시 없음", plain, end_time, window)
+        cold = run("캐시 (처음, 블록 저장)", cached, end_time, window)
+        warm = run("캐시 (같은 구간)", cached, end_time, window)
+        shifted_end = end_time - pd.Timedelta(minutes=90)
+        shifted = run("캐시 (90분 앞 구간)", cached, shifted_end, window + 7200)
+        reference = plain.read_data(columns, shifted_end, window + 7200)
+
+        for label, data, base in (
+            ("처음", cold, expected),
+            ("같은 구간", warm, expected),
+            ("앞 구간", shifted, reference),
+        ):
+            try:
+                pd.testing.assert_frame_equal(data, base, check_dtype=False)
+                print(f"🔍 {label}: read_data와 일치")
+            except AssertionError as e:
+                print(f"🔍 {label}: read_data와 불일치 ({e})")
+
+        # 크기 상한을 절반으로 줄이면 오래 사용하지 않은 블록부터 삭제
+        size = cache.size_bytes()
+        cache.max_bytes = size // 2
+        cache.evict()
+        print(
+            f"🧹 상한 {size / 2 / 1e6:.2f}MB로 축소: 블록 "
+            f"{cache.stats['evicted_blocks']}개 삭제, {cache.size_bytes() / 1e6:.2f}MB"
+        )
+        print(f"📊 통계: {cache.stats}")
+
+    if args.cache_dir is None:
+        shutil.rmtree(cache_dir, ignore_errors=True)
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+실시간 예측 루프가 밀렸을 때의 누락 주기 복구(catch-up)
+한 주기의 처리가 예측 주기를 넘기거나 프로세스가 재시작되면, 그 사이의 격자 시각(epoch 기준
+interval 배수)은 예측 없이 지나갑니다. BacklogCatchUp은 마지막으로 예측한 주기 이후의
+누락 시각을 찾아
+
+1. 누락 구간 + 전처리 이력(30분)을 한 번의 read_data 조회로 가져오고
+2. 한 번의 전처리 후 누락 시각의 행을 모아 한 번에(벡터화) 예측하고
+3. 결과를 싱크(prediction_sink)에 catch_up=true 태그로 기록한 뒤
+4. 마지막 예측 주기를 갱신하여 실시간 주기에 다시 합류합니다.
+
+max_backlog_seconds보다 오래된 누락 주기는 복구하지 않고 건너뜀으로 집계합니다.
+복구 예측은 실시간 주기(realtime_pipeline.build_srs1_stages / IncrementalNOxPredictor)와
+같은 원시 컬럼 → NOxDataPreprocessor → 모델 피처 경로를 사용합니다.
+
+state_path를 주면 마지막 예측 주기를 mark()마다 JSON 파일에 원자적으로 저장하고
+(임시 파일 + os.replace), 재시작 시 복원하여 중단 구간을 복구합니다.
+
+사용 예:
+    catch_up = BacklogCatchUp(
+        SRS1InfluxDBClient(), model, interval_seconds=5, state_path="state/catch_up.json"
+    )
+    results = catch_up.recover()               # 누락 주기 복구 (재시작 직후 포함)
+    catch_up.mark(catch_up.current_tick(now))  # 실시간 예측 성공 후 호출
+"""
+
+import json
+import logging
+import math
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from sensor_buffer import PREPROCESSOR_HISTORY_SECONDS, TIME_COL
+
+logger = logging.getLogger(__name__)
+
+
+class BacklogCatchUp:
+    """누락 주기를 일괄 조회 / 일괄 예측으로 복구합니다.
+
+    Parameters
+    ----------
+    client
+        read_data(columns, start_time, query_range_seconds, table_name)를 제공하는
+        조회 클라이언트 (SRS1InfluxDBClient)
+    model
+        predict(X)를 제공하는 모델 (HotReloadableModel이면 최신 모델 사용)
+    interval_seconds : float
+        예측 주기 (격자 간격)
+    max_backlog_seconds : float
+        복구할 최대 과거 범위. 이보다 오래된 누락 주기는 건너뜀
+    columns : List[str], optional
+        조회할 원시 컬럼 (기본값: test_influxdb_realtime.REALTIME_COLUMNS)
+    sink : prediction_sink.PredictionSink, optional
+        복구한 예측을 기록할 싱크
+    state_path : str, optional
+        마지막 예측 주기를 저장 / 복원할 JSON 파일
+    """
+
+    def __init__(
+        self,
+        client,
+        model,
+        interval_seconds: float = 5.0,
+        max_backlog_seconds: float = 900.0,
+        columns: Optional[List[str]] = None,
+        preprocessor=None,
+        sink=None,
+        table_name: str = "SRS1",
+        history_seconds: float = PREPROCESSOR_HISTORY_SECONDS,
+        state_path: Optional[str] = None,
+    ):
+        from data_preprocessor import NOxDataPreprocessor
+
+        if columns is None:
+            from test_influxdb_realtime import REALTIME_COLUMNS
+
+            columns = REALTIME_COLUMNS
+        self.client = client
+        self.model = model
+        self.interval = interval_seconds
+        self.max_backlog = max_backlog_seconds
+        self.columns = columns
+        self.preprocessor = preprocessor or NOxDataPreprocessor()
+        self.sink = sink
+        self.table_name = table_name
+        self.history_seconds = history_seconds
+        self.state_path = state_path
+        # 실시간 주기와 복구가 다른 스레드에서 mark할 수 있음
+        self._lock = threading.Lock()
+        self.stats = {
+            "recoveries": 0,
+            "recovered_ticks": 0,
+            "capped_ticks": 0,
+            "no_data_ticks": 0,
+            "failures": 0,
+        }
+        # 마지막으로 예측(실시간 또는 복구)한 주기 시각 (epoch 초)
+        self.last_tick: Optional[float] = self._load_state()
+
+    def _load_state(self) -> Optional[float]:
+        if not self.state_path or not os.path.exists(self.state_path):
+            return None
+        try:
+            with open(self.state_path) as f:
+                last_tick = float(json.load(f)["last_tick"])
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(
+                f"복구 상태 읽기 실패, 처음부터 시작: {self.state_path} ({e})"
+            )
+            return None
+        logger.info(
+            f"마지막 예측 주기 복원: {pd.Timestamp(last_tick, unit='s').isoformat()}"
+        )
+        return last_tick
+
+    def _save_state(self) -> None:
+        directory = os.path.dirname(self.state_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.state_path}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(
+                    {"last_tick": self.last_tick, "interval_seconds": self.interval}, f
+                )
+            os.replace(tmp_path, self.state_path)
+        except OSError as e:
+            # 저장 실패가 예측 주기를 막지 않도록 기록만 함
+            logger.warning(f"복구 상태 저장 실패: {e}")
+
+    def current_tick(self, now: Optional[float] = None) -> float:
+        """now 이하의 마지막 격자 시각 (실시간 예측이 처리하는 주기)"""
+        now = time.time() if now is None else now
+        return math.floor(now / self.interval) * self.interval
+
+    def mark(self, tick_time: float) -> None:
+        """예측을 마친 주기를 기록합니다. (격자 시각, current_tick 참고)
+
+        state_path가 있으면 파일에도 저장합니다.
+        """
+        with self._lock:
+            if self.last_tick is not None and tick_time <= self.last_tick:
+                return
+            self.last_tick = float(tick_time)
+            if self.state_path:
+                self._save_state()
+
+    def missed_ticks(self, now: Optional[float] = None) -> np.ndarray:
+        """last_tick 이후 현재 주기 전까지의 누락 격자 시각 (상한 적용)
+
+        현재 주기(now 이하의 마지막 격자 시각)는 실시간 예측이 처리하므로 제외합니다.
+        """
+        if self.last_tick is None:
+            return np.empty(0)
+        now = time.time() if now is None else now
+        current_tick = self.current_tick(now)
+        first = (math.floor(self.last_tick / self.interval) + 1) * self.interval
+        ticks = np.arange(first, current_tick - self.interval / 2, self.interval)
+
+        oldest = now - self.max_backlog
+        capped = int(np.count_nonzero(ticks < oldest))
+        if capped:
+            self.stats["capped_ticks"] += capped
+            logger.warning(
+                f"복구 상한({self.max_backlog:.0f}초)을 넘은 누락 주기 {capped}개 건너뜀"
+            )
+        return ticks[ticks >= oldest]
+
+    def score_ticks(self, ticks: np.ndarray) -> List[Dict[str, Any]]:
+        """주기 시각들을 한 번의 조회 / 전처리 / 예측으로 계산합니다."""
+        from predict_threading import predict_adaptive
+        from realtime_pipeline import model_feature_names
+
+        if not len(ticks):
+            return []
+        first, last = float(ticks[0]), float(ticks[-1])
+        end_time = pd.Timestamp(last, unit="s")
+        raw_data = self.client.read_data(
+            columns=self.columns,
+            start_time=end_time,
+            query_range_seconds=math.ceil(last - first + self.history_seconds),
+            table_name=self.table_name,
+        )
+        if raw_data is None or raw_data.empty:
+            self.stats["no_data_ticks"] += len(ticks)
+            logger.warning(f"복구 구간 데이터 없음: 주기 {len(ticks)}개")
+            return []
+
+        model_data, _ = self.preprocessor.preprocess_realtime_data(raw_data)
+        index = pd.DatetimeIndex(model_data.index)
+        if index.tz is not None:
+            index = index.tz_convert("UTC").tz_localize(None)
+        row_times = index.as_unit("ns").asi8 / 1e9
+
+        # 주기 시각 이하의 마지막 행 (한 주기 이내의 행이 없으면 데이터 누락으로 처리)
+        positions = np.searchsorted(row_times, ticks, side="right") - 1
+        valid = (positions >= 0) & (
+            ticks - row_times[np.maximum(positions, 0)] < self.interval
+        )
+        self.stats["no_data_ticks"] += int(np.count_nonzero(~valid))
+        ticks, positions = ticks[valid], positions[valid]
+        if not len(ticks):
+            return []
+
+        model = getattr(self.model, "current", self.model)
+        feature_names = model_feature_names(model)
+        features = model_data.reindex(columns=feature_names).to_numpy(dtype=np.float64)[
+            positions
+        ]
+        predictions = np.asarray(predict_adaptive(model, features), dtype=np.float64)
+
+        return [
+            {
+                "tick_time": float(tick),
+                "timestamp": pd.Timestamp(tick, unit="s").isoformat(),
+                "prediction": float(prediction),
+                "catch_up": True,
+                # 싱크가 실시간 예측과 구분할 수 있도록 태그로 기록
+                "tags": {"catch_up": "true"},
+            }
+            for tick, prediction in zip(ticks, predictions)
+        ]
+
+    def recover(self, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """누락 주기를 복구하고 싱크에 기록합니다. (누락이 없으면 빈 리스트)"""
+        ticks = self.missed_ticks(now)
+        if not len(ticks):
+            return []
+
+        start = time.perf_counter()
+        try:
+            results = self.score_ticks(ticks)
+        except Exception as e:
+            # 복구 실패가 실시간 예측을 막지 않도록 기록만 하고 진행
+            self.stats["failures"] += 1
+            logger.error(f"누락 주기 복구 실패 ({len(ticks)}개): {e}")
+            return []
+
+        if self.sink is not None:
+            for result in results:
+                self.sink.write(result)
+        # 복구하지 못한 주기도 다시 시도하지 않고 실시간 주기에 합류
+        self.mark(float(ticks[-1]))
+        self.stats["recoveries"] += 1
+        self.stats["recovered_ticks"] += len(results)
+        logger.info(
+            f"누락 주기 {len(results)}/{len(ticks)}개 복구 "
+            f"({(time.perf_counter() - start) * 1000:.0f}ms)"
+        )
+        return results
+
+
+if __name__ == "__main__":
+    import argparse
+    import warnings
+
+    from local_influxdb import LocalInfluxDBServer, load_frame
+    from model_registry import load_model_file
+    from test_influxdb_realtime import SRS1InfluxDBClient
+
+    # 전처리 단계별 INFO 로그 / pandas 단편화 경고가 출력에 섞이지 않도록 함
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger().setLevel(logging.WARNING)
+    warnings.filterwarnings("ignore", category=pd.errors.PerformanceWarning)
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--data_path", type=str, default="Data/test_sample.csv")
+    parser.add_argument("--model_path", type=str, default="Model/lgbm_model.pkl")
+    parser.add_argument("--interval", type=float, default=5.0)
+    parser.add_argument(
+        "--outage_seconds", type=float, default=300.0, help="모의 중단 길이"
+    )
+    parser.add_argument("--max_backlog_seconds", type=float, default=900.0)
+    args = parser.parse_args()
+
+    data = load_frame(args.data_path)
+    model, _ = load_model_file(args.model_path)
+    times = pd.to_datetime(data[TIME_COL])
+    now = times.max().tz_localize("UTC").timestamp() + 0.5
+
+    # 로컬 InfluxDB로 중단 직후 상황을 재현: 마지막 예측 이후 outage_seconds 동안 누락
+    with LocalInfluxDBServer(data) as server:
+        client = SRS1InfluxDBClient(host=server.host, port=server.port, verbose=False)
+        catch_up = BacklogCatchUp(
+            client,
+            model,
+            interval_seconds=args.interval,
+            max_backlog_seconds=args.max_backlog_seconds,
+        )
+        catch_up.last_tick = now - args.outage_seconds
+
+        start = time.perf_counter()
+        results = catch_up.recover(now)
+        elapsed = (time.perf_counter() - start) * 1000
+
+    print(f"🔄 누락 주기 복구: {len(results)}개 ({elapsed:.0f}ms)")
+    print(f"   주기당 {elapsed / max(len(results), 1):.1f}ms (조회 / 전처리 1회 공유)")
+    print(f"📊 통계: {catch_up.stats}")
+    if results:
+        print(
+            f"   {results[0]['timestamp']} ~ {results[-1]['timestamp']}, "
+            f"다음 실시간 주기부터 합류 (last_tick={catch_up.last_tick:.0f})"
+        )
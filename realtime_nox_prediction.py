@@ -3,13 +3,19 @@
 실시간 NOx 예측 스크립트
 InfluxDB에서 실시간 데이터를 조회하고 학습된 모델로 NOx 예측을 수행합니다.
 """
+
 import json
 import logging
-import pickle
+import os
+import time
 import numpy as np
 from datetime import datetime, timedelta
-from influxdb_client import InfluxDBClient
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
+
+from model_registry import find_model_file, get_model_backend, load_model_file
+from predict_threading import predict_adaptive
+
+# influxdb_client는 import 비용이 커서 클라이언트 생성 시점에 import 합니다.
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
@@ -33,13 +39,26 @@ REQUIRED_MEASUREMENTS = [
 ]
 
 
+MODEL_PATH = "Model/lgbm_model.pkl"
+
+
 def load_nox_model():
-    """NOx LGBM 모델을 로드합니다."""
+    """NOx LGBM 모델을 로드합니다.
+
+    NOX_MODEL_BACKEND(auto / cold_start / flat / onnx / lightgbm)로 백엔드를 선택하며,
+    auto는 ONNX 모델(onnxruntime 설치 시)이 있으면 우선 사용하고, 없으면 피클 모델을
+    네이티브 Booster로 예측합니다.
+    """
     try:
-        model_path = "Model/lgbm_model.pkl"
-        with open(model_path, "rb") as f:
-            model = pickle.load(f)
-        logger.info("NOx 모델 로드 완료")
+        backend = get_model_backend()
+        model_path = find_model_file(os.path.dirname(MODEL_PATH), backend)
+        if model_path is None:
+            raise FileNotFoundError(
+                f"{backend} 백엔드 모델 파일이 없습니다: {MODEL_PATH}"
+            )
+
+        model, _ = load_model_file(model_path)
+        logger.info(f"NOx 모델 로드 완료: {model_path} (backend={backend})")
         return model
     except Exception as e:
         logger.error(f"모델 로드 실패: {e}")
@@ -49,6 +68,8 @@ def load_nox_model():
 def get_influxdb_client():
     """InfluxDB 클라이언트를 생성합니다."""
     try:
+        from influxdb_client import InfluxDBClient
+
         client = InfluxDBClient(
             url=INFLUXDB_URL, token=INFLUXDB_TOKEN, org=INFLUXDB_ORG
         )
@@ -63,10 +84,134 @@ def get_influxdb_client():
         return None
 
 
-def get_realtime_features(client, time_range="-5m"):
-    """실시간 특성 데이터를 조회합니다."""
+def build_realtime_features_query(measurements=None, time_range="-5m") -> str:
+    """모든 측정값의 마지막 값을 한 행으로 반환하는 Flux 쿼리를 생성합니다.
+
+    측정값 집합은 == 비교의 or 조건으로 펼칩니다. (contains()는 스토리지 엔진으로
+    푸시다운되지 않아 버킷 전체를 읽게 됨) 측정값별 last() 결과의 _time이 서로 달라도
+    한 행으로 정렬되도록, 모든 테이블에 같은 _start를 행 키로 pivot 합니다.
+    """
+    measurements = measurements or REQUIRED_MEASUREMENTS
+    predicate = " or ".join(f'r["_measurement"] == "{m}"' for m in measurements)
+    return f"""
+    from(bucket: "{INFLUXDB_BUCKET}")
+        |> range(start: {time_range})
+        |> filter(fn: (r) => {predicate})
+        |> last()
+        |> keep(columns: ["_start", "_measurement", "_value"])
+        |> group()
+        |> pivot(rowKey: ["_start"], columnKey: ["_measurement"], valueColumn: "_value")
+    """
+
+
+def build_aggregate_features_query(
+    measurements=None, time_range="-1h", every="1m", fns=("mean",)
+) -> str:
+    """측정값을 every 간격으로 서버에서 집계하는 Flux 쿼리를 생성합니다.
+
+    집계 함수마다 aggregateWindow 결과의 _field를 함수 이름으로 바꾼 뒤 합치고,
+    _time을 행 키로 pivot 하여 "<측정값>_<함수>" 컬럼을 가진 한 테이블을 반환합니다.
+    """
+    measurements = measurements or REQUIRED_MEASUREMENTS
+    predicate = " or ".join(f'r["_measurement"] == "{m}"' for m in measurements)
+    streams = "\n".join(f"""
+    {fn}_data = data
+        |> aggregateWindow(every: {every}, fn: {fn}, createEmpty: false)
+        |> set(key: "_field", value: "{fn}")""" for fn in fns)
+    return f"""
+    data = from(bucket: "{INFLUXDB_BUCKET}")
+        |> range(start: {time_range})
+        |> filter(fn: (r) => {predicate})
+    {streams}
+
+    union(tables: [{", ".join(f"{fn}_data" for fn in fns)}])
+        |> keep(columns: ["_time", "_measurement", "_field", "_value"])
+        |> group()
+        |> pivot(rowKey: ["_time"], columnKey: ["_measurement", "_field"], valueColumn: "_value")
+        |> sort(columns: ["_time"])
+    """
+
+
+def get_aggregated_features(
+    client, time_range="-1h", every="1m", fns=("mean",), query_api=None
+) -> "pd.DataFrame":
+    """서버 측 집계 결과를 _time 인덱스의 DataFrame으로 조회합니다.
+
+    결과 행이 많으므로 FluxRecord를 행마다 만들지 않고 annotated CSV를 컬럼 단위로
+    파싱합니다. (columnar_ingest.query_flux_columnar)
+    """
+    import pandas as pd
+
+    from columnar_ingest import query_flux_columnar
+
+    query_api = query_api or client.query_api()
+    data = query_flux_columnar(
+        query_api,
+        build_aggregate_features_query(time_range=time_range, every=every, fns=fns),
+    )
+    if data.empty:
+        return pd.DataFrame()
+    data = data.drop(columns=["result", "table"], errors="ignore")
+    return data.set_index("_time").sort_index()
+
+
+def get_realtime_features(
+    client, time_range="-5m", query_api=None, raise_on_error=False
+):
+    """실시간 특성 데이터를 한 번의 쿼리로 조회합니다.
+
+    Parameters
+    ----------
+    client : InfluxDBClient
+        InfluxDB 클라이언트
+    time_range : str
+        조회 범위 (Flux duration)
+    query_api : optional
+        재사용할 QueryApi (없으면 client.query_api()로 생성)
+    raise_on_error : bool
+        True이면 조회 실패 시 기본값으로 채우지 않고 예외를 다시 발생시킴
+    """
     logger.info(f"실시간 특성 데이터 조회 (최근 {time_range})")
 
+    result = []
+    try:
+        query_api = query_api or client.query_api()
+        result = query_api.query(build_realtime_features_query(time_range=time_range))
+    except Exception as e:
+        logger.error(f"실시간 특성 데이터 조회 실패: {e}")
+        if raise_on_error:
+            raise
+
+    return parse_realtime_features(result)
+
+
+def parse_realtime_features(tables) -> Dict[str, Any]:
+    """pivot 쿼리 결과를 측정값 딕셔너리로 변환합니다. (없는 측정값은 0.0)"""
+    features = {}
+    for table in tables:
+        for record in table.records:
+            for measurement in REQUIRED_MEASUREMENTS:
+                value = record.values.get(measurement)
+                if value is not None:
+                    features[measurement] = value
+
+    for measurement in REQUIRED_MEASUREMENTS:
+        if measurement in features:
+            logger.info(f"{measurement}: {features[measurement]}")
+        else:
+            logger.warning(f"{measurement} 데이터를 찾을 수 없습니다.")
+            features[measurement] = 0.0  # 기본값
+
+    return features
+
+
+def get_realtime_features_per_measurement(
+    client, time_range="-5m", raise_on_error=False
+):
+    """측정값마다 쿼리를 보내는 이전 조회 방식 (지연시간 비교용)
+
+    raise_on_error가 True이면 조회 실패 시 기본값으로 채우지 않고 예외를 다시 발생시킵니다.
+    """
     features = {}
 
     for measurement in REQUIRED_MEASUREMENTS:
@@ -85,13 +230,13 @@ def get_realtime_features(client, time_range="-5m"):
                 for table in result:
                     for record in table.records:
                         features[measurement] = record.get_value()
-                        logger.info(f"{measurement}: {record.get_value()}")
             else:
-                logger.warning(f"{measurement} 데이터를 찾을 수 없습니다.")
                 features[measurement] = 0.0  # 기본값
 
         except Exception as e:
             logger.error(f"{measurement} 조회 실패: {e}")
+            if raise_on_error:
+                raise
             features[measurement] = 0.0  # 기본값
 
     return features
@@ -110,75 +255,349 @@ def prepare_features_for_prediction(features_dict):
     return np.array(feature_array).reshape(1, -1)
 
 
-def predict_nox_realtime():
-    """실시간 NOx 예측을 수행합니다."""
-    logger.info("=" * 50)
-    logger.info("실시간 NOx 예측 시작")
-    logger.info("=" * 50)
-
-    try:
-        # 1. 모델 로드
-        model = load_nox_model()
-
-        # 2. InfluxDB 연결
-        client = get_influxdb_client()
-        if not client:
-            raise Exception("InfluxDB 연결 실패")
-
-        # 3. 실시간 특성 데이터 조회
-        features_dict = get_realtime_features(client)
+class RealtimeNOxPredictor:
+    """반복 예측 동안 InfluxDB 클라이언트와 모델을 유지하는 상주 예측기
+
+    클라이언트(내부 HTTP 연결 풀 포함)와 QueryApi는 처음 한 번만 만들고 health 확인도
+    연결 시에만 수행하므로, 매 주기 비용은 조회 + 전처리 + 예측뿐입니다.
+    조회가 실패하면 클라이언트를 닫고 다시 연결한 뒤 한 번 재시도합니다.
+    """
+
+    def __init__(
+        self,
+        model=None,
+        url: str = INFLUXDB_URL,
+        token: str = INFLUXDB_TOKEN,
+        org: str = INFLUXDB_ORG,
+        time_range: str = "-5m",
+        max_reconnects: int = 1,
+    ):
+        self.model = model if model is not None else load_nox_model()
+        self.url = url
+        self.token = token
+        self.org = org
+        self.time_range = time_range
+        self.max_reconnects = max_reconnects
+        self._client = None
+        self._query_api = None
+        self.reconnect_count = 0
+
+    def connect(self) -> None:
+        """클라이언트를 생성하고 연결을 확인합니다."""
+        from influxdb_client import InfluxDBClient
+
+        self.close()
+        client = InfluxDBClient(url=self.url, token=self.token, org=self.org)
+        try:
+            health = client.health()
+            logger.info(f"InfluxDB 연결 상태: {health}")
+        except Exception:
+            client.close()
+            raise
+        self._client = client
+        self._query_api = client.query_api()
+
+    def close(self) -> None:
+        if self._client is not None:
+            try:
+                self._client.close()
+            except Exception as e:
+                logger.warning(f"InfluxDB 클라이언트 종료 중 오류: {e}")
+        self._client = None
+        self._query_api = None
+
+    def fetch_features(self) -> Dict[str, Any]:
+        """특성을 조회합니다. (실패 시 재연결 후 재시도)"""
+        for attempt in range(self.max_reconnects + 1):
+            try:
+                if self._client is None:
+                    self.connect()
+                return get_realtime_features(
+                    self._client,
+                    self.time_range,
+                    query_api=self._query_api,
+                    raise_on_error=True,
+                )
+            except Exception as e:
+                self.close()
+                if attempt >= self.max_reconnects:
+                    raise
+                self.reconnect_count += 1
+                logger.warning(f"InfluxDB 조회 실패, 재연결 후 재시도: {e}")
+
+    def predict(self) -> Optional[Dict[str, Any]]:
+        """실시간 NOx 예측을 한 번 수행합니다. (실패 시 None)"""
+        try:
+            start = time.perf_counter()
+            features_dict = self.fetch_features()
+            query_done = time.perf_counter()
 
-        # 4. 특성 데이터를 모델 입력 형식으로 변환
-        features_array = prepare_features_for_prediction(features_dict)
+            features_array = prepare_features_for_prediction(features_dict)
+            prepare_done = time.perf_counter()
 
-        # 5. 예측 수행
-        prediction = model.predict(features_array)[0]
+            # 단건이므로 단일 스레드 (HotReloadableModel이면 교체된 최신 모델 사용)
+            model = getattr(self.model, "current", self.model)
+            prediction = predict_adaptive(model, features_array)[0]
+            predict_done = time.perf_counter()
+        except Exception as e:
+            logger.error(f"실시간 예측 중 오류 발생: {e}")
+            return None
 
-        # 6. 결과 출력
         current_time = datetime.now()
         result = {
             "timestamp": current_time.isoformat(),
             "prediction": float(prediction),
             "features": features_dict,
             "feature_array": features_array.tolist()[0],
+            "timings_ms": {
+                "query": (query_done - start) * 1000,
+                "preprocess": (prepare_done - query_done) * 1000,
+                "predict": (predict_done - prepare_done) * 1000,
+            },
         }
 
         logger.info(f"예측 완료!")
         logger.info(f"시간: {current_time}")
         logger.info(f"NOx 예측값: {prediction:.4f}")
         logger.info(f"입력 특성: {features_dict}")
-
         return result
 
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class IncrementalNOxPredictor:
+    """센서 이력 링 버퍼(sensor_buffer)를 유지하며 전처리 피처로 예측하는 상주 예측기
+
+    매 주기 마지막 시각 이후의 원시 행(REALTIME_COLUMNS)만 조회하여 30분 이력 버퍼에 더하고,
+    NOxDataPreprocessor로 만든 모델 피처의 마지막 행으로 예측합니다.
+    (realtime_pipeline.build_srs1_stages와 같은 단계)
+    checkpoint_path를 주면 시작 시 버퍼를 복원하고, checkpoint_every_ticks 주기마다와
+    close() 시 저장하므로 재시작 후에는 빈 구간만 조회합니다.
+
+    Parameters
+    ----------
+    model : optional
+        이미 로드된 모델 (HotReloadableModel 등). 없으면 파일에서 로드합니다.
+    client : optional
+        read_data를 제공하는 조회 클라이언트 (기본값: SRS1InfluxDBClient())
+    checkpoint_path : str, optional
+        센서 버퍼 체크포인트 파일 (npz)
+    checkpoint_every_ticks : int
+        체크포인트 저장 주기 (조회 횟수)
+    """
+
+    def __init__(
+        self,
+        model=None,
+        client=None,
+        checkpoint_path: Optional[str] = None,
+        checkpoint_every_ticks: int = 12,
+        table_name: str = "SRS1",
+        preprocessor=None,
+    ):
+        from realtime_pipeline import build_srs1_stages
+        from sensor_buffer import IncrementalSRS1Fetcher
+        from test_influxdb_realtime import REALTIME_COLUMNS, SRS1InfluxDBClient
+
+        self.model = model if model is not None else load_nox_model()
+        self.client = client or SRS1InfluxDBClient(verbose=False)
+        self.fetcher = IncrementalSRS1Fetcher(
+            self.client,
+            REALTIME_COLUMNS,
+            table_name=table_name,
+            checkpoint_path=checkpoint_path,
+            checkpoint_every_ticks=checkpoint_every_ticks,
+        )
+        self.stages = build_srs1_stages(self.fetcher, self.model, preprocessor)
+
+    def predict(self, tick_time: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """tick_time(epoch 초, 기본값: 현재 시각) 기준으로 예측합니다. (실패 시 None)"""
+        import pandas as pd
+
+        fetch, preprocess, predict = self.stages
+        tick_time = time.time() if tick_time is None else tick_time
+        try:
+            start = time.perf_counter()
+            raw_data = fetch(tick_time)
+            query_done = time.perf_counter()
+            features = preprocess(raw_data)
+            preprocess_done = time.perf_counter()
+            prediction = predict(features)
+            predict_done = time.perf_counter()
+        except Exception as e:
+            logger.error(f"실시간 예측 중 오류 발생: {e}")
+            return None
+
+        logger.info(f"NOx 예측값: {prediction:.4f} (버퍼 {len(raw_data)}행)")
+        return {
+            "tick_time": tick_time,
+            "timestamp": pd.Timestamp(tick_time, unit="s").isoformat(),
+            "prediction": prediction,
+            "timings_ms": {
+                "query": (query_done - start) * 1000,
+                "preprocess": (preprocess_done - query_done) * 1000,
+                "predict": (predict_done - preprocess_done) * 1000,
+            },
+        }
+
+    def close(self) -> None:
+        """센서 버퍼 체크포인트를 저장합니다."""
+        self.fetcher.checkpoint()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def predict_nox_realtime(model=None):
+    """실시간 NOx 예측을 한 번 수행합니다.
+
+    Parameters
+    ----------
+    model : optional
+        이미 로드된 모델 (HotReloadableModel 등). 없으면 파일에서 로드합니다.
+    """
+    logger.info("=" * 50)
+    logger.info("실시간 NOx 예측 시작")
+    logger.info("=" * 50)
+
+    try:
+        with RealtimeNOxPredictor(model=model) as predictor:
+            return predictor.predict()
     except Exception as e:
         logger.error(f"실시간 예측 중 오류 발생: {e}")
         return None
-    finally:
-        if "client" in locals():
-            client.close()
 
 
-def continuous_prediction(interval_seconds=60, max_iterations=10):
-    """지속적인 예측을 수행합니다."""
+def continuous_prediction(
+    interval_seconds=60,
+    max_iterations=10,
+    hot_reload=None,
+    sink=None,
+    catch_up=None,
+    regenerate_derived=False,
+    checkpoint_path=None,
+    checkpoint_every_ticks=12,
+    client=None,
+):
+    """지속적인 예측을 수행합니다.
+
+    모델과 InfluxDB 클라이언트는 RealtimeNOxPredictor가 루프 전체에서 재사용합니다.
+    hot_reload가 True이면 Model/ 디렉토리를 감시하여 새 모델을 무중단으로 교체합니다.
+    (None이면 NOX_HOT_RELOAD 환경 변수가 1 / true / yes일 때만 사용)
+    감시 중에는 모델 디렉토리에 쓰지 않으며, regenerate_derived가 True일 때만 오래된
+    파생 아티팩트(npz / onnx)를 pkl에서 다시 만듭니다.
+    sink(prediction_sink.PredictionSink)를 넘기거나 NOX_SINK_URL을 설정하면
+    예측 결과를 InfluxDB에 일괄 기록합니다.
+    checkpoint_path를 주면 센서 이력 버퍼 기반 IncrementalNOxPredictor로 예측하며, 버퍼를
+    시작 시 복원하고 checkpoint_every_ticks 주기마다와 종료 시 저장합니다.
+    (client는 이때 사용할 조회 클라이언트, 기본값: SRS1InfluxDBClient())
+    catch_up(realtime_catchup.BacklogCatchUp)을 넘기면 매 주기 전에 처리 지연 / 재시작으로
+    누락된 주기를 일괄 복구한 뒤 실시간 주기를 이어갑니다. catch_up의 주기는
+    interval_seconds와 같아야 합니다. 복구 주기와 실시간 주기가 같은 전처리 피처로 예측되도록
+    이때도 IncrementalNOxPredictor를 사용하며, 조회 클라이언트와 모델은 catch_up과 공유합니다.
+    """
+    if catch_up is not None and catch_up.interval != interval_seconds:
+        raise ValueError(
+            f"catch_up 주기({catch_up.interval}초)와 예측 주기({interval_seconds}초)가 "
+            "다릅니다."
+        )
+
     logger.info(
         f"지속적 예측 시작 (간격: {interval_seconds}초, 최대: {max_iterations}회)"
     )
 
-    import time
+    if hot_reload is None:
+        hot_reload = os.environ.get("NOX_HOT_RELOAD", "").lower() in (
+            "1",
+            "true",
+            "yes",
+        )
 
-    for i in range(max_iterations):
-        logger.info(f"\n--- 예측 #{i+1} ---")
+    watcher = None
+    model = None
+    if hot_reload:
+        from model_hot_reload import ModelWatcher
 
-        result = predict_nox_realtime()
+        watcher = ModelWatcher(
+            os.path.dirname(MODEL_PATH), regenerate_derived=regenerate_derived
+        ).start()
+        model = watcher.target
 
-        if result:
-            print(f"✅ 예측 #{i+1} 성공: NOx = {result['prediction']:.4f}")
+    if sink is None:
+        from prediction_sink import PredictionSink
+
+        sink = PredictionSink.from_env()
+
+    if catch_up is not None:
+        if catch_up.sink is None:
+            catch_up.sink = sink
+        if model is None:
+            model = catch_up.model
         else:
-            print(f"❌ 예측 #{i+1} 실패")
+            # 핫 리로드로 교체된 모델을 복구 예측에도 사용
+            catch_up.model = model
+        client = client or catch_up.client
+
+    if checkpoint_path or catch_up is not None:
+        predictor = IncrementalNOxPredictor(
+            model=model,
+            client=client,
+            checkpoint_path=checkpoint_path,
+            checkpoint_every_ticks=checkpoint_every_ticks,
+            table_name=catch_up.table_name if catch_up is not None else "SRS1",
+            preprocessor=catch_up.preprocessor if catch_up is not None else None,
+        )
+    else:
+        predictor = RealtimeNOxPredictor(model=model)
+    try:
+        for i in range(max_iterations):
+            logger.info(f"\n--- 예측 #{i+1} ---")
+
+            if catch_up is not None:
+                recovered = catch_up.recover()
+                if recovered:
+                    print(
+                        f"🔄 누락 주기 {len(recovered)}개 복구: "
+                        f"{recovered[0]['timestamp']} ~ {recovered[-1]['timestamp']}"
+                    )
+
+            # 복구 격자와 같은 기준(epoch 기준 주기 배수)의 현재 주기 시각으로 기록
+            tick_time = catch_up.current_tick() if catch_up is not None else None
+            if isinstance(predictor, IncrementalNOxPredictor):
+                result = predictor.predict(tick_time)
+            else:
+                result = predictor.predict()
 
-        if i < max_iterations - 1:  # 마지막 반복이 아니면 대기
-            logger.info(f"{interval_seconds}초 대기...")
-            time.sleep(interval_seconds)
+            if result:
+                if catch_up is not None:
+                    catch_up.mark(tick_time)
+                if sink:
+                    sink.write(result)
+                timings = result["timings_ms"]
+                print(
+                    f"✅ 예측 #{i+1} 성공: NOx = {result['prediction']:.4f} "
+                    f"(조회 {timings['query']:.0f}ms, 전처리 {timings['preprocess']:.1f}ms, "
+                    f"예측 {timings['predict']:.1f}ms)"
+                )
+            else:
+                print(f"❌ 예측 #{i+1} 실패")
+
+            if i < max_iterations - 1:  # 마지막 반복이 아니면 대기
+                logger.info(f"{interval_seconds}초 대기...")
+                time.sleep(interval_seconds)
+    finally:
+        predictor.close()
+        if sink:
+            sink.close()
+        if watcher:
+            watcher.stop()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+조회 / 전처리 / 예측 단계를 겹쳐 실행하는 실시간 예측 파이프라인
+predict_nox_realtime은 세 단계를 차례로 실행하므로 InfluxDB 응답 대기와 피처 계산이
+겹치지 않습니다. 이 파이프라인은 단계마다 작업 코루틴 하나와 크기가 제한된 큐를 두어
+주기 N+1의 조회가 주기 N의 전처리·예측과 동시에 진행되도록 합니다.
+
+- 동기 함수(InfluxDB v1 조회, pandas 전처리, predict)는 공유 작업 풀에서 실행합니다.
+- 다음 단계 큐가 가득 차면 앞 단계가 대기하고, 입력 큐가 가득 차면 submit()이
+  대기(backpressure)하거나 drop_when_full=True일 때 주기를 버립니다.
+- 단계별 처리 시간 / 큐 대기 시간 / 오류 수를 집계합니다.
+
+사용 예:
+    python realtime_pipeline.py --ticks 20 --fetch_latency_ms 300
+"""
+
+import asyncio
+import inspect
+import logging
+import time
+from collections import deque
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class StageMetrics:
+    """단계별 처리 시간 / 큐 대기 시간 집계 (최근 window개 기준 분위수)"""
+
+    def __init__(self, window: int = 1000):
+        self.processed = 0
+        self.errors = 0
+        self._latencies = deque(maxlen=window)
+        self._queue_waits = deque(maxlen=window)
+
+    def record(self, latency_ms: float, queue_wait_ms: float) -> None:
+        self.processed += 1
+        self._latencies.append(latency_ms)
+        self._queue_waits.append(queue_wait_ms)
+
+    def summary(self) -> Dict[str, float]:
+        summary = {"processed": self.processed, "errors": self.errors}
+        for name, values in [
+            ("latency", self._latencies),
+            ("queue_wait", self._queue_waits),
+        ]:
+            if values:
+                summary[f"{name}_p50_ms"] = float(np.percentile(values, 50))
+                summary[f"{name}_p99_ms"] = float(np.percentile(values, 99))
+        return summary
+
+
+class PredictionPipeline:
+    """fetch → preprocess → predict 3단계 파이프라인
+
+    Parameters
+    ----------
+    fetch_fn : Callable[[tick], raw]
+        주기 시각을 받아 원시 데이터를 반환 (코루틴 함수 또는 동기 함수)
+    preprocess_fn : Callable[[raw], features]
+        원시 데이터를 모델 입력으로 변환
+    predict_fn : Callable[[features], prediction]
+        예측 수행
+    queue_size : int
+        단계 사이 큐의 최대 크기
+    executor : Executor, optional
+        동기 함수를 실행할 작업 풀 (여러 파이프라인이 공유 가능)
+    on_result : Callable[[Dict[str, Any]], None], optional
+        예측 결과 콜백
+    drop_when_full : bool
+        True이면 입력 큐가 가득 찼을 때 대기하지 않고 해당 주기를 버림
+    """
+
+    STAGES = ("fetch", "preprocess", "predict")
+
+    def __init__(
+        self,
+        fetch_fn: Callable,
+        preprocess_fn: Callable,
+        predict_fn: Callable,
+        queue_size: int = 2,
+        executor: Optional[Executor] = None,
+        on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+        drop_when_full: bool = False,
+        name: str = "nox",
+    ):
+        self._fns = [fetch_fn, preprocess_fn, predict_fn]
+        self.queue_size = queue_size
+        self._own_executor = executor is None
+        self.executor = executor or ThreadPoolExecutor(
+            max_workers=len(self.STAGES), thread_name_prefix=f"{name}-pipeline"
+        )
+        self.on_result = on_result
+        self.drop_when_full = drop_when_full
+        self.name = name
+        self.metrics = {stage: StageMetrics() for stage in self.STAGES}
+        self.dropped = 0
+        self.results: List[Dict[str, Any]] = []
+        self._queues: List[asyncio.Queue] = []
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self) -> "PredictionPipeline":
+        # 입력 큐 + 단계 사이 큐 (마지막 단계 출력은 on_result로 전달)
+        self._queues = [asyncio.Queue(maxsize=self.queue_size) for _ in self.STAGES]
+        self._tasks = [
+            asyncio.create_task(self._stage_worker(i), name=f"{self.name}-{stage}")
+            for i, stage in enumerate(self.STAGES)
+        ]
+        return self
+
+    async def submit(self, tick_time: float) -> bool:
+        """주기를 파이프라인에 넣습니다.
+
+        Returns
+        -------
+        bool
+            입력 여부 (drop_when_full=True이고 큐가 가득 차면 False)
+        """
+        item = {"tick_time": tick_time, "enqueued": time.perf_counter()}
+        if self.drop_when_full:
+            try:
+                self._queues[0].put_nowait(item)
+            except asyncio.QueueFull:
+                self.dropped += 1
+                logger.warning(f"[{self.name}] 파이프라인 포화로 주기 버림")
+                return False
+            return True
+        await self._queues[0].put(item)
+        return True
+
+    async def _call(self, fn: Callable, arg):
+        if inspect.iscoroutinefunction(fn):
+            return await fn(arg)
+        return await asyncio.get_running_loop().run_in_executor(self.executor, fn, arg)
+
+    async def _stage_worker(self, index: int) -> None:
+        stage = self.STAGES[index]
+        fn = self._fns[index]
+        inbox = self._queues[index]
+        outbox = self._queues[index + 1] if index + 1 < len(self._queues) else None
+        metrics = self.metrics[stage]
+
+        while True:
+            item = await inbox.get()
+            if item is _STOP:
+                if outbox is not None:
+                    await outbox.put(_STOP)
+                break
+
+            start = time.perf_counter()
+            queue_wait_ms = (start - item["enqueued"]) * 1000
+            arg = item["tick_time"] if index == 0 else item["value"]
+            try:
+                value = await self._call(fn, arg)
+            except Exception as e:
+                metrics.errors += 1
+                logger.error(f"[{self.name}] {stage} 단계 오류: {e}")
+                continue
+            done = time.perf_counter()
+            metrics.record((done - start) * 1000, queue_wait_ms)
+
+            item = dict(item, value=value, enqueued=done)
+            item.setdefault("stage_ms", {})[stage] = (done - start) * 1000
+            if outbox is not None:
+                # 다음 단계가 밀려 있으면 여기서 대기 (backpressure)
+                await outbox.put(item)
+            else:
+                self._emit(item)
+
+    def _emit(self, item: Dict[str, Any]) -> None:
+        result = {
+            "tick_time": item["tick_time"],
+            "prediction": item["value"],
+            "stage_ms": item["stage_ms"],
+            "end_to_end_ms": sum(item["stage_ms"].values()),
+        }
+        if self.on_result:
+            self.on_result(result)
+        else:
+            self.results.append(result)
+
+    async def stop(self) -> None:
+        """남은 주기를 모두 처리한 뒤 종료합니다."""
+        if self._queues:
+            await self._queues[0].put(_STOP)
+            await asyncio.gather(*self._tasks)
+        if self._own_executor:
+            self.executor.shutdown(wait=True)
+
+    def metrics_summary(self) -> Dict[str, Dict[str, float]]:
+        summary = {stage: m.summary() for stage, m in self.metrics.items()}
+        summary["pipeline"] = {
+            "dropped": self.dropped,
+            "queued": [q.qsize() for q in self._queues],
+        }
+        return summary
+
+
+def model_feature_names(model) -> List[str]:
+    """모델 입력 피처 이름 (HotReloadableModel이면 현재 모델 기준)
+
+    실시간 주기(build_srs1_stages)와 누락 주기 복구(realtime_catchup)가 같은 피처 순서로
+    전처리 결과를 선택하도록 공유합니다.
+    """
+    current = getattr(model, "current", model)
+    return list(
+        getattr(current, "feature_names", None) or current.booster_.feature_name()
+    )
+
+
+def build_srs1_stages(fetcher, model, preprocessor=None):
+    """증분 조회기 + NOxDataPreprocessor + 모델로 파이프라인 단계 함수를 만듭니다.
+
+    Parameters
+    ----------
+    fetcher : sensor_buffer.IncrementalSRS1Fetcher
+        주기마다 30분 이력 DataFrame을 반환하는 조회기
+    model
+        predict(X)를 제공하는 모델 (HotReloadableModel이면 최신 모델 사용)
+    """
+    import pandas as pd
+
+    from data_preprocessor import NOxDataPreprocessor
+    from predict_threading import predict_adaptive
+
+    preprocessor = preprocessor or NOxDataPreprocessor()
+    feature_names = model_feature_names(model)
+
+    def fetch(tick_time):
+        return fetcher.fetch(
+            now=pd.Timestamp(tick_time, unit="s", tz="UTC").tz_localize(None)
+        )
+
+    def preprocess(raw_data):
+        model_data, _ = preprocessor.preprocess_realtime_data(raw_data)
+        # 예측에는 최신 시각 한 행만 사용
+        return (
+            model_data.reindex(columns=feature_names)
+            .iloc[-1:]
+            .to_numpy(dtype=np.float64)
+        )
+
+    def predict(features):
+        return float(predict_adaptive(getattr(model, "current", model), features)[0])
+
+    return fetch, preprocess, predict
+
+
+if __name__ == "__main__":
+    import argparse
+
+    import pandas as pd
+
+    from model_registry import load_model_file
+    from sensor_buffer import TIME_COL, IncrementalSRS1Fetcher
+    from test_influxdb_realtime import REALTIME_COLUMNS
+
+    # 전처리 단계별 INFO 로그가 측정에 섞이지 않도록 경고 이상만 출력
+    logging.getLogger().setLevel(logging.WARNING)
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model_path", type=str, default="Model/lgbm_model.pkl")
+    parser.add_argument("--data_path", type=str, default="Data/test_sample.csv")
+    parser.add_argument("--ticks", type=int, default=20)
+    parser.add_argument(
+        "--fetch_latency_ms",
+        type=float,
+        default=300.0,
+        help="모의 InfluxDB 응답 지연",
+    )
+    args = parser.parse_args()
+
+    sample = pd.read_csv(args.data_path, parse_dates=[TIME_COL])
+    raw_columns = [c.lower() for c in REALTIME_COLUMNS]
+
+    class _SampleClient:
+        """test_sample을 시간 범위로 잘라 돌려주는 모의 read_data (응답 지연 포함)"""
+
+        def read_data(self, columns, start_time, query_range_seconds, table_name):
+            time.sleep(args.fetch_latency_ms / 1000)
+            lower = start_time - pd.Timedelta(seconds=query_range_seconds)
+            rows = sample[(sample[TIME_COL] > lower) & (sample[TIME_COL] <= start_time)]
+            return rows[raw_columns]
+
+    nox_model, _ = load_model_file(args.model_path)
+    # 5초 주기 샘플의 100번째 행부터 한 주기씩 진행
+    base_time = sample[TIME_COL].iloc[100].tz_localize("UTC").timestamp()
+
+    def run_sequential():
+        fetcher = IncrementalSRS1Fetcher(_SampleClient(), REALTIME_COLUMNS)
+        fetch, preprocess, predict = build_srs1_stages(fetcher, nox_model)
+        start = time.perf_counter()
+        for i in range(args.ticks):
+            predict(preprocess(fetch(base_time + 5 * i)))
+        return time.perf_counter() - start
+
+    async def run_pipelined():
+        fetcher = IncrementalSRS1Fetcher(_SampleClient(), REALTIME_COLUMNS)
+        fetch, preprocess, predict = build_srs1_stages(fetcher, nox_model)
+        pipeline = await PredictionPipeline(fetch, preprocess, predict).start()
+        start = time.perf_counter()
+        for i in range(args.ticks):
+            await pipeline.submit(base_time + 5 * i)
+        await pipeline.stop()
+        return time.perf_counter() - start, pipeline
+
+    print("🚀 순차 실행 vs 파이프라인 처리량 비교 (조회 지연 모의)")
+    print("=" * 60)
+    elapsed = run_sequential()
+    print(
+        f"순차 실행: {args.ticks}주기 {elapsed:.2f}초 ({args.ticks / elapsed:.2f}주기/s)"
+    )
+
+    elapsed, pipeline = asyncio.run(run_pipelined())
+    print(
+        f"파이프라인: {args.ticks}주기 {elapsed:.2f}초 ({args.ticks / elapsed:.2f}주기/s)"
+    )
+    for stage, summary in pipeline.metrics_summary().items():
+        print(f"   {stage:<10} {summary}")
@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+"""
+벽시계 정렬 asyncio 스케줄러 기반 실시간 NOx 예측 루프
+continuous_prediction은 작업이 끝난 뒤 interval만큼 sleep하므로 실제 주기가
+interval + 처리 시간이 되어 데이터 수집 주기(5초 격자)에서 점점 밀려납니다.
+이 스케줄러는 매 주기를 epoch 기준 interval 배수 시각에 시작하고, 주기별 마감 시간을 넘긴
+작업은 취소하며, 늦게 시작한 주기와 건너뛴 주기를 집계합니다.
+
+--checkpoint_path를 주면 센서 이력 버퍼 기반 예측기(IncrementalNOxPredictor)로 예측하며,
+버퍼를 시작 시 복원하고 --checkpoint_every_ticks 주기마다와 종료 시 저장합니다.
+--catch_up을 주면 매 주기 전에 처리 지연 / 재시작으로 누락된 주기를 복구합니다.
+(realtime_catchup, 실시간 주기도 같은 버퍼 기반 예측기로 예측)
+
+사용 예:
+    python realtime_scheduler.py --interval 5 --deadline 4 --max_ticks 100
+    python realtime_scheduler.py --interval 5 --checkpoint_path state/srs1_buffer.npz \
+        --catch_up --catch_up_state_path state/catch_up.json
+"""
+
+import asyncio
+import logging
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import numpy as np
+
+import realtime_nox_prediction as rt
+from predict_threading import predict_adaptive
+
+logger = logging.getLogger(__name__)
+
+
+class AlignedTickScheduler:
+    """epoch 기준 interval 배수 시각마다 콜백을 실행하는 스케줄러
+
+    Parameters
+    ----------
+    interval_seconds : float
+        주기 (초)
+    deadline_seconds : float, optional
+        주기별 마감 시간. 넘기면 콜백을 취소합니다. (기본값: interval_seconds)
+    offset_seconds : float
+        격자 시각에 더할 지연 (데이터 적재 지연을 고려할 때 사용)
+    late_threshold_ms : float
+        예정 시각보다 이만큼 늦게 시작하면 지연 주기로 집계
+    """
+
+    def __init__(
+        self,
+        interval_seconds: float = 5.0,
+        deadline_seconds: Optional[float] = None,
+        offset_seconds: float = 0.0,
+        late_threshold_ms: float = 50.0,
+    ):
+        self.interval = interval_seconds
+        self.deadline = deadline_seconds or interval_seconds
+        self.offset = offset_seconds
+        self.late_threshold = late_threshold_ms / 1000
+        self._stopped = asyncio.Event()
+        self.stats = {
+            "ticks": 0,
+            "late": 0,
+            "missed": 0,
+            "deadline_exceeded": 0,
+            "errors": 0,
+            "max_lateness_ms": 0.0,
+        }
+
+    def next_tick(self, now: float) -> float:
+        """now 이후 첫 격자 시각 (epoch 초)"""
+        n_intervals = math.ceil((now - self.offset) / self.interval)
+        return n_intervals * self.interval + self.offset
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    async def _sleep_until(self, wall_time: float) -> bool:
+        """wall_time까지 대기합니다. (중지 요청 시 False)"""
+        delay = wall_time - time.time()
+        if delay <= 0:
+            return not self._stopped.is_set()
+        try:
+            await asyncio.wait_for(self._stopped.wait(), timeout=delay)
+            return False
+        except asyncio.TimeoutError:
+            return True
+
+    async def run(
+        self,
+        callback: Callable[[float], Awaitable[Any]],
+        max_ticks: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """격자 시각마다 callback(tick_time)을 실행합니다.
+
+        Returns
+        -------
+        Dict[str, Any]
+            주기 / 지연 / 누락 / 마감 초과 / 오류 집계
+        """
+        tick_time = self.next_tick(time.time())
+        while max_ticks is None or self.stats["ticks"] < max_ticks:
+            if not await self._sleep_until(tick_time):
+                break
+
+            lateness = time.time() - tick_time
+            self.stats["ticks"] += 1
+            self.stats["max_lateness_ms"] = max(
+                self.stats["max_lateness_ms"], lateness * 1000
+            )
+            if lateness > self.late_threshold:
+                self.stats["late"] += 1
+                logger.warning(f"주기 지연 시작: {lateness * 1000:.0f}ms")
+
+            try:
+                remaining = self.deadline - lateness
+                if remaining <= 0:
+                    raise asyncio.TimeoutError
+                await asyncio.wait_for(callback(tick_time), timeout=remaining)
+            except asyncio.TimeoutError:
+                self.stats["deadline_exceeded"] += 1
+                logger.warning(
+                    f"주기 마감 초과 ({self.deadline}초): "
+                    f"{time.strftime('%H:%M:%S', time.localtime(tick_time))}"
+                )
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.error(f"주기 작업 오류: {e}")
+
+            # 처리 시간이 주기를 넘었다면 지나간 격자 시각은 실행하지 않고 누락으로 집계
+            next_tick = tick_time + self.interval
+            now = time.time()
+            if now > next_tick + self.late_threshold:
+                skipped = int((now - next_tick) // self.interval) + 1
+                self.stats["missed"] += skipped
+                logger.warning(f"처리 지연으로 {skipped}개 주기 건너뜀")
+                next_tick += skipped * self.interval
+            tick_time = next_tick
+        return dict(self.stats)
+
+
+class AsyncRealtimeNOxPredictor:
+    """비동기 InfluxDB 클라이언트로 조회하고 주기 시각 기준으로 예측하는 예측기"""
+
+    def __init__(
+        self,
+        model=None,
+        url: Optional[str] = None,
+        token: Optional[str] = None,
+        org: Optional[str] = None,
+        time_range: str = "-5m",
+    ):
+        self.model = model if model is not None else rt.load_nox_model()
+        self.url = url or rt.INFLUXDB_URL
+        self.token = token or rt.INFLUXDB_TOKEN
+        self.org = org or rt.INFLUXDB_ORG
+        self.time_range = time_range
+        self._client = None
+        self._query_api = None
+
+    async def connect(self) -> None:
+        from influxdb_client.client.influxdb_client_async import InfluxDBClientAsync
+
+        await self.close()
+        self._client = InfluxDBClientAsync(url=self.url, token=self.token, org=self.org)
+        self._query_api = self._client.query_api()
+
+    async def close(self) -> None:
+        if self._client is not None:
+            try:
+                await self._client.close()
+            except Exception as e:
+                logger.warning(f"InfluxDB 클라이언트 종료 중 오류: {e}")
+        self._client = None
+        self._query_api = None
+
+    async def fetch_features(self) -> Dict[str, Any]:
+        if self._client is None:
+            await self.connect()
+        try:
+            tables = await self._query_api.query(
+                rt.build_realtime_features_query(time_range=self.time_range)
+            )
+        except Exception:
+            # 다음 주기에 새 연결로 다시 시도
+            await self.close()
+            raise
+        return rt.parse_realtime_features(tables)
+
+    async def predict(self, tick_time: float) -> Dict[str, Any]:
+        """tick_time 주기의 예측을 수행합니다. (예측은 작업 스레드에서 실행)"""
+        start = time.perf_counter()
+        features_dict = await self.fetch_features()
+        query_done = time.perf_counter()
+
+        features_array = rt.prepare_features_for_prediction(features_dict)
+        model = getattr(self.model, "current", self.model)
+        prediction = await asyncio.get_running_loop().run_in_executor(
+            None, predict_adaptive, model, features_array
+        )
+        predict_done = time.perf_counter()
+
+        return {
+            "tick_time": tick_time,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(tick_time)),
+            "prediction": float(np.asarray(prediction)[0]),
+            "features": features_dict,
+            "timings_ms": {
+                "query": (query_done - start) * 1000,
+                "predict": (predict_done - query_done) * 1000,
+            },
+        }
+
+
+class AsyncIncrementalNOxPredictor:
+    """IncrementalNOxPredictor(동기, 센서 버퍼 기반)를 전용 스레드 하나에서 실행하는 비동기 래퍼
+
+    마감 초과로 주기가 취소되어도 실행 중인 조회 / 전처리는 스레드에서 끝까지 진행되므로,
+    스레드를 하나만 두어 다음 주기가 버퍼를 동시에 갱신하지 않도록 합니다.
+    """
+
+    def __init__(self, predictor: "rt.IncrementalNOxPredictor"):
+        self.predictor = predictor
+        self.model = predictor.model
+        self.executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="nox-incremental"
+        )
+
+    async def run(self, fn: Callable, *args):
+        """fn(*args)를 예측 스레드에서 실행합니다. (버퍼 / 클라이언트를 쓰는 작업용)"""
+        return await asyncio.get_running_loop().run_in_executor(
+            self.executor, fn, *args
+        )
+
+    async def predict(self, tick_time: float) -> Dict[str, Any]:
+        result = await self.run(self.predictor.predict, tick_time)
+        if result is None:
+            raise RuntimeError("실시간 예측 실패")
+        return result
+
+    async def close(self) -> None:
+        # 진행 중인 주기가 끝난 뒤 체크포인트 저장
+        await self.run(self.predictor.close)
+        self.executor.shutdown(wait=True)
+
+
+async def run_scheduled_prediction(
+    interval_seconds: float = 5.0,
+    deadline_seconds: Optional[float] = None,
+    max_ticks: Optional[int] = None,
+    on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+    predictor: Optional[AsyncRealtimeNOxPredictor] = None,
+    checkpoint_path: Optional[str] = None,
+    checkpoint_every_ticks: int = 12,
+    client=None,
+    catch_up=None,
+) -> Dict[str, Any]:
+    """격자 정렬 주기로 실시간 예측을 수행하고 스케줄 집계를 반환합니다.
+
+    predictor가 없고 checkpoint_path가 있으면 센서 버퍼 기반 예측기를 사용하며, 버퍼를
+    checkpoint_every_ticks 주기마다와 종료 시 저장합니다. (client: 조회 클라이언트)
+    catch_up(realtime_catchup.BacklogCatchUp)을 주면 매 주기 예측 전에 누락 주기를 복구하고
+    (복구 결과도 on_result로 전달, catch_up=True), 예측에 성공한 주기를 mark합니다.
+    복구와 같은 피처 경로로 예측하도록 이때도 버퍼 기반 예측기를 사용하며, 조회 클라이언트 /
+    모델 / 전처리기는 catch_up과 공유합니다.
+    """
+    if catch_up is not None:
+        if catch_up.interval != interval_seconds:
+            raise ValueError(
+                f"catch_up 주기({catch_up.interval}초)와 예측 주기"
+                f"({interval_seconds}초)가 다릅니다."
+            )
+        if predictor is not None and not isinstance(
+            predictor, AsyncIncrementalNOxPredictor
+        ):
+            raise ValueError(
+                "catch_up은 버퍼 기반 예측기(AsyncIncrementalNOxPredictor)와 함께 사용합니다."
+            )
+    if predictor is None and (checkpoint_path or catch_up is not None):
+        predictor = AsyncIncrementalNOxPredictor(
+            rt.IncrementalNOxPredictor(
+                model=catch_up.model if catch_up is not None else None,
+                client=client or (catch_up.client if catch_up is not None else None),
+                checkpoint_path=checkpoint_path,
+                checkpoint_every_ticks=checkpoint_every_ticks,
+                table_name=catch_up.table_name if catch_up is not None else "SRS1",
+                preprocessor=catch_up.preprocessor if catch_up is not None else None,
+            )
+        )
+    predictor = predictor or AsyncRealtimeNOxPredictor()
+    scheduler = AlignedTickScheduler(interval_seconds, deadline_seconds)
+
+    async def on_tick(tick_time: float):
+        if catch_up is not None:
+            # 버퍼 / 클라이언트를 쓰는 작업은 예측 스레드에서 차례로 실행
+            recovered = await predictor.run(catch_up.recover, tick_time)
+            if on_result:
+                for result in recovered:
+                    on_result(result)
+        result = await predictor.predict(tick_time)
+        if catch_up is not None:
+            await predictor.run(catch_up.mark, tick_time)
+        if on_result:
+            on_result(result)
+
+    try:
+        stats = await scheduler.run(on_tick, max_ticks=max_ticks)
+    finally:
+        await predictor.close()
+
+    logger.info(
+        f"스케줄 집계: 주기 {stats['ticks']}회, 지연 {stats['late']}회, "
+        f"누락 {stats['missed']}회, 마감 초과 {stats['deadline_exceeded']}회, "
+        f"오류 {stats['errors']}회, 최대 지연 {stats['max_lateness_ms']:.1f}ms"
+    )
+    return stats
+
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--interval", type=float, default=5.0)
+    parser.add_argument("--deadline", type=float, default=None)
+    parser.add_argument("--max_ticks", type=int, default=None)
+    parser.add_argument(
+        "--checkpoint_path",
+        type=str,
+        default=None,
+        help="센서 버퍼 체크포인트 (지정하면 버퍼 기반 예측기 사용)",
+    )
+    parser.add_argument("--checkpoint_every_ticks", type=int, default=12)
+    parser.add_argument("--catch_up", action="store_true", help="누락 주기 복구")
+    parser.add_argument("--max_backlog_seconds", type=float, default=900.0)
+    parser.add_argument(
+        "--catch_up_state_path",
+        type=str,
+        default=None,
+        help="마지막 예측 주기 저장 파일 (재시작 후 중단 구간 복구)",
+    )
+    args = parser.parse_args()
+
+    from prediction_sink import PredictionSink
+
+    sink = PredictionSink.from_env()
+    catch_up = None
+    if args.catch_up:
+        from realtime_catchup import BacklogCatchUp
+        from test_influxdb_realtime import SRS1InfluxDBClient
+
+        # 복구 결과도 print_result에서 싱크에 기록 (catch_up=true 태그)
+        catch_up = BacklogCatchUp(
+            SRS1InfluxDBClient(verbose=False),
+            rt.load_nox_model(),
+            interval_seconds=args.interval,
+            max_backlog_seconds=args.max_backlog_seconds,
+            state_path=args.catch_up_state_path,
+        )
+
+    def print_result(result):
+        if sink:
+            sink.write(result)
+        if result.get("catch_up"):
+            print(f"🔄 {result['timestamp']} NOx = {result['prediction']:.4f} (복구)")
+            return
+        print(
+            f"✅ {result['timestamp']} NOx = {result['prediction']:.4f} "
+            f"(조회 {result['timings_ms']['query']:.0f}ms)"
+        )
+
+    try:
+        asyncio.run(
+            run_scheduled_prediction(
+                args.interval,
+                args.deadline,
+                args.max_ticks,
+                on_result=print_result,
+                checkpoint_path=args.checkpoint_path,
+                checkpoint_every_ticks=args.checkpoint_every_ticks,
+                catch_up=catch_up,
+            )
+        )
+    except KeyboardInterrupt:
+        print("🛑 예측 중지")
+    finally:
+        if sink:
+            sink.close()
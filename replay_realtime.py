@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+과거 데이터 가속 재생(replay)으로 실시간 예측 경로 검증
+CSV / parquet의 과거 SRS1 데이터를 로컬 InfluxDB 대체 서버(local_influxdb)로 제공하고,
+실시간과 같은 경로(SRS1InfluxDBClient.read_data → 증분 조회 버퍼 → NOxDataPreprocessor
+→ predict)를 실제 시간의 N배 속도 또는 최대 속도로 실행합니다.
+
+보고 항목
+- 처리량: 초당 주기 수, 재생 배속(시뮬레이션 시간 / 실제 경과 시간)
+- 주기별 지연시간 분포: 예정 시각부터 예측 완료까지 (p50 / p95 / p99 / 최대)와 단계별 p50
+- 배치 예측과의 일치 여부: 전체 데이터를 한 번에 전처리하여 예측한 값과 주기별 예측 비교
+
+사용 예:
+    python replay_realtime.py --data_path Data/test_sample.csv --speed 0
+    python replay_realtime.py --data_path history.parquet --speed 60 --mode pipeline
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from local_influxdb import TIME_COL, LocalInfluxDBServer, load_frame
+from realtime_pipeline import PredictionPipeline, build_srs1_stages
+
+logger = logging.getLogger(__name__)
+
+
+def _percentiles(values) -> Dict[str, float]:
+    values = np.asarray(values, dtype=np.float64)
+    if not len(values):
+        return {}
+    return {
+        "p50_ms": float(np.percentile(values, 50)),
+        "p95_ms": float(np.percentile(values, 95)),
+        "p99_ms": float(np.percentile(values, 99)),
+        "max_ms": float(values.max()),
+    }
+
+
+def _to_naive_utc(index: pd.DatetimeIndex) -> pd.DatetimeIndex:
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        index = index.tz_convert("UTC").tz_localize(None)
+    return index
+
+
+def batch_predictions(
+    data: pd.DataFrame, model, raw_columns: List[str], preprocessor=None
+) -> pd.Series:
+    """전체 구간을 한 번에 전처리하여 시각별 예측값을 반환합니다. (일치 여부 기준값)"""
+    from data_preprocessor import NOxDataPreprocessor
+    from predict_threading import predict_adaptive
+
+    preprocessor = preprocessor or NOxDataPreprocessor()
+    current = getattr(model, "current", model)
+    feature_names = getattr(current, "feature_names", None) or (
+        current.booster_.feature_name()
+    )
+    model_data, _ = preprocessor.preprocess_realtime_data(
+        data[[TIME_COL] + raw_columns]
+    )
+    features = model_data.reindex(columns=feature_names).to_numpy(dtype=np.float64)
+    predictions = np.asarray(predict_adaptive(current, features), dtype=np.float64)
+    return pd.Series(predictions, index=_to_naive_utc(model_data.index))
+
+
+class HistoricalReplay:
+    """과거 데이터를 실시간 예측 경로로 가속 재생합니다.
+
+    Parameters
+    ----------
+    data : pd.DataFrame
+        _time_gateway와 센서 컬럼(소문자)을 가진 과거 데이터
+    model
+        predict(X)를 제공하는 모델
+    speed : float
+        재생 배속. 0이면 대기 없이 최대 속도로 재생
+    interval_seconds : float
+        예측 주기 (시뮬레이션 시간 기준)
+    warmup_seconds : float
+        첫 주기 전에 쌓아 둘 이력 길이 (데이터 시작 시각 기준)
+    mode : str
+        "sequential" (조회 → 전처리 → 예측 순차) 또는 "pipeline" (PredictionPipeline)
+    latency_ms : float
+        로컬 InfluxDB 응답 지연 (플랜트 네트워크 지연 모의)
+    """
+
+    def __init__(
+        self,
+        data: pd.DataFrame,
+        model,
+        speed: float = 0.0,
+        interval_seconds: float = 5.0,
+        warmup_seconds: float = 60.0,
+        mode: str = "sequential",
+        latency_ms: float = 0.0,
+        max_ticks: Optional[int] = None,
+    ):
+        if mode not in ("sequential", "pipeline"):
+            raise ValueError(f"지원하지 않는 mode: {mode}")
+        self.data = data
+        self.model = model
+        self.speed = speed
+        self.interval = interval_seconds
+        self.mode = mode
+        self.latency_ms = latency_ms
+
+        times = _to_naive_utc(pd.to_datetime(data[TIME_COL]))
+        first = times.min() + pd.Timedelta(seconds=warmup_seconds)
+        self.ticks = pd.date_range(
+            first.ceil(f"{interval_seconds}s"),
+            times.max(),
+            freq=f"{interval_seconds}s",
+        )
+        if max_ticks is not None:
+            self.ticks = self.ticks[:max_ticks]
+
+    def _due(self, wall_start: float, i: int) -> float:
+        """i번째 주기의 예정 실행 시각 (perf_counter 기준)"""
+        if self.speed <= 0:
+            return wall_start
+        return wall_start + i * self.interval / self.speed
+
+    def _run_sequential(self, stages, tick_epochs) -> List[Dict[str, Any]]:
+        fetch, preprocess, predict = stages
+        records = []
+        wall_start = time.perf_counter()
+        for i, tick in enumerate(tick_epochs):
+            due = self._due(wall_start, i)
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            if self.speed <= 0:
+                due = time.perf_counter()
+
+            stage_ms = {}
+            value = tick
+            try:
+                for name, fn in zip(PredictionPipeline.STAGES, stages):
+                    start = time.perf_counter()
+                    value = fn(value)
+                    stage_ms[name] = (time.perf_counter() - start) * 1000
+            except Exception as e:
+                logger.error(f"재생 주기 오류 ({pd.Timestamp(tick, unit='s')}): {e}")
+                continue
+            records.append(
+                {
+                    "tick_time": tick,
+                    "prediction": value,
+                    "stage_ms": stage_ms,
+                    "latency_ms": (time.perf_counter() - due) * 1000,
+                }
+            )
+        return records
+
+    async def _run_pipeline(self, stages, tick_epochs) -> List[Dict[str, Any]]:
+        records = []
+        due_times = {}
+
+        def on_result(result):
+            result["latency_ms"] = (
+                time.perf_counter() - due_times[result["tick_time"]]
+            ) * 1000
+            records.append(result)
+
+        pipeline = await PredictionPipeline(*stages, on_result=on_result).start()
+        wall_start = time.perf_counter()
+        for i, tick in enumerate(tick_epochs):
+            delay = self._due(wall_start, i) - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            due_times[tick] = (
+                self._due(wall_start, i) if self.speed > 0 else time.perf_counter()
+            )
+            await pipeline.submit(tick)
+        await pipeline.stop()
+        return records
+
+    def run(self) -> Dict[str, Any]:
+        """재생을 실행하고 처리량 / 지연시간 / 배치 예측 일치 여부를 반환합니다."""
+        from sensor_buffer import IncrementalSRS1Fetcher
+        from test_influxdb_realtime import REALTIME_COLUMNS, SRS1InfluxDBClient
+
+        raw_columns = [c.lower() for c in REALTIME_COLUMNS if c != TIME_COL]
+        tick_epochs = [t.tz_localize("UTC").timestamp() for t in self.ticks]
+
+        with LocalInfluxDBServer(
+            self.data[[TIME_COL] + raw_columns], latency_ms=self.latency_ms
+        ) as server:
+            client = SRS1InfluxDBClient(
+                host=server.host, port=server.port, verbose=False
+            )
+            fetcher = IncrementalSRS1Fetcher(client, REALTIME_COLUMNS)
+            stages = build_srs1_stages(fetcher, self.model)
+
+            wall_start = time.perf_counter()
+            if self.mode == "pipeline":
+                records = asyncio.run(self._run_pipeline(stages, tick_epochs))
+            else:
+                records = self._run_sequential(stages, tick_epochs)
+            elapsed = time.perf_counter() - wall_start
+            client.client.close()
+
+        report = {
+            "mode": self.mode,
+            "speed": self.speed,
+            "ticks": len(tick_epochs),
+            "completed": len(records),
+            "elapsed_s": elapsed,
+            "throughput_ticks_per_s": len(records) / elapsed if elapsed else 0.0,
+            "achieved_speed": (
+                len(records) * self.interval / elapsed if elapsed else 0.0
+            ),
+            "latency": _percentiles([r["latency_ms"] for r in records]),
+            "stage_p50_ms": {
+                stage: float(np.median([r["stage_ms"][stage] for r in records]))
+                for stage in PredictionPipeline.STAGES
+                if records
+            },
+            "fetcher": dict(fetcher.stats),
+        }
+        report["parity"] = self.compare_with_batch(records, raw_columns)
+        self.records = records
+        return report
+
+    def compare_with_batch(
+        self, records: List[Dict[str, Any]], raw_columns: List[str], atol: float = 1e-6
+    ) -> Dict[str, Any]:
+        """주기별 예측을 같은 시각의 배치 예측과 비교합니다."""
+        if not records:
+            return {"compared": 0}
+        batch = batch_predictions(self.data, self.model, raw_columns)
+        replay = pd.Series(
+            [r["prediction"] for r in records],
+            index=pd.to_datetime([r["tick_time"] for r in records], unit="s"),
+        ).sort_index()
+        expected = batch.sort_index().reindex(replay.index, method="ffill")
+        diff = (replay - expected).abs().dropna()
+        mismatches = diff[diff > atol]
+        if len(mismatches):
+            logger.warning(
+                f"배치 예측과 다른 주기 {len(mismatches)}개 "
+                f"(첫 시각 {mismatches.index[0]}, 최대 차이 {mismatches.max():.6f})"
+            )
+        return {
+            "compared": int(len(diff)),
+            "mismatches": int(len(mismatches)),
+            "max_abs_diff": float(diff.max()) if len(diff) else float("nan"),
+            "mean_abs_diff": float(diff.mean()) if len(diff) else float("nan"),
+        }
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    import warnings
+
+    from model_registry import load_model_file
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--data_path", type=str, default="Data/test_sample.csv")
+    parser.add_argument("--model_path", type=str, default="Model/lgbm_model.pkl")
+    parser.add_argument(
+        "--speed", type=float, default=0.0, help="재생 배속 (0이면 최대 속도)"
+    )
+    parser.add_argument("--interval", type=float, default=5.0)
+    parser.add_argument("--warmup_seconds", type=float, default=60.0)
+    parser.add_argument(
+        "--mode", type=str, default="sequential", choices=["sequential", "pipeline"]
+    )
+    parser.add_argument("--latency_ms", type=float, default=0.0)
+    parser.add_argument("--max_ticks", type=int, default=None)
+    parser.add_argument("--output", type=str, default=None, help="보고서 JSON 경로")
+    args = parser.parse_args()
+
+    # 전처리 단계별 INFO 로그 / pandas 단편화 경고가 보고서에 섞이지 않도록 함
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger().setLevel(logging.WARNING)
+    warnings.filterwarnings("ignore", category=pd.errors.PerformanceWarning)
+
+    data = load_frame(args.data_path)
+    model, _ = load_model_file(args.model_path)
+    replay = HistoricalReplay(
+        data,
+        model,
+        speed=args.speed,
+        interval_seconds=args.interval,
+        warmup_seconds=args.warmup_seconds,
+        mode=args.mode,
+        latency_ms=args.latency_ms,
+        max_ticks=args.max_ticks,
+    )
+
+    speed_label = "최대 속도" if args.speed <= 0 else f"{args.speed:g}배속"
+    print(f"🚀 과거 데이터 재생: {args.data_path} ({speed_label}, {args.mode})")
+    print(f"   주기 {len(replay.ticks)}개: {replay.ticks[0]} ~ {replay.ticks[-1]}")
+    print("=" * 60)
+    report = replay.run()
+
+    latency = report["latency"]
+    print(
+        f"📊 처리량: {report['throughput_ticks_per_s']:.2f}주기/s "
+        f"(재생 배속 {report['achieved_speed']:.1f}x, {report['elapsed_s']:.1f}초)"
+    )
+    if latency:
+        print(
+            f"⏱️ 주기 지연시간: p50={latency['p50_ms']:.0f}ms "
+            f"p95={latency['p95_ms']:.0f}ms p99={latency['p99_ms']:.0f}ms "
+            f"최대={latency['max_ms']:.0f}ms"
+        )
+    print(f"   단계별 p50: {report['stage_p50_ms']}")
+    parity = report["parity"]
+    print(
+        f"🔍 배치 예측 비교: {parity['compared']}개 중 불일치 {parity.get('mismatches', 0)}개 "
+        f"(최대 차이 {parity.get('max_abs_diff', float('nan')):.2e})"
+    )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2, default=str)
+        print(f"💾 보고서 저장: {args.output}")
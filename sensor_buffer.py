@@ -0,0 +1,429 @@
+#!/usr/bin/env python3
+"""
+실시간 전처리용 센서 이력 링 버퍼와 증분 InfluxDB 조회기
+전처리기(NOxDataPreprocessor)는 최대 30분 롤링 윈도우를 쓰므로 매 예측마다 30분치 이력이
+필요하지만, 새로 들어오는 데이터는 마지막 몇 초뿐입니다. 링 버퍼에 이력을 유지하고
+매 주기 마지막 시각 이후의 행만 조회하여 중복 제거 후 추가하고, 가장 긴 윈도우보다 오래된
+행은 제거합니다.
+
+재시작 직후 30분 이력을 다시 조회하지 않도록 버퍼를 주기적으로 npz 파일에 저장(checkpoint)
+하고, 시작 시 복원하여 저장 이후의 빈 구간만 조회합니다. 전처리기는 매 주기 버퍼 전체로
+피처를 다시 계산하므로 버퍼가 유일한 상태입니다.
+
+사용 예:
+    buffer = RollingSensorBuffer(columns)
+    fetcher = IncrementalSRS1Fetcher(SRS1InfluxDBClient(), columns, buffer)
+    raw_data = fetcher.fetch()   # 첫 호출은 전체 이력, 이후는 신규 행만 조회
+    model_data, feature_cols = NOxDataPreprocessor().preprocess_realtime_data(raw_data)
+
+    # 체크포인트: 60초마다(또는 checkpoint_every_ticks 조회마다) 저장, 재시작 시 복원 후
+    # 빈 구간만 조회. 종료 시에는 fetcher.checkpoint()를 호출
+    fetcher = IncrementalSRS1Fetcher(client, columns, checkpoint_path="state/srs1.npz")
+"""
+
+import logging
+import math
+import os
+import time
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+TIME_COL = "_time_gateway"
+# 전처리기의 가장 긴 롤링 윈도우 (요약통계량 30분, trash_drop_count_30min)
+PREPROCESSOR_HISTORY_SECONDS = 1800
+
+
+class RollingSensorBuffer:
+    """시각(int64 ns)과 센서 값(float64)을 고정 크기 배열에 순환 저장하는 버퍼
+
+    Parameters
+    ----------
+    columns : List[str]
+        저장할 센서 컬럼 (read_data 결과와 같은 소문자 이름)
+    history_seconds : float
+        유지할 이력 길이. 마지막 시각보다 이만큼 오래된 행은 제거합니다.
+    sample_period_seconds : float
+        예상 수집 주기. history_seconds와 함께 버퍼 용량을 정합니다.
+    """
+
+    def __init__(
+        self,
+        columns: List[str],
+        history_seconds: float = PREPROCESSOR_HISTORY_SECONDS + 60,
+        sample_period_seconds: float = 1.0,
+    ):
+        self.columns = [c for c in columns if c != TIME_COL]
+        self.history_ns = int(history_seconds * 1e9)
+        self.capacity = math.ceil(history_seconds / sample_period_seconds) + 1
+        self._times = np.zeros(self.capacity, dtype=np.int64)
+        self._values = np.full((self.capacity, len(self.columns)), np.nan)
+        self._start = 0
+        self._size = 0
+        self._tz = None
+        self.stats = {"appended": 0, "duplicates": 0, "evicted": 0, "overwritten": 0}
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def last_timestamp(self) -> Optional[pd.Timestamp]:
+        if self._size == 0:
+            return None
+        last = pd.Timestamp(self._times[(self._start + self._size - 1) % self.capacity])
+        if self._tz is not None:
+            last = last.tz_localize("UTC").tz_convert(self._tz)
+        return last
+
+    def append(self, data: pd.DataFrame) -> int:
+        """새 행을 추가합니다. (마지막 시각 이하 / 배치 내 중복 시각은 제외)
+
+        Returns
+        -------
+        int
+            실제로 추가된 행 수
+        """
+        if data is None or data.empty:
+            return 0
+
+        times = pd.to_datetime(data[TIME_COL])
+        if times.dt.tz is not None:
+            self._tz = self._tz or times.dt.tz
+            times = times.dt.tz_convert("UTC").dt.tz_localize(None)
+        times = times.to_numpy("datetime64[ns]").astype(np.int64)
+        values = data.reindex(columns=self.columns).to_numpy(
+            dtype=np.float64, na_value=np.nan
+        )
+
+        order = np.argsort(times, kind="stable")
+        times, values = times[order], values[order]
+        # 같은 시각이 여러 번 오면 마지막 행을 사용
+        keep = np.append(times[1:] != times[:-1], True)
+        if self._size:
+            last = self._times[(self._start + self._size - 1) % self.capacity]
+            keep &= times > last
+        self.stats["duplicates"] += int(len(times) - keep.sum())
+        times, values = times[keep], values[keep]
+
+        n_new = len(times)
+        if n_new > self.capacity:
+            # 용량보다 많으면 최신 행만 저장 (버린 행도 덮어쓴 행으로 집계)
+            self.stats["overwritten"] += n_new - self.capacity
+            times, values = times[-self.capacity :], values[-self.capacity :]
+            n_new = self.capacity
+
+        overflow = max(0, self._size + n_new - self.capacity)
+        if overflow:
+            self.stats["overwritten"] += overflow
+            self._start = (self._start + overflow) % self.capacity
+            self._size -= overflow
+
+        positions = (self._start + self._size + np.arange(n_new)) % self.capacity
+        self._times[positions] = times
+        self._values[positions] = values
+        self._size += n_new
+        self.stats["appended"] += n_new
+
+        self._evict_expired()
+        return n_new
+
+    def _evict_expired(self) -> None:
+        """마지막 시각 기준 history_seconds보다 오래된 행을 제거합니다."""
+        if self._size == 0:
+            return
+        cutoff = self._times[(self._start + self._size - 1) % self.capacity] - (
+            self.history_ns
+        )
+        ordered_times = self._ordered(self._times)
+        n_expired = int(np.searchsorted(ordered_times, cutoff, side="left"))
+        if n_expired:
+            self._start = (self._start + n_expired) % self.capacity
+            self._size -= n_expired
+            self.stats["evicted"] += n_expired
+
+    def _ordered(self, array: np.ndarray) -> np.ndarray:
+        """링 버퍼 내용을 시간순으로 이어 붙인 배열 (필요할 때만 복사)"""
+        end = self._start + self._size
+        if end <= self.capacity:
+            return array[self._start : end]
+        return np.concatenate(
+            [array[self._start :], array[: end - self.capacity]], axis=0
+        )
+
+    def to_frame(self) -> pd.DataFrame:
+        """전처리기에 넘길 시간순 연속 DataFrame (_time_gateway + 센서 컬럼)"""
+        times = pd.to_datetime(self._ordered(self._times))
+        if self._tz is not None:
+            times = times.tz_localize("UTC").tz_convert(self._tz)
+        frame = pd.DataFrame(
+            np.array(self._ordered(self._values), copy=True), columns=self.columns
+        )
+        frame.insert(0, TIME_COL, times)
+        return frame
+
+    def clear(self) -> None:
+        self._start = 0
+        self._size = 0
+
+    def save(self, path: str) -> int:
+        """버퍼 내용을 npz 파일로 저장합니다. (임시 파일에 쓴 뒤 교체)
+
+        Returns
+        -------
+        int
+            저장한 파일 크기 (bytes)
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                times=self._ordered(self._times),
+                values=self._ordered(self._values),
+                columns=np.array(self.columns),
+                tz=np.array(str(self._tz) if self._tz is not None else ""),
+                history_ns=np.array(self.history_ns),
+            )
+        os.replace(tmp_path, path)
+        return os.path.getsize(path)
+
+    def restore(self, path: str) -> int:
+        """save()로 저장한 파일에서 버퍼를 복원합니다.
+
+        파일이 없거나 컬럼 구성이 다르면 복원하지 않습니다.
+
+        Returns
+        -------
+        int
+            복원한 행 수
+        """
+        if not os.path.exists(path):
+            return 0
+        try:
+            with np.load(path) as checkpoint:
+                columns = checkpoint["columns"].tolist()
+                times = checkpoint["times"]
+                values = checkpoint["values"]
+                tz = str(checkpoint["tz"])
+        except Exception as e:
+            logger.warning(f"체크포인트 읽기 실패, 빈 버퍼로 시작: {path} ({e})")
+            return 0
+        if columns != self.columns:
+            logger.warning(f"체크포인트 컬럼 구성이 달라 무시합니다: {path}")
+            return 0
+
+        if len(times) > self.capacity:
+            times, values = times[-self.capacity :], values[-self.capacity :]
+        self.clear()
+        n_rows = len(times)
+        self._times[:n_rows] = times
+        self._values[:n_rows] = values
+        self._size = n_rows
+        self._tz = tz or None
+        self._evict_expired()
+        return len(self)
+
+
+class IncrementalSRS1Fetcher:
+    """링 버퍼를 채우는 증분 조회기
+
+    첫 조회는 전체 이력을, 이후에는 버퍼의 마지막 시각 이후 행만 조회합니다.
+    client는 SRS1InfluxDBClient.read_data(columns, start_time, query_range_seconds,
+    table_name)와 같은 인터페이스를 가지면 됩니다.
+    checkpoint_path가 있으면 checkpoint_interval_seconds마다 버퍼를 저장하며,
+    checkpoint_every_ticks를 주면 시간 대신 조회 횟수 기준으로 저장합니다.
+    """
+
+    def __init__(
+        self,
+        client,
+        columns: List[str],
+        buffer: Optional[RollingSensorBuffer] = None,
+        table_name: str = "SRS1",
+        overlap_seconds: float = 0.0,
+        checkpoint_path: Optional[str] = None,
+        checkpoint_interval_seconds: float = 60.0,
+        checkpoint_every_ticks: Optional[int] = None,
+    ):
+        self.client = client
+        self.columns = columns
+        # 빈 버퍼도 len()이 0이라 거짓이므로 None과 구분
+        self.buffer = (
+            buffer
+            if buffer is not None
+            else RollingSensorBuffer([c.lower() for c in columns if c != TIME_COL])
+        )
+        self.table_name = table_name
+        # 조회 시작 시각을 올림 처리하므로 마지막 행이 다시 올 수 있으며, 중복은 버퍼에서 제거
+        self.overlap_seconds = overlap_seconds
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_interval = checkpoint_interval_seconds
+        self.checkpoint_every_ticks = checkpoint_every_ticks
+        self._last_checkpoint = time.monotonic()
+        self.stats = {
+            "ticks": 0,
+            "rows_fetched": 0,
+            "full_fetches": 0,
+            "restored_rows": 0,
+            "checkpoints": 0,
+        }
+        if checkpoint_path:
+            restored = self.buffer.restore(checkpoint_path)
+            self.stats["restored_rows"] = restored
+            if restored:
+                logger.info(
+                    f"체크포인트 복원: {restored}행 "
+                    f"(마지막 시각 {self.buffer.last_timestamp})"
+                )
+
+    def fetch(self, now: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+        """신규 행을 조회하여 버퍼에 추가하고, 전체 이력 DataFrame을 반환합니다."""
+        now = now or pd.Timestamp.now(tz="UTC").tz_localize(None)
+        last = self.buffer.last_timestamp
+
+        if last is None:
+            range_seconds = self.buffer.history_ns / 1e9
+            self.stats["full_fetches"] += 1
+        else:
+            if last.tzinfo is not None:
+                last = last.tz_convert("UTC").tz_localize(None)
+            range_seconds = max(
+                math.ceil((now - last).total_seconds() + self.overlap_seconds), 1
+            )
+            range_seconds = min(range_seconds, self.buffer.history_ns / 1e9)
+
+        data = self.client.read_data(
+            columns=self.columns,
+            start_time=now,
+            query_range_seconds=range_seconds,
+            table_name=self.table_name,
+        )
+        fetched = 0 if data is None else len(data)
+        added = self.buffer.append(data)
+
+        self.stats["ticks"] += 1
+        self.stats["rows_fetched"] += fetched
+        logger.info(
+            f"증분 조회: {range_seconds:.0f}초 범위 {fetched}행 → 신규 {added}행 "
+            f"(버퍼 {len(self.buffer)}행)"
+        )
+        if self.checkpoint_path and self._checkpoint_due():
+            self.checkpoint()
+        return self.buffer.to_frame()
+
+    def _checkpoint_due(self) -> bool:
+        if self.checkpoint_every_ticks:
+            return self.stats["ticks"] % self.checkpoint_every_ticks == 0
+        return time.monotonic() - self._last_checkpoint >= self.checkpoint_interval
+
+    def checkpoint(self) -> None:
+        """버퍼를 checkpoint_path에 저장합니다. (종료 시에도 호출)"""
+        if not self.checkpoint_path or not len(self.buffer):
+            return
+        try:
+            size = self.buffer.save(self.checkpoint_path)
+        except Exception as e:
+            # 저장 실패가 예측 주기를 막지 않도록 기록만 함
+            logger.warning(f"체크포인트 저장 실패: {e}")
+            return
+        self._last_checkpoint = time.monotonic()
+        self.stats["checkpoints"] += 1
+        logger.debug(f"체크포인트 저장: {self.checkpoint_path} ({size / 1024:.0f}KB)")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--data_path", type=str, default="Data/test_sample.csv")
+    parser.add_argument("--history_seconds", type=float, default=600)
+    args = parser.parse_args()
+
+    sample = pd.read_csv(args.data_path, parse_dates=[TIME_COL])
+    sensor_columns = [c for c in sample.columns if c != TIME_COL][:20]
+
+    # 한 번에 전체 이력을 받은 뒤 1행씩 증분 추가하는 경우와 매번 전체를 다시 만드는 경우 비교
+    buffer = RollingSensorBuffer(sensor_columns, history_seconds=args.history_seconds)
+    start = time.perf_counter()
+    for i in range(len(sample)):
+        # 이전 행과 겹치게 2행씩 전달하여 중복 제거 확인
+        buffer.append(sample.iloc[max(0, i - 1) : i + 1])
+        frame = buffer.to_frame()
+    elapsed = (time.perf_counter() - start) * 1000
+
+    window_start = sample[TIME_COL].iloc[-1] - pd.Timedelta(
+        seconds=args.history_seconds
+    )
+    expected = sample[sample[TIME_COL] >= window_start].reset_index(drop=True)
+    matches = np.allclose(
+        frame[sensor_columns].to_numpy(),
+        expected[sensor_columns].to_numpy(),
+        equal_nan=True,
+    ) and np.array_equal(
+        frame[TIME_COL].to_numpy("datetime64[ns]"),
+        expected[TIME_COL].to_numpy("datetime64[ns]"),
+    )
+    print(f"🔍 전체 조회 결과와 일치: {matches} ({len(frame)}행)")
+    print(f"📊 버퍼 통계: {buffer.stats}")
+    print(f"⚡ 주기당 추가 + 프레임 생성: {elapsed / len(sample):.3f}ms")
+
+    # 체크포인트 저장 / 복원 후 같은 프레임인지, 재시작 시 조회 범위가 얼마나 줄어드는지 확인
+    import tempfile
+
+    from local_influxdb import LocalInfluxDBServer
+    from test_influxdb_realtime import REALTIME_COLUMNS, SRS1InfluxDBClient
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        checkpoint_path = os.path.join(tmp_dir, "srs1_buffer.npz")
+        start = time.perf_counter()
+        size = buffer.save(checkpoint_path)
+        save_ms = (time.perf_counter() - start) * 1000
+        restored = RollingSensorBuffer(
+            sensor_columns, history_seconds=args.history_seconds
+        )
+        start = time.perf_counter()
+        restored.restore(checkpoint_path)
+        restore_ms = (time.perf_counter() - start) * 1000
+        print(
+            f"💾 체크포인트 {size / 1024:.0f}KB: 저장 {save_ms:.1f}ms, "
+            f"복원 {restore_ms:.1f}ms, 일치: {restored.to_frame().equals(frame)}"
+        )
+
+        times = sample[TIME_COL]
+        stop_at = times.iloc[len(sample) // 2]
+        restart_at = times.iloc[-1]
+        with LocalInfluxDBServer(sample) as server:
+            client = SRS1InfluxDBClient(
+                host=server.host, port=server.port, verbose=False
+            )
+            # 중간 시각까지 운영 후 종료 → 마지막 시각에 재시작
+            checkpoint_path = os.path.join(tmp_dir, "srs1_realtime.npz")
+            fetcher = IncrementalSRS1Fetcher(
+                client, REALTIME_COLUMNS, checkpoint_path=checkpoint_path
+            )
+            fetcher.fetch(now=stop_at)
+            fetcher.checkpoint()
+
+            frames = {}
+            for label, path in [("콜드 스타트", None), ("웜 재시작", checkpoint_path)]:
+                fetcher = IncrementalSRS1Fetcher(
+                    client, REALTIME_COLUMNS, checkpoint_path=path
+                )
+                start = time.perf_counter()
+                frames[label] = fetcher.fetch(now=restart_at)
+                elapsed = (time.perf_counter() - start) * 1000
+                print(
+                    f"🔄 {label}: 조회 {fetcher.stats['rows_fetched']}행 "
+                    f"(복원 {fetcher.stats['restored_rows']}행), "
+                    f"버퍼 {len(frames[label])}행, {elapsed:.1f}ms"
+                )
+            print(
+                f"🔍 콜드 / 웜 버퍼 일치: {frames['콜드 스타트'].equals(frames['웜 재시작'])}"
+            )
@@ -13,6 +13,7 @@ import mlflow
 from mlflow.tracking import MlflowClient
 
 ROOT_PATH = "model_results/"
+SAMPLE_DATA_PATH = "Data/test_sample.csv"
 
 
 def download_nox_model(client: MlflowClient, run_id: str) -> None:
@@ -58,7 +59,11 @@ def download_nox_model(client: MlflowClient, run_id: str) -> None:
 
 
 def package_nox_model(
-    model_root_directory: str, package_dst: str = "trained_models"
+    model_root_directory: str,
+    package_dst: str = "trained_models",
+    plant_code: str = None,
+    version: str = None,
+    export_onnx: bool = False,
 ) -> None:
     """NOx 모델을 패키징합니다.
 
@@ -68,11 +73,20 @@ def package_nox_model(
         모델이 다운로드된 루트 디렉토리
     package_dst : str
         패키징할 대상 디렉토리
+    plant_code : str, optional
+        지정하면 모델 레지스트리 구조({package_dst}/{plant_code}/{version})로 패키징
+    version : str, optional
+        레지스트리 모델 버전 (보통 MLflow Run ID)
+    export_onnx : bool
+        True이면 ONNX Runtime 백엔드용 lgbm_model.onnx도 생성 (onnxmltools 필요)
     """
     model_root_directory = Path(model_root_directory)
     package_dst = Path(package_dst)
 
-    nox_root = package_dst / "nox-model"
+    if plant_code:
+        nox_root = package_dst / plant_code / version
+    else:
+        nox_root = package_dst / "nox-model"
     os.makedirs(nox_root, exist_ok=True)
 
     # NOx 모델 파일 복사
@@ -109,6 +123,38 @@ def package_nox_model(
             pickle.dump(dummy_model, f)
         print("테스트용 더미 모델 생성")
 
+    # 단건 예측용 평탄화 모델 생성 (Lambda 추론 경로에서 lightgbm/sklearn import 회피)
+    try:
+        from flat_tree_model import export_flat_model
+
+        export_flat_model(
+            str(nox_root / "lgbm_model.pkl"), str(nox_root / "lgbm_model_flat.npz")
+        )
+        print(f"평탄화 모델 생성 완료: {nox_root}/lgbm_model_flat.npz")
+    except Exception as e:
+        print(f"경고: 평탄화 모델 생성 실패, 피클 모델을 사용합니다: {e}")
+
+    # ONNX Runtime 백엔드용 모델 생성 (NOX_MODEL_BACKEND=onnx)
+    if export_onnx:
+        try:
+            import pickle
+
+            from onnx_model import OnnxNOxModel, export_onnx_model, verify_parity
+
+            onnx_path = str(nox_root / "lgbm_model.onnx")
+            export_onnx_model(str(nox_root / "lgbm_model.pkl"), onnx_path)
+            if os.path.exists(SAMPLE_DATA_PATH):
+                with open(nox_root / "lgbm_model.pkl", "rb") as f:
+                    lgbm_model = pickle.load(f)
+                verify_parity(
+                    lgbm_model, OnnxNOxModel.load(onnx_path), SAMPLE_DATA_PATH
+                )
+            print(f"ONNX 모델 생성 완료: {onnx_path}")
+        except Exception as e:
+            print(f"경고: ONNX 모델 생성 실패: {e}")
+            if os.path.exists(nox_root / "lgbm_model.onnx"):
+                os.remove(nox_root / "lgbm_model.onnx")
+
     # 모델 메타데이터 파일 생성
     metadata = {
         "model_type": "LGBM",
@@ -122,6 +168,11 @@ def package_nox_model(
     with open(nox_root / "model_metadata.yaml", "w") as f:
         yaml.dump(metadata, f)
 
+    if plant_code:
+        # 레지스트리에서 버전 미지정 요청 시 사용할 기본 버전
+        with open(package_dst / plant_code / "LATEST", "w") as f:
+            f.write(version)
+
     print(f"모델 패키징 완료: {nox_root}")
 
 
@@ -135,6 +186,17 @@ def main() -> None:
         default="trained_models",
         help="Exported model destination",
     )
+    parser.add_argument(
+        "--plant_code",
+        type=str,
+        default=None,
+        help="지정하면 {dst_path}/{plant_code}/{run_id} 레지스트리 구조로 패키징",
+    )
+    parser.add_argument(
+        "--export_onnx",
+        action="store_true",
+        help="ONNX Runtime 백엔드용 lgbm_model.onnx 생성",
+    )
     parser.add_argument(
         "--mlflow_tracking_uri",
         type=str,
@@ -163,7 +225,9 @@ def main() -> None:
     print("=" * 50)
     print("3단계: NOx 모델 패키징")
     print("=" * 50)
-    package_nox_model(ROOT_PATH, args.dst_path)
+    package_nox_model(
+        ROOT_PATH, args.dst_path, args.plant_code, args.run_id, args.export_onnx
+    )
 
     # 3. 임시 파일 정리
     print(f"임시 다운로드 디렉토리 정리: {ROOT_PATH}")
@@ -171,7 +235,10 @@ def main() -> None:
         shutil.rmtree(ROOT_PATH)
 
     print(f"✅ 3단계 완료: NOx 모델 다운로드 및 패키징 완료")
-    print(f"패키징된 모델 위치: {args.dst_path}/nox-model/")
+    if args.plant_code:
+        print(f"패키징된 모델 위치: {args.dst_path}/{args.plant_code}/{args.run_id}/")
+    else:
+        print(f"패키징된 모델 위치: {args.dst_path}/nox-model/")
 
 
 if __name__ == "__main__":
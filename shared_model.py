@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+사전 fork된 작업자 프로세스들이 하나의 모델과 공유 메모리 입출력 버퍼를 쓰는 예측 풀
+부모 프로세스가 평탄화 모델을 한 번만 로드(또는 메모리 매핑)하고 fork하므로, 작업자는
+모델 배열을 copy-on-write로 공유합니다. 작업자별 입력/출력 버퍼는 공유 메모리에 미리
+할당되어 요청마다 배열 복사·직렬화·할당이 일어나지 않습니다.
+
+사용 예:
+    python shared_model.py --workers 4 --mmap_dir Model/lgbm_model_flat
+"""
+
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+from multiprocessing import shared_memory
+from typing import List
+
+import numpy as np
+
+from flat_tree_model import FlatTreeModel
+
+logger = logging.getLogger(__name__)
+
+_STOP = -1
+
+
+def _worker_loop(model, conn, input_name, output_name, max_rows):
+    """작업자 프로세스: 파이프로 받은 행 수만큼 공유 입력 버퍼를 예측합니다."""
+    input_shm = shared_memory.SharedMemory(name=input_name)
+    output_shm = shared_memory.SharedMemory(name=output_name)
+    try:
+        X = np.ndarray(
+            (max_rows, model.num_features), dtype=np.float64, buffer=input_shm.buf
+        )
+        out = np.ndarray((max_rows,), dtype=np.float64, buffer=output_shm.buf)
+        workspace = model.make_workspace(max_rows)
+
+        while True:
+            n_rows = conn.recv()
+            if n_rows == _STOP:
+                break
+            try:
+                model.predict_into(X[:n_rows], out[:n_rows], workspace)
+                conn.send(n_rows)
+            except Exception as e:
+                conn.send(repr(e))
+    finally:
+        del X, out
+        input_shm.close()
+        output_shm.close()
+
+
+class _WorkerSlot:
+    def __init__(self, process, conn, input_shm, output_shm, X, out):
+        self.process = process
+        self.conn = conn
+        self.input_shm = input_shm
+        self.output_shm = output_shm
+        self.X = X
+        self.out = out
+
+
+class PreforkPredictorPool:
+    """평탄화 모델을 공유하는 fork 기반 작업자 풀
+
+    predict()는 여러 스레드에서 동시에 호출할 수 있으며, 유휴 작업자 하나를 골라
+    그 작업자의 공유 입력 버퍼에 행을 쓰고 결과를 받아옵니다.
+    """
+
+    def __init__(self, model: FlatTreeModel, n_workers: int = 2, max_rows: int = 1024):
+        self.model = model
+        self.n_workers = n_workers
+        self.max_rows = max_rows
+        self._slots: List[_WorkerSlot] = []
+        self._idle: "queue.Queue[int]" = queue.Queue()
+
+    def start(self) -> "PreforkPredictorPool":
+        ctx = multiprocessing.get_context("fork")
+        n_features = self.model.num_features
+        for i in range(self.n_workers):
+            input_shm = shared_memory.SharedMemory(
+                create=True, size=self.max_rows * n_features * 8
+            )
+            output_shm = shared_memory.SharedMemory(create=True, size=self.max_rows * 8)
+            parent_conn, child_conn = ctx.Pipe()
+            process = ctx.Process(
+                target=_worker_loop,
+                args=(
+                    self.model,
+                    child_conn,
+                    input_shm.name,
+                    output_shm.name,
+                    self.max_rows,
+                ),
+                name=f"nox-predictor-{i}",
+                daemon=True,
+            )
+            process.start()
+            child_conn.close()
+            X = np.ndarray(
+                (self.max_rows, n_features), dtype=np.float64, buffer=input_shm.buf
+            )
+            out = np.ndarray((self.max_rows,), dtype=np.float64, buffer=output_shm.buf)
+            self._slots.append(
+                _WorkerSlot(process, parent_conn, input_shm, output_shm, X, out)
+            )
+            self._idle.put(i)
+        logger.info(
+            f"예측 작업자 {self.n_workers}개 시작 (작업자당 최대 {self.max_rows}행)"
+        )
+        return self
+
+    def predict(self, X, out: np.ndarray = None) -> np.ndarray:
+        """유휴 작업자에서 예측합니다. (X 행 수 <= max_rows)"""
+        X = np.atleast_2d(X)
+        n_rows = len(X)
+        if n_rows > self.max_rows:
+            raise ValueError(f"배치 크기 초과: {n_rows} (최대 {self.max_rows})")
+
+        worker_id = self._idle.get()
+        slot = self._slots[worker_id]
+        try:
+            slot.X[:n_rows] = X
+            slot.conn.send(n_rows)
+            reply = slot.conn.recv()
+            if reply != n_rows:
+                raise RuntimeError(f"작업자 예측 실패: {reply}")
+            if out is None:
+                out = np.empty(n_rows)
+            out[:n_rows] = slot.out[:n_rows]
+            return out
+        finally:
+            self._idle.put(worker_id)
+
+    def worker_pids(self) -> List[int]:
+        return [slot.process.pid for slot in self._slots]
+
+    def close(self) -> None:
+        for slot in self._slots:
+            try:
+                slot.conn.send(_STOP)
+            except (BrokenPipeError, OSError):
+                pass
+        for slot in self._slots:
+            slot.process.join(timeout=5)
+            del slot.X, slot.out
+            slot.input_shm.close()
+            slot.input_shm.unlink()
+            slot.output_shm.close()
+            slot.output_shm.unlink()
+        self._slots = []
+        logger.info("예측 작업자 종료")
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_memory_mb(pid: int) -> dict:
+    """/proc/<pid>/smaps_rollup에서 RSS / PSS / 프로세스 전용 메모리(USS)를 MB로 읽습니다."""
+    values = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[1].isdigit():
+                    values[parts[0].rstrip(":")] = int(parts[1]) / 1024
+    except OSError:
+        return {}
+    return {
+        "rss": values.get("Rss", 0.0),
+        "pss": values.get("Pss", 0.0),
+        "uss": values.get("Private_Clean", 0.0) + values.get("Private_Dirty", 0.0),
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    import pandas as pd
+
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--flat_model_path", type=str, default="Model/lgbm_model_flat.npz"
+    )
+    parser.add_argument("--model_path", type=str, default="Model/lgbm_model.pkl")
+    parser.add_argument(
+        "--mmap_dir",
+        type=str,
+        default=None,
+        help="save_mmap 디렉토리 (메모리 매핑 로드)",
+    )
+    parser.add_argument("--data_path", type=str, default="Data/test_sample.csv")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    if args.mmap_dir:
+        if not os.path.exists(os.path.join(args.mmap_dir, "meta.json")):
+            from model_registry import load_model_file
+
+            FlatTreeModel.from_model(load_model_file(args.model_path)[0]).save_mmap(
+                args.mmap_dir
+            )
+        flat_model = FlatTreeModel.load_mmap(args.mmap_dir)
+    elif os.path.exists(args.flat_model_path):
+        flat_model = FlatTreeModel.load(args.flat_model_path)
+    else:
+        from model_registry import load_model_file
+
+        flat_model = FlatTreeModel.from_model(load_model_file(args.model_path)[0])
+
+    X = pd.read_csv(args.data_path)[flat_model.feature_names].to_numpy(np.float64)
+    expected = flat_model.predict(X)
+
+    with PreforkPredictorPool(flat_model, n_workers=args.workers, max_rows=256) as pool:
+        actual = pool.predict(X)
+        print(f"🔍 예측 일치 여부: {np.array_equal(expected, actual)}")
+
+        def client(n):
+            row_out = np.empty(1)
+            for i in range(n):
+                pool.predict(X[i % len(X) : i % len(X) + 1], out=row_out)
+
+        threads = [
+            threading.Thread(target=client, args=(args.requests // args.workers,))
+            for _ in range(args.workers)
+        ]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+        print(f"⚡ 단건 처리량: {args.requests / elapsed:.0f} req/s")
+
+        print("\n📊 작업자 메모리 (MB):")
+        for pid in pool.worker_pids():
+            mem = read_memory_mb(pid)
+            print(
+                f"   pid={pid} RSS={mem.get('rss', 0):.1f} PSS={mem.get('pss', 0):.1f} "
+                f"전용(USS)={mem.get('uss', 0):.1f}"
+            )
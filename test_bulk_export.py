@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+대량 내보내기 테스트
+로컬 InfluxDB 대체 서버(LocalInfluxDBServer)의 합성 이력으로 구간 격자 분할, 이어받기(완료
+구간 건너뜀), 실패 구간 재시도, 파일 스키마 통일(빠진 컬럼은 NaN float64)과 load_export의
+시각 중복 제거를 확인합니다.
+
+사용 예:
+    python -m pytest -q test_bulk_export.py
+    python test_bulk_export.py
+"""
+
+import os
+import sys
+import tempfile
+
+import pandas as pd
+
+from bulk_export import TIME_COL, BulkExporter, load_export, time_slices
+from local_influxdb import LocalInfluxDBServer, load_frame, synthetic_history
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_PATH = os.path.join(REPO_DIR, "Data", "test_sample.csv")
+
+COLUMNS = ["NOX_Value", "BFT_EO_FG_T", "MISSING_TAG"]
+SLICE_SECONDS = 1800
+
+
+def make_history() -> pd.DataFrame:
+    """2시간(7200행, 1초 간격) 합성 이력"""
+    return synthetic_history(load_frame(DATA_PATH), 2)
+
+
+def make_exporter(server: LocalInfluxDBServer, output_dir: str, **kwargs):
+    options = dict(
+        columns=COLUMNS,
+        slice_seconds=SLICE_SECONDS,
+        max_workers=1,
+        retry_backoff=0.01,
+        client_kwargs={"host": server.host, "port": server.port},
+    )
+    options.update(kwargs)
+    return BulkExporter(output_dir, **options)
+
+
+def test_time_slices_align_to_grid():
+    """시작 시각은 격자 경계로 내림하여 시작 시각이 달라도 같은 구간이 나와야 합니다."""
+    slices = time_slices("2024-01-01 00:10:00", "2024-01-01 01:15:00", SLICE_SECONDS)
+    assert [(str(lo), str(hi)) for lo, hi in slices] == [
+        ("2024-01-01 00:00:00", "2024-01-01 00:30:00"),
+        ("2024-01-01 00:30:00", "2024-01-01 01:00:00"),
+        ("2024-01-01 01:00:00", "2024-01-01 01:15:00"),
+    ]
+    assert time_slices("2024-01-01 00:29:59+00:00", "2024-01-01 01:15", 1800) == slices
+
+
+def test_resume_skips_completed_slices():
+    """다시 실행하면 매니페스트의 완료 구간은 조회하지 않고, 겹친 구간은 load_export가 합쳐야 합니다."""
+    history = make_history()
+    start = history[TIME_COL].min() - pd.Timedelta(seconds=1)
+    end = history[TIME_COL].max()
+
+    with LocalInfluxDBServer(history) as server, tempfile.TemporaryDirectory() as d:
+        # 01:15에서 중단한 실행: 마지막 구간 (01:00, 01:15]는 전체 실행의 구간과 키가 다름
+        first = make_exporter(server, d).export(start, "2025-07-05 01:15:00")
+        assert (first["slices"], first["exported"]) == (4, 4)
+        assert server.stats["requests"] == 4
+
+        second = make_exporter(server, d).export(start, end)
+        assert (second["slices"], second["resumed"], second["exported"]) == (5, 3, 2)
+        assert server.stats["requests"] == 6
+
+        third = make_exporter(server, d).export(start, end)
+        assert (third["resumed"], third["exported"]) == (5, 0)
+        assert server.stats["requests"] == 6
+
+        data = load_export(d)
+
+    assert first["rows"] + second["rows"] > len(history)  # 01:00 ~ 01:15 중복 기록
+    assert len(data) == len(history)
+    assert data[TIME_COL].is_monotonic_increasing
+    assert not data[TIME_COL].duplicated().any()
+
+
+def test_failed_slice_is_retried_on_next_run():
+    """재시도를 다 써서 실패한 구간은 매니페스트에 남지 않고 다음 실행에서 내보내야 합니다."""
+    history = make_history()
+    start = history[TIME_COL].min() - pd.Timedelta(seconds=1)
+    end = history[TIME_COL].max()
+
+    with LocalInfluxDBServer(history) as server, tempfile.TemporaryDirectory() as d:
+        exporter = make_exporter(server, d, max_retries=1)
+        server.fail_next(1)  # 첫 구간: 1회 실패 후 재시도 성공
+        report = exporter.export(start, end)
+        assert report["retries"] == 1
+        assert (report["exported"], report["failed"]) == (5, [])
+
+        os.remove(exporter.manifest_path)
+        server.fail_next(2)  # 첫 구간: 재시도까지 실패
+        report = exporter.export(start, end)
+        assert (report["exported"], len(report["failed"])) == (4, 1)
+        assert len(exporter.completed()) == 4
+
+        report = exporter.export(start, end)
+        assert (report["resumed"], report["exported"]) == (4, 1)
+
+
+def test_parts_share_schema_with_missing_columns_as_nan():
+    """응답에 없는 필드도 NaN float64 컬럼으로 기록되어 모든 파일의 스키마가 같아야 합니다."""
+    history = make_history()
+    start = history[TIME_COL].min() - pd.Timedelta(seconds=1)
+    end = history[TIME_COL].max()
+
+    with LocalInfluxDBServer(history) as server, tempfile.TemporaryDirectory() as d:
+        exporter = make_exporter(server, d)
+        exporter.export(start, end)
+        paths = [entry["path"] for entry in exporter.completed().values()]
+        schemas = {
+            tuple(pd.read_parquet(os.path.join(d, path)).dtypes.astype(str).items())
+            for path in paths
+        }
+        data = load_export(d, columns=["NOX_Value", "MISSING_TAG"])
+
+    assert len(schemas) == 1
+    assert list(data.columns) == ["nox_value", "missing_tag", TIME_COL]
+    assert data["missing_tag"].dtype == "float64"
+    assert data["missing_tag"].isna().all()
+    assert data["nox_value"].notna().all()
+
+
+if __name__ == "__main__":
+    import logging
+
+    logging.basicConfig(level=logging.WARNING)
+
+    tests = [
+        test_time_slices_align_to_grid,
+        test_resume_skips_completed_slices,
+        test_failed_slice_is_retried_on_next_run,
+        test_parts_share_schema_with_missing_columns_as_nan,
+    ]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {type(e).__name__}: {e}")
+    print(f"\n📊 {len(tests) - failed}/{len(tests)}개 통과")
+    sys.exit(1 if failed else 0)
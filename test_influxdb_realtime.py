@@ -14,19 +14,59 @@ logging.basicConfig(
 )
 
 
+# NOx 예측에 필요한 컬럼들 (대문자로 InfluxDB에서 조회)
+REALTIME_COLUMNS = [
+    "_time_gateway",
+    "BFT_EO_FG_T",
+    "BR1_EO_FG_T",
+    "BR1_EO_O2_A",
+    "BR1_EO_ST_T",
+    "DR1_EQ_BW_C",
+    "ICF_CCS_FG_T_1",
+    "ICF_CRA_WT_K",
+    "ICF_FF1_AR_F_1",
+    "ICF_FF1_SS_S_1",
+    "ICF_FF1_SS_S_2",
+    "ICF_FF2_SS_S_1",
+    "ICF_IDF_SS_S_1",
+    "ICF_SCS_FG_T_1",
+    "ICF_TMS_NOX_A",
+    "SDR_HTR_FG_T",
+    "NOX_Value",
+]
+
+
 class SRS1InfluxDBClient:
     """SRS1 InfluxDB 클라이언트"""
 
-    def __init__(self):
-        # 개발 InfluxDB 설정
+    def __init__(
+        self,
+        host: str = "10.238.24.150",
+        port: int = 8086,
+        username: str = "read_user",
+        password: str = "!Skepinfluxuser25",
+        database: str = "SRS1",
+        verbose: bool = True,
+        cache=None,
+    ):
+        # 개발 InfluxDB 설정 (로컬 대체 서버: local_influxdb.LocalInfluxDBServer의 host/port)
         self.client = InfluxDBClient(
-            host="10.238.24.150",
-            port=8086,
-            username="read_user",
-            password="!Skepinfluxuser25",
-            database="SRS1",
+            host=host,
+            port=port,
+            username=username,
+            password=password,
+            database=database,
         )
-        self.database = "SRS1"
+        self.database = database
+        # False이면 조회마다 출력하는 진행 메시지를 생략 (리플레이 / 벤치마크용)
+        self.verbose = verbose
+        # raw_data_cache.RawDataCache를 지정하면 read_data가 1시간 블록 디스크 캐시를 거침
+        # (None이면 SRS1_CACHE_DIR 환경 변수로 생성, False이면 캐시 사용 안 함)
+        if cache is None:
+            from raw_data_cache import RawDataCache
+
+            cache = RawDataCache.from_env()
+        self.cache = cache or None
 
     def _make_read_query(
         self,
@@ -48,45 +88,151 @@ class SRS1InfluxDBClient:
         """
         return query
 
-    def read_data(
+    def _make_aggregate_query(
+        self,
+        columns: list,
+        start_time: pd.Timestamp,
+        query_range_seconds: int,
+        resolution_seconds: int,
+        aggregates=("mean",),
+        table_name: str = "SRS1",
+    ) -> str:
+        """GROUP BY time() 집계 쿼리 생성 (InfluxDB에서 resolution_seconds 간격으로 집계)
+
+        컬럼마다 aggregates(mean / min / max 등) 결과를 "<컬럼>_<집계>" 별칭으로 조회합니다.
+        """
+        end_time = start_time - pd.Timedelta(seconds=query_range_seconds)
+        start_time_str = start_time.strftime("%Y-%m-%d %H:%M:%S")
+        end_time_str = end_time.strftime("%Y-%m-%d %H:%M:%S")
+        fields = ", ".join(
+            f'{agg}("{col}") AS "{col}_{agg}"'
+            for col in columns
+            if col != "_time_gateway"
+            for agg in aggregates
+        )
+
+        query = f"""
+            SELECT {fields}
+            FROM {table_name}
+            WHERE time > '{end_time_str}' and time <= '{start_time_str}'
+            GROUP BY time({int(resolution_seconds)}s) fill(none)
+            ORDER BY time
+        """
+        return query
+
+    def read_aggregated(
         self,
         columns: list,
         start_time: pd.Timestamp,
         query_range_seconds: int,
+        resolution_seconds: int,
+        aggregates=("mean",),
         table_name: str = "SRS1",
     ) -> pd.DataFrame:
-        """SRS1 데이터 조회"""
+        """서버 측 집계 조회 (원시 행 대신 resolution_seconds 구간별 집계 값만 전송)
+
+        Returns
+        -------
+        pd.DataFrame
+            _time_gateway(구간 시작 시각)와 "<컬럼 소문자>_<집계>" 컬럼
+        """
         try:
-            query = self._make_read_query(
-                columns, start_time, query_range_seconds, table_name
+            query = self._make_aggregate_query(
+                columns,
+                start_time,
+                query_range_seconds,
+                resolution_seconds,
+                aggregates,
+                table_name,
             )
-            print(f"🔍 쿼리 실행: {query_range_seconds}초 범위")
+            if self.verbose:
+                print(
+                    f"🔍 집계 쿼리 실행: {query_range_seconds}초 범위, "
+                    f"{resolution_seconds}초 간격 {list(aggregates)}"
+                )
 
             result_set = self.client.query(query)
             data = pd.DataFrame(result_set.get_points())
-
             if data.empty:
-                print("⚠️ 조회된 데이터가 없습니다.")
+                if self.verbose:
+                    print("⚠️ 조회된 데이터가 없습니다.")
                 return pd.DataFrame()
 
-            # 시간 컬럼을 _time_gateway로 변환
-            if "time" in data.columns:
-                data["_time_gateway"] = pd.to_datetime(data["time"])
-                data = data.drop(columns=["time"])
+            data["_time_gateway"] = pd.to_datetime(data.pop("time"))
+            data.columns = [c.lower() for c in data.columns]
+            if self.verbose:
+                print(f"✅ 집계 데이터 조회 완료: {data.shape}")
+            return data
+
+        except Exception as e:
+            print(f"❌ 집계 데이터 조회 실패: {e}")
+            return pd.DataFrame()
+
+    def _query_data(
+        self,
+        columns: list,
+        start_time: pd.Timestamp,
+        query_range_seconds: int,
+        table_name: str = "SRS1",
+    ) -> pd.DataFrame:
+        """InfluxDB에서 SRS1 데이터를 조회합니다. (실패 시 예외 발생)"""
+        query = self._make_read_query(
+            columns, start_time, query_range_seconds, table_name
+        )
+        result_set = self.client.query(query)
+        data = pd.DataFrame(result_set.get_points())
+        if data.empty:
+            return pd.DataFrame()
 
-            # 컬럼명을 소문자로 변환 (InfluxDB는 대문자, 우리 코드는 소문자)
-            column_mapping = {}
-            for col in data.columns:
-                if col != "_time_gateway":
-                    column_mapping[col] = col.lower()
+        # 시간 컬럼을 _time_gateway로 변환
+        if "time" in data.columns:
+            data["_time_gateway"] = pd.to_datetime(data["time"])
+            data = data.drop(columns=["time"])
 
-            data = data.rename(columns=column_mapping)
+        # 컬럼명을 소문자로 변환 (InfluxDB는 대문자, 우리 코드는 소문자)
+        column_mapping = {}
+        for col in data.columns:
+            if col != "_time_gateway":
+                column_mapping[col] = col.lower()
 
-            print(f"✅ 데이터 조회 완료: {data.shape}")
-            print(f"   컬럼: {list(data.columns)}")
-            print(
-                f"   시간 범위: {data['_time_gateway'].min()} ~ {data['_time_gateway'].max()}"
-            )
+        return data.rename(columns=column_mapping)
+
+    def read_data(
+        self,
+        columns: list,
+        start_time: pd.Timestamp,
+        query_range_seconds: int,
+        table_name: str = "SRS1",
+    ) -> pd.DataFrame:
+        """SRS1 데이터 조회 (cache가 있으면 캐시에 없는 시간만 InfluxDB에서 조회)"""
+        try:
+            if self.verbose:
+                print(f"🔍 쿼리 실행: {query_range_seconds}초 범위")
+
+            if self.cache is not None:
+                data = self.cache.read(
+                    self._query_data,
+                    columns,
+                    start_time,
+                    query_range_seconds,
+                    table_name,
+                )
+            else:
+                data = self._query_data(
+                    columns, start_time, query_range_seconds, table_name
+                )
+
+            if data.empty:
+                if self.verbose:
+                    print("⚠️ 조회된 데이터가 없습니다.")
+                return pd.DataFrame()
+
+            if self.verbose:
+                print(f"✅ 데이터 조회 완료: {data.shape}")
+                print(f"   컬럼: {list(data.columns)}")
+                print(
+                    f"   시간 범위: {data['_time_gateway'].min()} ~ {data['_time_gateway'].max()}"
+                )
 
             return data
 
@@ -97,6 +243,45 @@ class SRS1InfluxDBClient:
             traceback.print_exc()
             return pd.DataFrame()
 
+    def read_data_columnar(
+        self,
+        columns: list,
+        start_time: pd.Timestamp,
+        query_range_seconds: int,
+        table_name: str = "SRS1",
+        fmt: str = "csv",
+        chunk_size: int = 20000,
+    ) -> pd.DataFrame:
+        """SRS1 데이터 조회 (컬럼 단위 수집, 결과 형태는 read_data와 동일)
+
+        행마다 dict를 만드는 대신 CSV(fmt="csv") 또는 chunked JSON(fmt="json") 응답을
+        타입이 정해진 NumPy 컬럼으로 바로 파싱합니다. (columnar_ingest 참고)
+        """
+        from columnar_ingest import read_influxql_columnar
+
+        try:
+            query = self._make_read_query(
+                columns, start_time, query_range_seconds, table_name
+            )
+            if self.verbose:
+                print(f"🔍 쿼리 실행 ({fmt} 컬럼 수집): {query_range_seconds}초 범위")
+
+            data = read_influxql_columnar(
+                self.client, query, self.database, fmt=fmt, chunk_size=chunk_size
+            )
+            if data.empty:
+                if self.verbose:
+                    print("⚠️ 조회된 데이터가 없습니다.")
+                return pd.DataFrame()
+
+            if self.verbose:
+                print(f"✅ 데이터 조회 완료: {data.shape}")
+            return data
+
+        except Exception as e:
+            print(f"❌ 데이터 조회 실패: {e}")
+            return pd.DataFrame()
+
 
 def test_influxdb_connection():
     """InfluxDB 연결 테스트"""
@@ -119,32 +304,22 @@ def test_influxdb_connection():
         return None
 
 
-def fetch_realtime_data(client: SRS1InfluxDBClient):
-    """실시간 SRS1 데이터 조회"""
+def fetch_realtime_data(client: SRS1InfluxDBClient, fetcher=None):
+    """실시간 SRS1 데이터 조회
+
+    fetcher(sensor_buffer.IncrementalSRS1Fetcher)를 넘기면 매번 전체 구간을 다시 조회하지
+    않고, 마지막으로 받은 시각 이후의 행만 조회하여 링 버퍼의 이력과 합쳐 반환합니다.
+    """
     print("📊 실시간 SRS1 데이터 조회 시작")
     print("=" * 60)
 
     try:
-        # NOx 예측에 필요한 컬럼들 (대문자로 InfluxDB에서 조회)
-        columns = [
-            "_time_gateway",
-            "BFT_EO_FG_T",
-            "BR1_EO_FG_T",
-            "BR1_EO_O2_A",
-            "BR1_EO_ST_T",
-            "DR1_EQ_BW_C",
-            "ICF_CCS_FG_T_1",
-            "ICF_CRA_WT_K",
-            "ICF_FF1_AR_F_1",
-            "ICF_FF1_SS_S_1",
-            "ICF_FF1_SS_S_2",
-            "ICF_FF2_SS_S_1",
-            "ICF_IDF_SS_S_1",
-            "ICF_SCS_FG_T_1",
-            "ICF_TMS_NOX_A",
-            "SDR_HTR_FG_T",
-            "NOX_Value",
-        ]
+        if fetcher is not None:
+            raw_data = fetcher.fetch()
+            print(f"✅ 증분 조회 완료: 버퍼 {raw_data.shape}, 통계 {fetcher.stats}")
+            return raw_data if not raw_data.empty else None
+
+        columns = REALTIME_COLUMNS
 
         # 현재 시간부터 15분 전까지 데이터 조회
         end_time = pd.Timestamp.now()
@@ -176,6 +351,19 @@ def fetch_realtime_data(client: SRS1InfluxDBClient):
         return None
 
 
+def make_incremental_fetcher(client: SRS1InfluxDBClient, checkpoint_path=None):
+    """REALTIME_COLUMNS 30분 이력을 유지하는 증분 조회기를 생성합니다.
+
+    checkpoint_path를 지정하면 버퍼를 주기적으로 저장하고, 재시작 시 복원하여
+    저장 이후의 빈 구간만 조회합니다.
+    """
+    from sensor_buffer import IncrementalSRS1Fetcher
+
+    return IncrementalSRS1Fetcher(
+        client, REALTIME_COLUMNS, checkpoint_path=checkpoint_path
+    )
+
+
 def test_full_pipeline(client: SRS1InfluxDBClient):
     """전체 파이프라인 테스트"""
     print("🔄 전체 파이프라인 테스트 시작")
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+추론 백엔드 예측 일치 테스트
+Data/test_sample.csv에서 원본 LightGBM 모델(Model/lgbm_model.pkl)과 평탄화 모델
+(FlatTreeModel: predict / predict_into), ONNX 모델(OnnxNOxModel)의 예측을 비교합니다.
+ONNX 비교는 onnxmltools / onnxruntime이 설치된 경우에만 실행합니다.
+
+사용 예:
+    python -m pytest -q test_model_parity.py
+    python test_model_parity.py
+"""
+
+import importlib.util
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from flat_tree_model import FlatTreeModel
+from model_registry import load_model_file
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_PATH = os.path.join(REPO_DIR, "Model", "lgbm_model.pkl")
+DATA_PATH = os.path.join(REPO_DIR, "Data", "test_sample.csv")
+
+
+def load_inputs():
+    """원본 모델과 test_sample의 입력 행렬(모델 피처 순서)을 반환합니다."""
+    model, _ = load_model_file(MODEL_PATH)
+    feature_names = model.booster_.feature_name()
+    X = pd.read_csv(DATA_PATH)[feature_names].to_numpy(dtype=np.float64)
+    return model, X
+
+
+def onnx_available() -> bool:
+    return all(
+        importlib.util.find_spec(name) is not None
+        for name in ("onnxmltools", "onnxruntime")
+    )
+
+
+def test_flat_model_matches_lightgbm():
+    """평탄화 모델은 LightGBM과 비트 단위로 일치해야 합니다."""
+    model, X = load_inputs()
+    flat_model = FlatTreeModel.from_model(model)
+    np.testing.assert_array_equal(flat_model.predict(X), model.predict(X))
+
+
+def test_flat_predict_into_matches_predict():
+    """predict_into(사전 할당 버퍼)는 predict와 같은 값을 내야 합니다."""
+    model, X = load_inputs()
+    flat_model = FlatTreeModel.from_model(model)
+    workspace = flat_model.make_workspace(len(X))
+    out = np.empty(len(X))
+
+    # predict_into는 입력을 그 자리에서 수정하므로 복사본을 넘김
+    flat_model.predict_into(X.copy(), out, workspace)
+    np.testing.assert_array_equal(out, model.predict(X))
+
+    # 작은 배치로 같은 작업 버퍼를 재사용해도 결과가 같아야 함
+    for start in range(0, len(X), 7):
+        batch = X[start : start + 7].copy()
+        flat_model.predict_into(batch, out[: len(batch)], workspace)
+        np.testing.assert_array_equal(
+            out[: len(batch)], model.predict(X[start : start + 7])
+        )
+
+
+def test_onnx_model_matches_lightgbm():
+    """ONNX 모델은 LightGBM / 평탄화 모델과 허용 오차(PARITY_ATOL) 안에서 일치해야 합니다."""
+    if not onnx_available():
+        import pytest
+
+        pytest.skip("onnxmltools / onnxruntime 미설치")
+
+    from onnx_model import PARITY_ATOL, OnnxNOxModel, export_onnx_model
+
+    model, X = load_inputs()
+    workdir = tempfile.mkdtemp(prefix="nox_onnx_")
+    try:
+        onnx_path = export_onnx_model(
+            MODEL_PATH, os.path.join(workdir, "lgbm_model.onnx")
+        )
+        onnx_model = OnnxNOxModel.load(onnx_path)
+        actual = onnx_model.predict(X)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    np.testing.assert_allclose(actual, model.predict(X), rtol=0, atol=PARITY_ATOL)
+    flat_model = FlatTreeModel.from_model(model)
+    np.testing.assert_allclose(actual, flat_model.predict(X), rtol=0, atol=PARITY_ATOL)
+
+
+if __name__ == "__main__":
+    import logging
+
+    logging.basicConfig(level=logging.WARNING)
+
+    tests = [
+        test_flat_model_matches_lightgbm,
+        test_flat_predict_into_matches_predict,
+    ]
+    if onnx_available():
+        tests.append(test_onnx_model_matches_lightgbm)
+    else:
+        print("⚠️ onnxmltools / onnxruntime 미설치: ONNX 비교 생략")
+
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {type(e).__name__}: {e}")
+    print(f"\n📊 {len(tests) - failed}/{len(tests)}개 통과")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+예측 결과 싱크 테스트
+line protocol 변환(태그 병합 / 유한하지 않은 값 제외)과, 로컬 InfluxDB 대체 서버
+(LocalInfluxDBServer.fail_next)로 재현한 5xx 재시도 / 4xx 거부 / 버퍼 상한을 확인합니다.
+
+사용 예:
+    python -m pytest -q test_prediction_sink.py
+    python test_prediction_sink.py
+"""
+
+import sys
+
+import pandas as pd
+
+from local_influxdb import TIME_COL, LocalInfluxDBServer
+from prediction_sink import PredictionSink, to_line_protocol
+
+TICK = 1704067200.0  # 2024-01-01T00:00:00Z
+
+
+def make_server(**kwargs) -> LocalInfluxDBServer:
+    data = pd.DataFrame({TIME_COL: [pd.Timestamp(TICK, unit="s")], "nox_value": [1.0]})
+    return LocalInfluxDBServer(data, **kwargs).start()
+
+
+def make_sink(server: LocalInfluxDBServer, **kwargs) -> PredictionSink:
+    options = dict(
+        batch_size=10, flush_interval=0.05, max_retries=3, retry_backoff=0.01
+    )
+    options.update(kwargs)
+    return PredictionSink(server.url, bucket="SRS1", org="SRS1", **options)
+
+
+def result(i: int, **extra) -> dict:
+    return {"tick_time": TICK + i * 5, "prediction": float(i), **extra}
+
+
+def test_line_protocol_merges_tags_and_skips_non_finite():
+    """결과 tags는 싱크 tags와 합쳐지고, NaN / 문자열 필드는 빠져야 합니다."""
+    line = to_line_protocol(
+        result(
+            1,
+            features={"O2 A": 7.5, "bad": float("nan"), "text": "x"},
+            tags={"catch_up": "true"},
+        ),
+        tags={"plant": "SRS 1"},
+    )
+    assert line == (
+        "nox_prediction,catch_up=true,plant=SRS\\ 1 "
+        "prediction=1.0,f_O2\\ A=7.5 1704067205000000000"
+    )
+    assert to_line_protocol({"tick_time": TICK, "prediction": float("nan")}) is None
+
+
+def test_retries_5xx_until_written():
+    """5xx 응답은 재시도하여 결국 기록해야 합니다."""
+    server = make_server(failure_status=503)
+    try:
+        server.fail_next(2)
+        sink = make_sink(server)
+        sink.write(result(0))
+        assert sink.flush(timeout=5)
+        sink.close()
+    finally:
+        server.stop()
+
+    assert sink.stats["retries"] == 2
+    assert sink.stats["written"] == 1
+    assert sink.stats["rejected_batches"] == 0
+    assert len(server.written) == 1
+
+
+def test_drops_4xx_without_retry():
+    """4xx로 거부된 배치는 재시도하지 않고 버리며, 이후 기록을 막지 않아야 합니다."""
+    server = make_server(failure_status=400)
+    try:
+        server.fail_next(1)
+        sink = make_sink(server)
+        sink.write(result(0))
+        assert sink.flush(timeout=5)
+        sink.write(result(1))
+        sink.close()
+    finally:
+        server.stop()
+
+    assert sink.stats["retries"] == 0
+    assert sink.stats["rejected_batches"] == 1
+    assert sink.stats["dropped"] == 1
+    assert sink.stats["written"] == 1
+    assert server.stats["requests"] == 2
+    assert "prediction=1.0" in "\n".join(server.written)
+
+
+def test_buffer_keeps_newest_rows():
+    """버퍼가 max_buffer를 넘으면 가장 오래된 결과부터 버려야 합니다."""
+    server = make_server()
+    try:
+        # 플러시 주기를 길게 두어 write 중에는 기록하지 않음
+        sink = make_sink(server, batch_size=100, flush_interval=60, max_buffer=3)
+        for i in range(5):
+            sink.write(result(i))
+        sink.close(timeout=5)
+    finally:
+        server.stop()
+
+    assert sink.stats["dropped"] == 2
+    assert sink.stats["written"] == 3
+    written = "\n".join(server.written)
+    assert "prediction=0.0" not in written and "prediction=1.0" not in written
+    for i in (2, 3, 4):
+        assert f"prediction={float(i)!r}" in written
+
+
+if __name__ == "__main__":
+    import logging
+
+    logging.basicConfig(level=logging.WARNING)
+
+    tests = [
+        test_line_protocol_merges_tags_and_skips_non_finite,
+        test_retries_5xx_until_written,
+        test_drops_4xx_without_retry,
+        test_buffer_keeps_newest_rows,
+    ]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {type(e).__name__}: {e}")
+    print(f"\n📊 {len(tests) - failed}/{len(tests)}개 통과")
+    sys.exit(1 if failed else 0)
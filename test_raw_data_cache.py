@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+원시 데이터 디스크 캐시 테스트
+RawDataCache의 부분 적중(없는 시간만 연속 구간으로 조회), 최근 블록 미저장, 깨진 블록 재조회와
+크기 상한에 따른 LRU 삭제를 확인합니다.
+
+사용 예:
+    python -m pytest -q test_raw_data_cache.py
+    python test_raw_data_cache.py
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from raw_data_cache import TIME_COL, RawDataCache
+
+COLUMNS = ["NOX_Value", "O2_A"]
+BASE = pd.Timestamp("2024-01-01 00:00:00")
+HOUR = pd.Timedelta(hours=1)
+
+
+class FakeFetch:
+    """(start_time - range, start_time] 구간의 행을 반환하고 호출을 기록하는 조회 함수"""
+
+    def __init__(self, hours: int = 8):
+        seconds = np.arange(0, hours * 3600, 60, dtype=np.float64)
+        self.data = pd.DataFrame(
+            {
+                "nox_value": seconds,
+                "o2_a": -seconds,
+                TIME_COL: BASE + pd.to_timedelta(seconds, unit="s"),
+            }
+        )
+        self.calls = []
+
+    def __call__(self, columns, start_time, query_range_seconds, table_name):
+        self.calls.append((start_time, query_range_seconds))
+        return self.expected(start_time, query_range_seconds)
+
+    def expected(self, end, seconds) -> pd.DataFrame:
+        times = self.data[TIME_COL]
+        start = end - pd.Timedelta(seconds=seconds)
+        return self.data[(times > start) & (times <= end)].reset_index(drop=True)
+
+
+def read(cache: RawDataCache, fetch: FakeFetch, first: int, last: int):
+    """(BASE + first시간, BASE + last시간] 구간을 캐시를 거쳐 읽습니다."""
+    seconds = (last - first) * 3600
+    data = cache.read(fetch, COLUMNS, BASE + last * HOUR, seconds)
+    pd.testing.assert_frame_equal(data, fetch.expected(BASE + last * HOUR, seconds))
+    return data
+
+
+def test_partial_hit_fetches_only_missing_runs():
+    """캐시된 블록은 디스크에서 읽고, 없는 시간만 연속 구간마다 한 번씩 조회해야 합니다."""
+    fetch = FakeFetch()
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = RawDataCache(cache_dir)
+        read(cache, fetch, 0, 2)
+        read(cache, fetch, 3, 4)
+        assert fetch.calls == [(BASE + 2 * HOUR, 7200), (BASE + 4 * HOUR, 3600)]
+
+        fetch.calls.clear()
+        read(cache, fetch, 0, 6)  # 0, 1, 3시 적중 / 2시, 4~5시 조회
+        assert fetch.calls == [(BASE + 3 * HOUR, 3600), (BASE + 6 * HOUR, 7200)]
+        assert cache.stats["hit_blocks"] == 3
+        assert cache.stats["miss_blocks"] == 6
+
+        fetch.calls.clear()
+        read(cache, fetch, 1, 5)
+        assert fetch.calls == []
+
+        # 정각이 아닌 구간도 블록을 잘라 같은 결과를 내야 함
+        end = BASE + 5 * HOUR + pd.Timedelta(minutes=30)
+        data = cache.read(fetch, COLUMNS, end, 5400)
+        pd.testing.assert_frame_equal(data, fetch.expected(end, 5400))
+        assert fetch.calls == []
+
+
+def test_recent_blocks_are_not_cached():
+    """끝 시각이 현재 - settle_seconds 이후인 블록은 저장하지 않고 매번 조회해야 합니다."""
+    fetch = FakeFetch()
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = RawDataCache(cache_dir, settle_seconds=300)
+        now = pd.Timestamp.now("UTC").tz_localize(None)
+        for _ in range(2):
+            assert cache.read(fetch, COLUMNS, now, 600).empty
+        assert len(fetch.calls) == 2
+        assert cache.stats["uncached_queries"] == 2
+        assert cache.size_bytes() == 0
+
+
+def test_corrupt_block_is_refetched():
+    """읽을 수 없는 블록은 다시 조회하여 덮어써야 합니다."""
+    fetch = FakeFetch()
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = RawDataCache(cache_dir)
+        read(cache, fetch, 0, 2)
+        block_dir = cache._block_dir("SRS1", COLUMNS)
+        with open(os.path.join(block_dir, "20240101T01.parquet"), "wb") as f:
+            f.write(b"broken")
+
+        fetch.calls.clear()
+        read(cache, fetch, 0, 2)
+        assert fetch.calls == [(BASE + 2 * HOUR, 3600)]
+
+
+def test_evicts_least_recently_used_blocks():
+    """max_bytes를 넘으면 가장 오래 사용하지 않은 블록부터 삭제해야 합니다."""
+    fetch = FakeFetch()
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = RawDataCache(cache_dir)
+        read(cache, fetch, 0, 4)
+        block_dir = cache._block_dir("SRS1", COLUMNS)
+        sizes = {
+            name: os.path.getsize(os.path.join(block_dir, name))
+            for name in os.listdir(block_dir)
+        }
+        assert len(sizes) == 4
+        assert cache.size_bytes() == sum(sizes.values())
+
+        read(cache, fetch, 0, 1)  # 0시 블록을 가장 최근 사용으로
+        cache.max_bytes = sizes["20240101T00.parquet"] + sizes["20240101T03.parquet"]
+        assert cache.evict() == 2
+        assert sorted(os.listdir(block_dir)) == [
+            "20240101T00.parquet",
+            "20240101T03.parquet",
+        ]
+        assert cache.stats["evicted_blocks"] == 2
+
+        # 재시작한 캐시는 디렉토리에서 크기를 다시 읽음
+        assert RawDataCache(cache_dir).size_bytes() == cache.max_bytes
+
+        fetch.calls.clear()
+        read(cache, fetch, 0, 4)
+        assert fetch.calls == [(BASE + 3 * HOUR, 7200)]
+
+
+if __name__ == "__main__":
+    import logging
+
+    logging.basicConfig(level=logging.WARNING)
+
+    tests = [
+        test_partial_hit_fetches_only_missing_runs,
+        test_recent_blocks_are_not_cached,
+        test_corrupt_block_is_refetched,
+        test_evicts_least_recently_used_blocks,
+    ]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {type(e).__name__}: {e}")
+    print(f"\n📊 {len(tests) - failed}/{len(tests)}개 통과")
+    sys.exit(1 if failed else 0)
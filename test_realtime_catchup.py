@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+누락 주기 복구(catch-up) 테스트
+누락 격자 시각 계산(현재 주기 제외 / max_backlog 상한), mark의 단조 증가와 상태 파일
+저장·복원, 로컬 InfluxDB 대체 서버(LocalInfluxDBServer)를 이용한 일괄 복구를 확인합니다.
+
+사용 예:
+    python -m pytest -q test_realtime_catchup.py
+    python test_realtime_catchup.py
+"""
+
+import json
+import os
+import sys
+import tempfile
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from realtime_catchup import BacklogCatchUp
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_PATH = os.path.join(REPO_DIR, "Model", "lgbm_model.pkl")
+DATA_PATH = os.path.join(REPO_DIR, "Data", "test_sample.csv")
+
+NOW = 1704067200.0 + 2.5  # 격자(5초) 사이의 시각
+
+
+class FakeSink:
+    """write된 결과를 모아두는 싱크"""
+
+    def __init__(self):
+        self.results = []
+
+    def write(self, result):
+        self.results.append(result)
+
+
+class FailingClient:
+    def read_data(self, columns, start_time, query_range_seconds, table_name):
+        raise ConnectionError("조회 실패")
+
+
+def make_catch_up(client=None, **kwargs) -> BacklogCatchUp:
+    return BacklogCatchUp(client, model=None, columns=["a"], **kwargs)
+
+
+def test_missed_ticks_excludes_current_tick():
+    """last_tick 다음부터 현재 주기 직전까지의 격자 시각만 반환해야 합니다."""
+    catch_up = make_catch_up(interval_seconds=5)
+    assert len(catch_up.missed_ticks(NOW)) == 0  # 예측 이력이 없으면 복구하지 않음
+
+    current = catch_up.current_tick(NOW)
+    assert current == NOW - 2.5
+    catch_up.last_tick = current - 20
+    np.testing.assert_array_equal(
+        catch_up.missed_ticks(NOW), current - np.array([15.0, 10.0, 5.0])
+    )
+
+    catch_up.last_tick = current - 5
+    assert len(catch_up.missed_ticks(NOW)) == 0
+
+
+def test_missed_ticks_caps_at_max_backlog():
+    """max_backlog_seconds보다 오래된 누락 주기는 건너뛰고 capped_ticks로 집계해야 합니다."""
+    catch_up = make_catch_up(interval_seconds=5, max_backlog_seconds=30)
+    catch_up.last_tick = catch_up.current_tick(NOW) - 3600
+
+    ticks = catch_up.missed_ticks(NOW)
+    assert len(ticks) == 5
+    assert ticks[0] >= NOW - 30
+    assert catch_up.stats["capped_ticks"] == 719 - 5
+
+
+def test_mark_is_monotonic_and_persisted():
+    """mark는 뒤로 가지 않아야 하며, 상태 파일에서 재시작 시 복원되어야 합니다."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "state", "catch_up.json")
+        catch_up = make_catch_up(interval_seconds=5, state_path=path)
+        assert catch_up.last_tick is None
+
+        catch_up.mark(100.0)
+        catch_up.mark(90.0)
+        assert catch_up.last_tick == 100.0
+        with open(path) as f:
+            assert json.load(f) == {"last_tick": 100.0, "interval_seconds": 5}
+        assert not os.path.exists(f"{path}.tmp")
+
+        restarted = make_catch_up(interval_seconds=5, state_path=path)
+        assert restarted.last_tick == 100.0
+
+        # 손상된 상태 파일은 무시하고 처음부터 시작
+        with open(path, "w") as f:
+            f.write("{")
+        assert make_catch_up(state_path=path).last_tick is None
+
+
+def test_failed_recovery_does_not_mark():
+    """조회가 실패하면 failures로 집계하고 last_tick은 그대로 두어야 합니다."""
+    catch_up = make_catch_up(FailingClient(), interval_seconds=5)
+    catch_up.last_tick = catch_up.current_tick(NOW) - 20
+
+    assert catch_up.recover(NOW) == []
+    assert catch_up.stats["failures"] == 1
+    assert catch_up.last_tick == catch_up.current_tick(NOW) - 20
+
+
+def test_recover_scores_missed_ticks_from_local_influxdb():
+    """로컬 InfluxDB에서 누락 구간을 한 번에 예측하고 catch_up 태그로 싱크에 기록해야 합니다."""
+    from local_influxdb import TIME_COL, LocalInfluxDBServer, load_frame
+    from model_registry import load_model_file
+    from test_influxdb_realtime import SRS1InfluxDBClient
+
+    warnings.filterwarnings("ignore", category=pd.errors.PerformanceWarning)
+    data = load_frame(DATA_PATH)
+    model, _ = load_model_file(MODEL_PATH)
+    now = pd.to_datetime(data[TIME_COL]).max().tz_localize("UTC").timestamp() + 0.5
+
+    sink = FakeSink()
+    with LocalInfluxDBServer(data) as server:
+        client = SRS1InfluxDBClient(host=server.host, port=server.port, verbose=False)
+        catch_up = BacklogCatchUp(client, model, interval_seconds=5, sink=sink)
+        catch_up.last_tick = catch_up.current_tick(now) - 30
+        results = catch_up.recover(now)
+        assert server.stats["requests"] == 1  # 누락 구간 전체를 한 번에 조회
+
+    current = catch_up.current_tick(now)
+    assert [r["tick_time"] for r in results] == [
+        current - s for s in (25, 20, 15, 10, 5)
+    ]
+    assert all(np.isfinite(r["prediction"]) for r in results)
+    assert all(r["tags"] == {"catch_up": "true"} for r in results)
+    assert sink.results == results
+    assert catch_up.last_tick == results[-1]["tick_time"]
+    assert catch_up.stats["recovered_ticks"] == 5
+    assert len(catch_up.missed_ticks(now)) == 0
+
+
+if __name__ == "__main__":
+    import logging
+
+    logging.basicConfig(level=logging.WARNING)
+
+    tests = [
+        test_missed_ticks_excludes_current_tick,
+        test_missed_ticks_caps_at_max_backlog,
+        test_mark_is_monotonic_and_persisted,
+        test_failed_recovery_does_not_mark,
+        test_recover_scores_missed_ticks_from_local_influxdb,
+    ]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {type(e).__name__}: {e}")
+    print(f"\n📊 {len(tests) - failed}/{len(tests)}개 통과")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+센서 이력 링 버퍼 / 증분 조회기 테스트
+RollingSensorBuffer의 중복 제거 / 만료 제거 / 순환 저장과 체크포인트 저장·복원,
+IncrementalSRS1Fetcher의 증분 조회와 체크포인트 주기를 확인합니다.
+
+사용 예:
+    python -m pytest -q test_sensor_buffer.py
+    python test_sensor_buffer.py
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from sensor_buffer import TIME_COL, IncrementalSRS1Fetcher, RollingSensorBuffer
+
+COLUMNS = ["a", "b"]
+
+
+def make_frame(seconds, start="2024-01-01 00:00:00") -> pd.DataFrame:
+    """seconds(시작 시각 기준 초) 시각마다 a=초, b=-초인 행을 만듭니다."""
+    seconds = np.asarray(seconds, dtype=np.float64)
+    return pd.DataFrame(
+        {
+            TIME_COL: pd.Timestamp(start) + pd.to_timedelta(seconds, unit="s"),
+            "a": seconds,
+            "b": -seconds,
+        }
+    )
+
+
+def test_append_drops_duplicates_and_old_rows():
+    """배치 내 중복 시각은 마지막 행을, 이미 있는 시각 이하의 행은 버려야 합니다."""
+    buffer = RollingSensorBuffer(COLUMNS, history_seconds=100)
+    assert buffer.append(make_frame([0, 1, 2])) == 3
+
+    overlap = make_frame([1, 2, 3, 3])
+    overlap.loc[3, "a"] = 33.0  # 같은 시각의 마지막 행
+    assert buffer.append(overlap) == 1
+
+    frame = buffer.to_frame()
+    assert frame["a"].tolist() == [0.0, 1.0, 2.0, 33.0]
+    assert buffer.stats["duplicates"] == 3
+
+
+def test_evicts_rows_older_than_history():
+    """마지막 시각보다 history_seconds 넘게 오래된 행은 제거되어야 합니다."""
+    buffer = RollingSensorBuffer(COLUMNS, history_seconds=10)
+    buffer.append(make_frame(range(0, 30)))
+
+    frame = buffer.to_frame()
+    assert frame["a"].tolist() == [float(s) for s in range(19, 30)]
+    assert buffer.stats["evicted"] + buffer.stats["overwritten"] == 19
+
+
+def test_wraparound_keeps_time_order():
+    """순환 저장으로 배열 끝을 넘어가도 to_frame은 시간순이어야 합니다."""
+    buffer = RollingSensorBuffer(COLUMNS, history_seconds=5)
+    for second in range(40):
+        buffer.append(make_frame([second]))
+
+    frame = buffer.to_frame()
+    assert frame[TIME_COL].is_monotonic_increasing
+    assert frame["a"].tolist() == [float(s) for s in range(34, 40)]
+    np.testing.assert_array_equal(frame["b"], -frame["a"])
+
+
+def test_checkpoint_roundtrip():
+    """save → restore 후 같은 프레임이어야 하며, 컬럼이 다르면 복원하지 않아야 합니다."""
+    buffer = RollingSensorBuffer(COLUMNS, history_seconds=60)
+    buffer.append(make_frame(range(0, 45)))
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "buffer.npz")
+        buffer.save(path)
+
+        restored = RollingSensorBuffer(COLUMNS, history_seconds=60)
+        assert restored.restore(path) == len(buffer)
+        pd.testing.assert_frame_equal(restored.to_frame(), buffer.to_frame())
+
+        other = RollingSensorBuffer(["a", "c"], history_seconds=60)
+        assert other.restore(path) == 0
+        assert len(other) == 0
+
+
+class FakeClient:
+    """read_data 호출을 기록하고 요청 구간의 행을 반환하는 조회 클라이언트"""
+
+    def __init__(self, data: pd.DataFrame):
+        self.data = data
+        self.calls = []
+
+    def read_data(self, columns, start_time, query_range_seconds, table_name):
+        self.calls.append(query_range_seconds)
+        start = start_time - pd.Timedelta(seconds=query_range_seconds)
+        times = self.data[TIME_COL]
+        return self.data[(times >= start) & (times <= start_time)].reset_index(
+            drop=True
+        )
+
+
+def test_fetcher_reads_only_new_rows_and_checkpoints_every_n_ticks():
+    """첫 조회 이후에는 마지막 시각 이후 범위만 조회하고, N회마다 체크포인트를 저장해야 합니다."""
+    data = make_frame(range(0, 120))
+    client = FakeClient(data)
+    base = data[TIME_COL].iloc[0]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "buffer.npz")
+        fetcher = IncrementalSRS1Fetcher(
+            client,
+            COLUMNS,
+            buffer=RollingSensorBuffer(COLUMNS, history_seconds=60),
+            checkpoint_path=path,
+            checkpoint_every_ticks=2,
+        )
+        for second in (60, 65, 70):
+            frame = fetcher.fetch(now=base + pd.Timedelta(seconds=second))
+
+        assert client.calls == [60, 5, 5]
+        assert frame["a"].iloc[-1] == 70.0
+        assert fetcher.stats["checkpoints"] == 1  # 2번째 조회에서 저장
+
+        # 재시작: 체크포인트(65초까지)를 복원하고 그 이후만 조회
+        restarted = IncrementalSRS1Fetcher(
+            client,
+            COLUMNS,
+            buffer=RollingSensorBuffer(COLUMNS, history_seconds=60),
+            checkpoint_path=path,
+        )
+        assert restarted.buffer.last_timestamp == base + pd.Timedelta(seconds=65)
+        restarted.fetch(now=base + pd.Timedelta(seconds=70))
+        assert client.calls[-1] == 5
+        pd.testing.assert_frame_equal(restarted.buffer.to_frame(), frame)
+
+
+if __name__ == "__main__":
+    import logging
+
+    logging.basicConfig(level=logging.WARNING)
+
+    tests = [
+        test_append_drops_duplicates_and_old_rows,
+        test_evicts_rows_older_than_history,
+        test_wraparound_keeps_time_order,
+        test_checkpoint_roundtrip,
+        test_fetcher_reads_only_new_rows_and_checkpoints_every_n_ticks,
+    ]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {type(e).__name__}: {e}")
+    print(f"\n📊 {len(tests) - failed}/{len(tests)}개 통과")
+    sys.exit(1 if failed else 0)